@@ -1,45 +1,116 @@
 # -*- coding: utf-8 -*-
-from sqlalchemy import Boolean, Column, Float, Integer, String
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    Identity,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Table,
+)
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 EVENTS_TABLE_NAME = "events"
 GKG_TABLE_NAME = "gkg"
+GKG_EVENT_LINKS_TABLE_NAME = "gkg_event_links"
+GKG_COUNTS_TABLE_NAME = "gkg_counts"
+GKG_LOCATIONS_TABLE_NAME = "gkg_locations"
+MANIFEST_TABLE_NAME = "ingestion_manifest"
+BACKFILL_LEASES_TABLE_NAME = "backfill_leases"
+# Bronze tables are range partitioned by the date their rows were ingested (`YYYYMMDD`), with
+# one partition per day
+PARTITION_COLUMNS = {
+    EVENTS_TABLE_NAME: "DATEADDED",
+    GKG_TABLE_NAME: "DATE",
+    GKG_EVENT_LINKS_TABLE_NAME: "date",
+    GKG_COUNTS_TABLE_NAME: "date",
+    GKG_LOCATIONS_TABLE_NAME: "date",
+}
+
+# Low-cardinality code columns of the events, stored as keys into dimension tables (which map
+# each key to its code), by dimension table
+EVENT_CODE_DIMENSIONS = {
+    "dim_country": [
+        "Actor1CountryCode",
+        "Actor2CountryCode",
+    ],
+    "dim_known_group": [
+        "Actor1KnownGroupCode",
+        "Actor2KnownGroupCode",
+    ],
+    "dim_ethnic": [
+        "Actor1EthnicCode",
+        "Actor2EthnicCode",
+    ],
+    "dim_religion": [
+        "Actor1Religion1Code",
+        "Actor1Religion2Code",
+        "Actor2Religion1Code",
+        "Actor2Religion2Code",
+    ],
+    "dim_actor_type": [
+        "Actor1Type1Code",
+        "Actor1Type2Code",
+        "Actor1Type3Code",
+        "Actor2Type1Code",
+        "Actor2Type2Code",
+        "Actor2Type3Code",
+    ],
+    "dim_event_code": [
+        "EventCode",
+        "EventBaseCode",
+        "EventRootCode",
+    ],
+    "dim_geo_country": [
+        "Actor1Geo_CountryCode",
+        "Actor2Geo_CountryCode",
+        "ActionGeo_CountryCode",
+    ],
+}
+EVENTS_DECODED_VIEW_NAME = "events_decoded"
 
 
 class Events(Base):
     __tablename__ = EVENTS_TABLE_NAME
-    __table_args__ = {"schema": "bronze"}
+    __table_args__ = {"schema": "bronze", "postgresql_partition_by": 'RANGE ("DATEADDED")'}
+
+    # The columns in `EVENT_CODE_DIMENSIONS` hold dimension keys (see `bronze.events_decoded`)
 
     GlobalEventID = Column(Integer, primary_key=True)
-    Day = Column(Integer)
+    Day = Column(Integer, index=True)
     MonthYear = Column(Integer)
     Year = Column(Integer)
     FractionDate = Column(Float)
     Actor1Code = Column(String)
     Actor1Name = Column(String)
-    Actor1CountryCode = Column(String)
-    Actor1KnownGroupCode = Column(String)
-    Actor1EthnicCode = Column(String)
-    Actor1Religion1Code = Column(String)
-    Actor1Religion2Code = Column(String)
-    Actor1Type1Code = Column(String)
-    Actor1Type2Code = Column(String)
-    Actor1Type3Code = Column(String)
+    Actor1CountryCode = Column(SmallInteger)
+    Actor1KnownGroupCode = Column(SmallInteger)
+    Actor1EthnicCode = Column(SmallInteger)
+    Actor1Religion1Code = Column(SmallInteger)
+    Actor1Religion2Code = Column(SmallInteger)
+    Actor1Type1Code = Column(SmallInteger)
+    Actor1Type2Code = Column(SmallInteger)
+    Actor1Type3Code = Column(SmallInteger)
     Actor2Code = Column(String)
     Actor2Name = Column(String)
-    Actor2CountryCode = Column(String)
-    Actor2KnownGroupCode = Column(String)
-    Actor2EthnicCode = Column(String)
-    Actor2Religion1Code = Column(String)
-    Actor2Religion2Code = Column(String)
-    Actor2Type1Code = Column(String)
-    Actor2Type2Code = Column(String)
-    Actor2Type3Code = Column(String)
+    Actor2CountryCode = Column(SmallInteger)
+    Actor2KnownGroupCode = Column(SmallInteger)
+    Actor2EthnicCode = Column(SmallInteger)
+    Actor2Religion1Code = Column(SmallInteger)
+    Actor2Religion2Code = Column(SmallInteger)
+    Actor2Type1Code = Column(SmallInteger)
+    Actor2Type2Code = Column(SmallInteger)
+    Actor2Type3Code = Column(SmallInteger)
     IsRootEvent = Column(Boolean)
-    EventCode = Column(String)
-    EventBaseCode = Column(String)
-    EventRootCode = Column(String)
+    EventCode = Column(SmallInteger)
+    EventBaseCode = Column(SmallInteger)
+    EventRootCode = Column(SmallInteger)
     QuadClass = Column(Integer)
     GoldsteinScale = Column(Float)
     NumMentions = Column(Integer)
@@ -48,35 +119,49 @@ class Events(Base):
     AvgTone = Column(Float)
     Actor1Geo_Type = Column(Integer)
     Actor1Geo_FullName = Column(String)
-    Actor1Geo_CountryCode = Column(String)
+    Actor1Geo_CountryCode = Column(SmallInteger)
     Actor1Geo_ADM1Code = Column(String)
     Actor1Geo_Lat = Column(Float)
     Actor1Geo_Long = Column(Float)
     Actor1Geo_FeatureID = Column(String)
     Actor2Geo_Type = Column(Integer)
     Actor2Geo_FullName = Column(String)
-    Actor2Geo_CountryCode = Column(String)
+    Actor2Geo_CountryCode = Column(SmallInteger)
     Actor2Geo_ADM1Code = Column(String)
     Actor2Geo_Lat = Column(Float)
     Actor2Geo_Long = Column(Float)
     Actor2Geo_FeatureID = Column(String)
     ActionGeo_Type = Column(Integer)
     ActionGeo_FullName = Column(String)
-    ActionGeo_CountryCode = Column(String)
+    ActionGeo_CountryCode = Column(SmallInteger)
     ActionGeo_ADM1Code = Column(String)
     ActionGeo_Lat = Column(Float)
     ActionGeo_Long = Column(Float)
     ActionGeo_FeatureID = Column(String)
-    DATEADDED = Column(Integer)
+    DATEADDED = Column(Integer, primary_key=True)
     SOURCEURL = Column(String)
 
 
+# Dimension tables of the event codes, filled incrementally as new codes are loaded
+DIMENSION_TABLES = {
+    name: Table(
+        name,
+        Base.metadata,
+        Column("id", SmallInteger, Identity(), primary_key=True),
+        Column("code", String, nullable=False, unique=True),
+        schema="bronze",
+    )
+    for name in EVENT_CODE_DIMENSIONS
+}
+
+
 class GKG(Base):
     __tablename__ = GKG_TABLE_NAME
-    __table_args__ = {"schema": "bronze"}
+    __table_args__ = {"schema": "bronze", "postgresql_partition_by": 'RANGE ("DATE")'}
 
-    UUID = Column(String, primary_key=True)
-    DATE = Column(Integer)
+    # Content hash of the record (see `gdelt.get_gkg_record_ids`)
+    UUID = Column(BigInteger, primary_key=True)
+    DATE = Column(Integer, primary_key=True)
     NUMARTS = Column(Integer)
     COUNTS = Column(String)
     THEMES = Column(String)
@@ -84,6 +169,102 @@ class GKG(Base):
     PERSONS = Column(String)
     ORGANIZATIONS = Column(String)
     TONE = Column(String)
+    # TONE decoded into its components (see `gkg.get_gkg_tone`)
+    TONE_AVERAGE = Column(Float)
+    TONE_POSITIVE = Column(Float)
+    TONE_NEGATIVE = Column(Float)
+    TONE_POLARITY = Column(Float)
+    TONE_ACTIVITY_DENSITY = Column(Float)
+    TONE_SELF_GROUP_DENSITY = Column(Float)
     CAMEOEVENTIDS = Column(String)
     SOURCES = Column(String)
     SOURCEURLS = Column(String)
+
+
+class GKGEventLink(Base):
+    __tablename__ = GKG_EVENT_LINKS_TABLE_NAME
+    __table_args__ = {"schema": "bronze", "postgresql_partition_by": 'RANGE ("date")'}
+
+    # One row for each event in the CAMEOEVENTIDS of a GKG record (see `gkg.get_gkg_event_links`)
+    gkg_id = Column(BigInteger, primary_key=True)
+    global_event_id = Column(Integer, primary_key=True, index=True)
+    # DATE of the GKG record
+    date = Column(Integer, primary_key=True)
+
+
+class GKGCount(Base):
+    __tablename__ = GKG_COUNTS_TABLE_NAME
+    __table_args__ = {"schema": "bronze", "postgresql_partition_by": 'RANGE ("date")'}
+
+    # One row for each block in the COUNTS of a GKG record (see `gkg.get_gkg_counts`)
+    gkg_id = Column(BigInteger, primary_key=True)
+    date = Column(Integer, primary_key=True)
+    # Position of the block in COUNTS
+    position = Column(SmallInteger, primary_key=True)
+    count_type = Column(String, index=True)
+    number = Column(BigInteger)
+    object_type = Column(String)
+    location_type = Column(Integer)
+    location_full_name = Column(String)
+    location_country_code = Column(String)
+    location_adm1_code = Column(String)
+    location_lat = Column(Float)
+    location_long = Column(Float)
+    location_feature_id = Column(String)
+
+
+class GKGLocation(Base):
+    __tablename__ = GKG_LOCATIONS_TABLE_NAME
+    __table_args__ = {"schema": "bronze", "postgresql_partition_by": 'RANGE ("date")'}
+
+    # One row for each block in the LOCATIONS of a GKG record (see `gkg.get_gkg_locations`)
+    gkg_id = Column(BigInteger, primary_key=True)
+    date = Column(Integer, primary_key=True)
+    # Position of the block in LOCATIONS
+    position = Column(SmallInteger, primary_key=True)
+    location_type = Column(Integer)
+    full_name = Column(String)
+    country_code = Column(String, index=True)
+    adm1_code = Column(String)
+    lat = Column(Float)
+    long = Column(Float)
+    feature_id = Column(String)
+
+
+class IngestionManifest(Base):
+    __tablename__ = MANIFEST_TABLE_NAME
+    __table_args__ = {"schema": "bronze"}
+
+    date = Column(Date, primary_key=True)
+    file_type = Column(String, primary_key=True)
+    status = Column(String, nullable=False)
+    row_count = Column(BigInteger)
+    # MD5 of the source archive, as published by GDELT
+    checksum = Column(String)
+    # Size of the staged (Parquet) file that was loaded
+    byte_size = Column(BigInteger)
+    download_seconds = Column(Float)
+    load_seconds = Column(Float)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class BackfillLease(Base):
+    __tablename__ = BACKFILL_LEASES_TABLE_NAME
+    __table_args__ = (
+        # Workers claim the largest pending units of a backfill first
+        Index("ix_backfill_leases_claim", "backfill_id", "status", "expected_bytes"),
+        {"schema": "bronze"},
+    )
+
+    backfill_id = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    file_type = Column(String, primary_key=True)
+    status = Column(String, nullable=False)
+    # Size of the source archive, from the Content-Length GDELT returns for it
+    expected_bytes = Column(BigInteger)
+    # Worker holding (or that last held) the lease, and until when it's held
+    worker_id = Column(String)
+    lease_expires_at = Column(DateTime(timezone=True))
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
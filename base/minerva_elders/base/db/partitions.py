@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+from typing import Any, List
+from uuid import uuid4
+
+import pandas as pd
+import pyarrow.compute as pc
+
+
+def get_partition_name(table_name: str, value: int) -> str:
+    """
+    Returns the name of the partition of a table that holds a single partition key value.
+
+    Args:
+        table_name (str): The name of the partitioned table.
+        value (int): The partition key value (e.g. a `YYYYMMDD` date).
+
+    Returns:
+        str: The name of the partition.
+    """
+    return f"{table_name}_p{value}"
+
+
+def get_partition_values(batch: Any, column: str) -> List[int]:
+    """
+    Returns the distinct partition key values in a batch of rows.
+
+    Args:
+        batch (Any): A DataFrame or an Arrow record batch or table.
+        column (str): The partition key column.
+
+    Returns:
+        List[int]: The distinct non-null values, sorted.
+    """
+    if isinstance(batch, pd.DataFrame):
+        values = batch[column].dropna().unique().tolist()
+    else:
+        values = pc.unique(batch.column(column)).drop_null().to_pylist()
+    return sorted(int(value) for value in values)
+
+
+async def ensure_partitions(
+    driver_conn: Any, schema_name: str, table_name: str, values: List[int]
+) -> None:
+    """
+    Asynchronously creates the partitions of a table for some partition key values, if needed.
+
+    Each partition holds a single value, i.e. the range `[value, value + 1)`. Partitions are
+    created in their own transactions, serialized with an advisory lock, so concurrent writers
+    can ensure the same partitions safely.
+
+    Args:
+        driver_conn (Any): The asyncpg connection to use.
+        schema_name (str): The name of the schema containing the table.
+        table_name (str): The name of the partitioned table.
+        values (List[int]): The partition key values.
+    """
+    for value in values:
+        partition_name = get_partition_name(table_name, value)
+        async with driver_conn.transaction():
+            await driver_conn.execute(
+                "SELECT pg_advisory_xact_lock(hashtext($1))", f"{schema_name}.{table_name}"
+            )
+            await driver_conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{schema_name}"."{partition_name}" '
+                f'PARTITION OF "{schema_name}"."{table_name}" '
+                f"FOR VALUES FROM ({value}) TO ({value + 1})"
+            )
+
+
+async def create_detached_partition(
+    driver_conn: Any,
+    schema_name: str,
+    table_name: str,
+    column: str,
+    value: int,
+    key_columns: List[str],
+) -> str:
+    """
+    Asynchronously creates a standalone table that can later replace a partition of a table.
+
+    The table has the same columns and primary key as the partitioned table, and a check
+    constraint matching the partition bounds, so that attaching it doesn't need to scan it. Its
+    name is unique, so concurrent loads of the same partition (e.g. by a worker whose lease was
+    stolen and the worker that stole it) don't clobber each other's table.
+
+    Args:
+        driver_conn (Any): The asyncpg connection to use.
+        schema_name (str): The name of the schema containing the table.
+        table_name (str): The name of the partitioned table.
+        column (str): The partition key column.
+        value (int): The partition key value.
+        key_columns (List[str]): The primary key of the partitioned table.
+
+    Returns:
+        str: The name of the new table.
+    """
+    load_name = f"{get_partition_name(table_name, value)}_load_{uuid4().hex[:8]}"
+    key_list = ", ".join(f'"{key_column}"' for key_column in key_columns)
+    await driver_conn.execute(
+        f'CREATE TABLE "{schema_name}"."{load_name}" '
+        f'(LIKE "{schema_name}"."{table_name}" INCLUDING DEFAULTS, '
+        f"PRIMARY KEY ({key_list}), "
+        f'CHECK ("{column}" IS NOT NULL AND "{column}" >= {value} '
+        f'AND "{column}" < {value + 1}))'
+    )
+    return load_name
+
+
+async def swap_partition(
+    driver_conn: Any, schema_name: str, table_name: str, load_name: str, value: int
+) -> None:
+    """
+    Asynchronously replaces a partition of a table with a detached table, atomically.
+
+    The current partition (if any) is detached and dropped, and the detached table is renamed
+    and attached in its place, all in a single transaction.
+
+    Args:
+        driver_conn (Any): The asyncpg connection to use.
+        schema_name (str): The name of the schema containing the table.
+        table_name (str): The name of the partitioned table.
+        load_name (str): The name of the table to attach.
+        value (int): The partition key value.
+    """
+    partition_name = get_partition_name(table_name, value)
+    async with driver_conn.transaction():
+        exists = await driver_conn.fetchval(
+            "SELECT to_regclass($1) IS NOT NULL", f'"{schema_name}"."{partition_name}"'
+        )
+        if exists:
+            await driver_conn.execute(
+                f'ALTER TABLE "{schema_name}"."{table_name}" '
+                f'DETACH PARTITION "{schema_name}"."{partition_name}"'
+            )
+            await driver_conn.execute(f'DROP TABLE "{schema_name}"."{partition_name}"')
+        await driver_conn.execute(
+            f'ALTER TABLE "{schema_name}"."{load_name}" RENAME TO "{partition_name}"'
+        )
+        await driver_conn.execute(
+            f'ALTER TABLE "{schema_name}"."{partition_name}" '
+            f'RENAME CONSTRAINT "{load_name}_pkey" TO "{partition_name}_pkey"'
+        )
+        await driver_conn.execute(
+            f'ALTER TABLE "{schema_name}"."{table_name}" '
+            f'ATTACH PARTITION "{schema_name}"."{partition_name}" '
+            f"FOR VALUES FROM ({value}) TO ({value + 1})"
+        )
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import text
+
+from .bronze import (
+    EVENTS_DECODED_VIEW_NAME,
+    EVENTS_TABLE_NAME,
+    GKG_TABLE_NAME,
+    PARTITION_COLUMNS,
+)
+from .utils import get_engine
+
+SILVER_SCHEMA_NAME = "silver"
+EVENTS_SILVER_TABLE_NAME = "explicit_gdelt_events"
+GKG_SILVER_TABLE_NAME = "explicit_gkg"
+
+# Columns of the silver events, and the bronze columns they come from (as in `events_silver.sql`)
+EVENTS_SILVER_COLUMNS = {
+    "GlobalEventID": "GlobalEventID",
+    "EventDate_Day": "Day",
+    "EventDate_MonthYear": "MonthYear",
+    "EventDate_Year": "Year",
+    "EventDate_Fractional": "FractionDate",
+    "Actor1_Code": "Actor1Code",
+    "Actor1_Name": "Actor1Name",
+    "Actor1_CountryCode": "Actor1CountryCode",
+    "Actor1_KnownGroupCode": "Actor1KnownGroupCode",
+    "Actor1_EthnicCode": "Actor1EthnicCode",
+    "Actor1_ReligionPrimaryCode": "Actor1Religion1Code",
+    "Actor1_ReligionSecondaryCode": "Actor1Religion2Code",
+    "Actor1_TypePrimaryCode": "Actor1Type1Code",
+    "Actor1_TypeSecondaryCode": "Actor1Type2Code",
+    "Actor1_TypeTertiaryCode": "Actor1Type3Code",
+    "Actor2_Code": "Actor2Code",
+    "Actor2_Name": "Actor2Name",
+    "Actor2_CountryCode": "Actor2CountryCode",
+    "Actor2_KnownGroupCode": "Actor2KnownGroupCode",
+    "Actor2_EthnicCode": "Actor2EthnicCode",
+    "Actor2_ReligionPrimaryCode": "Actor2Religion1Code",
+    "Actor2_ReligionSecondaryCode": "Actor2Religion2Code",
+    "Actor2_TypePrimaryCode": "Actor2Type1Code",
+    "Actor2_TypeSecondaryCode": "Actor2Type2Code",
+    "Actor2_TypeTertiaryCode": "Actor2Type3Code",
+    "IsRootEvent": "IsRootEvent",
+    "Event_MainCode": "EventCode",
+    "Event_BaseCode": "EventBaseCode",
+    "Event_RootCode": "EventRootCode",
+    "Event_QuadClass": "QuadClass",
+    "GoldsteinScale_Score": "GoldsteinScale",
+    "Mentions_Count": "NumMentions",
+    "Sources_Count": "NumSources",
+    "Articles_Count": "NumArticles",
+    "Tone_AverageScore": "AvgTone",
+    "Actor1Geo_TypeCode": "Actor1Geo_Type",
+    "Actor1Geo_FullName": "Actor1Geo_FullName",
+    "Actor1Geo_CountryCode": "Actor1Geo_CountryCode",
+    "Actor1Geo_Admin1Code": "Actor1Geo_ADM1Code",
+    "Actor1Geo_Latitude": "Actor1Geo_Lat",
+    "Actor1Geo_Longitude": "Actor1Geo_Long",
+    "Actor1Geo_FeatureID": "Actor1Geo_FeatureID",
+    "Actor2Geo_TypeCode": "Actor2Geo_Type",
+    "Actor2Geo_FullName": "Actor2Geo_FullName",
+    "Actor2Geo_CountryCode": "Actor2Geo_CountryCode",
+    "Actor2Geo_Admin1Code": "Actor2Geo_ADM1Code",
+    "Actor2Geo_Latitude": "Actor2Geo_Lat",
+    "Actor2Geo_Longitude": "Actor2Geo_Long",
+    "Actor2Geo_FeatureID": "Actor2Geo_FeatureID",
+    "ActionGeo_TypeCode": "ActionGeo_Type",
+    "ActionGeo_FullName": "ActionGeo_FullName",
+    "ActionGeo_CountryCode": "ActionGeo_CountryCode",
+    "ActionGeo_Admin1Code": "ActionGeo_ADM1Code",
+    "ActionGeo_Latitude": "ActionGeo_Lat",
+    "ActionGeo_Longitude": "ActionGeo_Long",
+    "ActionGeo_FeatureID": "ActionGeo_FeatureID",
+    "Event_DateAdded": "DATEADDED",
+    "Source_URL": "SOURCEURL",
+}
+
+# Columns of the silver GKG, and the bronze columns they come from (as in `events_gkg.sql`)
+GKG_SILVER_COLUMNS = {
+    "GlobalKnowledgeGraphUUID": "UUID",
+    "RecordDate": "DATE",
+    "ArticleCount": "NUMARTS",
+    "EventCounts": "COUNTS",
+    "Themes": "THEMES",
+    "Locations": "LOCATIONS",
+    "Persons": "PERSONS",
+    "Organizations": "ORGANIZATIONS",
+    "ToneAnalysis": "TONE",
+    "CAMEOEventIDs": "CAMEOEVENTIDS",
+    "SourceIdentifiers": "SOURCES",
+    "SourceURLs": "SOURCEURLS",
+}
+
+
+class SilverTable(NamedTuple):
+    """
+    How a silver table is derived from a bronze table (or view).
+    """
+
+    # The name of the bronze table (or view) the rows come from
+    source_name: str
+    # The columns of the silver table, and the bronze columns they come from
+    columns: Dict[str, str]
+    # The silver column holding the date rows are promoted by
+    date_column: str
+    # The silver column identifying a row across dates, if only its version with the newest
+    # date is kept (bronze keeps a version per date, as dates are part of its keys)
+    key_column: str | None = None
+
+
+# Silver tables, by the bronze table whose newly loaded dates they're promoted from
+SILVER_TABLES: Dict[str, Dict[str, SilverTable]] = {
+    EVENTS_TABLE_NAME: {
+        EVENTS_SILVER_TABLE_NAME: SilverTable(
+            source_name=EVENTS_DECODED_VIEW_NAME,
+            columns=EVENTS_SILVER_COLUMNS,
+            date_column="Event_DateAdded",
+            key_column="GlobalEventID",
+        )
+    },
+    GKG_TABLE_NAME: {
+        GKG_SILVER_TABLE_NAME: SilverTable(
+            source_name=GKG_TABLE_NAME,
+            columns=GKG_SILVER_COLUMNS,
+            date_column="RecordDate",
+        )
+    },
+}
+
+
+def _get_select_sql(silver_table: SilverTable, bronze_schema_name: str) -> str:
+    selects = ",\n    ".join(
+        f'"{source}" AS "{column}"' for column, source in silver_table.columns.items()
+    )
+    return f'SELECT\n    {selects}\nFROM "{bronze_schema_name}"."{silver_table.source_name}"'
+
+
+async def create_silver_tables(
+    database_url: str, schema_name: str = SILVER_SCHEMA_NAME, bronze_schema_name: str = "bronze"
+) -> None:
+    """
+    Asynchronously creates the silver tables that don't exist yet, and indexes them by date.
+
+    Tables are created from the column mappings (so they take the types of the bronze columns),
+    tables created by the DDLs are kept as they are.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        schema_name (str): The name of the silver schema.
+        bronze_schema_name (str): The name of the bronze schema.
+    """
+    engine = get_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema_name}"'))
+        for silver_tables in SILVER_TABLES.values():
+            for table_name, silver_table in silver_tables.items():
+                await conn.execute(
+                    text(
+                        f'CREATE TABLE IF NOT EXISTS "{schema_name}"."{table_name}" AS\n'
+                        f"{_get_select_sql(silver_table, bronze_schema_name)}\nWITH NO DATA"
+                    )
+                )
+                # Promotions replace whole dates, so they must find them without a full scan
+                await conn.execute(
+                    text(
+                        f'CREATE INDEX IF NOT EXISTS "{table_name}_{silver_table.date_column}_idx" '
+                        f'ON "{schema_name}"."{table_name}" ("{silver_table.date_column}")'
+                    )
+                )
+                # And the versions of a row from other dates, without a full scan either
+                if silver_table.key_column is not None:
+                    await conn.execute(
+                        text(
+                            "CREATE INDEX IF NOT EXISTS "
+                            f'"{table_name}_{silver_table.key_column}_idx" '
+                            f'ON "{schema_name}"."{table_name}" ("{silver_table.key_column}")'
+                        )
+                    )
+
+
+async def promote_date_to_silver(
+    database_url: str,
+    bronze_table_name: str,
+    value: int,
+    schema_name: str = SILVER_SCHEMA_NAME,
+    bronze_schema_name: str = "bronze",
+) -> Dict[str, int]:
+    """
+    Asynchronously promotes the rows of a bronze table for a single date to its silver tables.
+
+    The silver rows of the date are replaced with a set-based `DELETE` and `INSERT ... SELECT`
+    in a single transaction, so promoting a date again (e.g. after it was reprocessed) doesn't
+    duplicate rows, and readers never see it half promoted. The bronze rows are read from the
+    date's partition only.
+
+    For silver tables with a key column (e.g. the events), a row that bronze has for several
+    dates is only kept from the newest one: rows with a newer version in silver are skipped, and
+    older versions from other dates are deleted. Promotions of such a table are serialized (with
+    an advisory lock), so that concurrent promotions of different dates can't both keep theirs.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        bronze_table_name (str): The name of the bronze table that was loaded.
+        value (int): The date to promote, as stored in bronze (e.g. `20240101`).
+        schema_name (str): The name of the silver schema.
+        bronze_schema_name (str): The name of the bronze schema.
+
+    Returns:
+        Dict[str, int]: The number of rows promoted, by silver table.
+    """
+    partition_column = PARTITION_COLUMNS[bronze_table_name]
+    row_counts = {}
+    engine = get_engine(database_url)
+    async with engine.begin() as conn:
+        for table_name, silver_table in SILVER_TABLES.get(bronze_table_name, {}).items():
+            table = f'"{schema_name}"."{table_name}"'
+            columns = ", ".join(f'"{column}"' for column in silver_table.columns)
+            date_column, key_column = silver_table.date_column, silver_table.key_column
+            newer_filter = ""
+            if key_column is not None:
+                await conn.execute(
+                    text("SELECT pg_advisory_xact_lock(hashtext(:table))"),
+                    {"table": f"{schema_name}.{table_name}"},
+                )
+                source = f'"{bronze_schema_name}"."{silver_table.source_name}"'
+                source_key = silver_table.columns[key_column]
+                newer_filter = (
+                    f"\nAND NOT EXISTS (SELECT FROM {table} AS newer "
+                    f'WHERE newer."{key_column}" = {source}."{source_key}" '
+                    f'AND newer."{date_column}" > :value)'
+                )
+            await conn.execute(
+                text(f'DELETE FROM {table} WHERE "{date_column}" = :value'),
+                {"value": value},
+            )
+            result = await conn.execute(
+                text(
+                    f"INSERT INTO {table} ({columns})\n"
+                    f"{_get_select_sql(silver_table, bronze_schema_name)}\n"
+                    f'WHERE "{partition_column}" = :value{newer_filter}'
+                ),
+                {"value": value},
+            )
+            row_counts[table_name] = result.rowcount
+            if key_column is not None:
+                await conn.execute(
+                    text(
+                        f"DELETE FROM {table} AS older USING {table} AS promoted "
+                        f'WHERE promoted."{date_column}" = :value '
+                        f'AND older."{key_column}" = promoted."{key_column}" '
+                        f'AND older."{date_column}" < :value'
+                    ),
+                    {"value": value},
+                )
+    return row_counts
+
+
+async def promote_to_silver(
+    database_url: str, bronze_table_names: List[str], values: List[int]
+) -> Dict[str, int]:
+    """
+    Asynchronously promotes the rows of some bronze tables for some dates to the silver tables.
+
+    Each date is promoted in its own transaction (see `promote_date_to_silver`), so the cost of
+    a refresh is proportional to the dates that were loaded, not to the whole history.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        bronze_table_names (List[str]): The names of the bronze tables that were loaded.
+        values (List[int]): The dates to promote, as stored in bronze (e.g. `20240101`).
+
+    Returns:
+        Dict[str, int]: The total number of rows promoted, by silver table.
+    """
+    row_counts: Dict[str, int] = {}
+    for bronze_table_name in bronze_table_names:
+        for value in values:
+            promoted = await promote_date_to_silver(
+                database_url=database_url, bronze_table_name=bronze_table_name, value=value
+            )
+            for table_name, row_count in promoted.items():
+                row_counts[table_name] = row_counts.get(table_name, 0) + row_count
+    return row_counts
@@ -1,11 +1,162 @@
 # -*- coding: utf-8 -*-
 import asyncio
+from enum import Enum
+from time import perf_counter
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Tuple,
+)
+from uuid import uuid4
+from weakref import WeakKeyDictionary
 
+import pandas as pd
 from pandas.io.parsers.readers import TextFileReader
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
-from .bronze import EVENTS_TABLE_NAME, GKG_TABLE_NAME
+from ..metrics import measure
+from .batching import AdaptiveBatchSizer, get_batch_sizer, rebatch
+from .bronze import (
+    EVENT_CODE_DIMENSIONS,
+    EVENTS_DECODED_VIEW_NAME,
+    EVENTS_TABLE_NAME,
+    GKG,
+    GKG_TABLE_NAME,
+    PARTITION_COLUMNS,
+    Base,
+    Events,
+)
+from .dimensions import get_decoded_view_sql, get_dimension_encoder
+from .partitions import (
+    create_detached_partition,
+    ensure_partitions,
+    get_partition_values,
+    swap_partition,
+)
+
+
+class WritePolicy(str, Enum):
+    """
+    Enum that represents how batches written in parallel are committed.
+    """
+
+    # Each batch is committed on its own, in whichever order the writers finish them
+    PER_BATCH = "per_batch"
+    # Batches are committed to a staging table, then moved to the target in a single transaction
+    ATOMIC = "atomic"
+    # Each batch is committed on its own, merged into the target by primary key, so that rows
+    # that were already loaded (e.g. by a previous attempt) are updated instead of failing
+    UPSERT = "upsert"
+    # Batches are merged into a detached copy of a single partition, which then replaces the
+    # partition in a single transaction
+    REPLACE_PARTITION = "replace_partition"
+
+
+# Shared engines, by event loop and database URL (asyncpg connections can't be used across loops)
+_ENGINES: "WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncEngine]]" = (
+    WeakKeyDictionary()
+)
+# Writers allowed to hold a connection of each shared engine at once, by event loop and database
+# URL, so that concurrent loads wait for each other's writers instead of timing out on the pool
+_WRITER_SLOTS: "WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    WeakKeyDictionary()
+)
+# Connections of each engine left to the short operations around writes (e.g. swapping
+# partitions or recording the manifest), which aren't bound by the writer slots
+RESERVED_CONNECTIONS = 2
+
+
+def get_engine(
+    database_url: str,
+    pool_size: int = 10,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    pool_recycle: int = 3600,
+    statement_cache_size: int = 1024,
+) -> AsyncEngine:
+    """
+    Returns the engine shared by all operations on a database in the current event loop.
+
+    Engines own a pool of connections, so sharing them avoids opening (and authenticating) new
+    connections for every operation.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        pool_size (int): The number of connections kept open in the pool.
+        max_overflow (int): The number of extra connections allowed when the pool is exhausted.
+            Together with `pool_size`, it also sets how many writers can load batches at once
+            (see `get_writer_slots`).
+        pool_timeout (float): How long to wait for a connection when the pool is exhausted,
+            in seconds.
+        pool_recycle (int): The maximum age of pooled connections, in seconds.
+        statement_cache_size (int): The size of asyncpg's prepared statement cache, per
+            connection.
+
+    Returns:
+        AsyncEngine: The shared engine. Options are only used when it's created.
+    """
+    engines = _ENGINES.setdefault(asyncio.get_running_loop(), {})
+    engine = engines.get(database_url)
+    if engine is None:
+        engine = create_async_engine(
+            database_url,
+            echo=False,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=True,
+            connect_args={"statement_cache_size": statement_cache_size},
+        )
+        engines[database_url] = engine
+        _WRITER_SLOTS.setdefault(asyncio.get_running_loop(), {})[database_url] = asyncio.Semaphore(
+            max(pool_size + max_overflow - RESERVED_CONNECTIONS, 1)
+        )
+    return engine
+
+
+def get_writer_slots(database_url: str) -> asyncio.Semaphore:
+    """
+    Returns the semaphore that bounds the writers holding a connection of the shared engine.
+
+    Writers of all the loads running in the event loop (e.g. of several dates, each with
+    writers for several tables) share the pool, so each one takes a slot before taking a
+    connection. Writers beyond the pool capacity (less `RESERVED_CONNECTIONS`) wait for a slot
+    for as long as needed, rather than failing once the pool timeout expires.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+
+    Returns:
+        asyncio.Semaphore: The writer slots of the engine.
+    """
+    get_engine(database_url)
+    return _WRITER_SLOTS[asyncio.get_running_loop()][database_url]
+
+
+async def dispose_engines(database_url: str | None = None) -> None:
+    """
+    Gracefully closes the shared engines of the current event loop and their connections.
+
+    Args:
+        database_url (str | None): The URL of the database whose engine should be closed. If
+            None, all engines are closed.
+    """
+    engines = _ENGINES.get(asyncio.get_running_loop(), {})
+    urls = [database_url] if database_url is not None else list(engines)
+    writer_slots = _WRITER_SLOTS.get(asyncio.get_running_loop(), {})
+    for url in urls:
+        engine = engines.pop(url, None)
+        writer_slots.pop(url, None)
+        if engine is not None:
+            await engine.dispose()
 
 
 async def create_schema_if_not_exists(database_url: str, schema_name: str):
@@ -16,8 +167,8 @@ async def create_schema_if_not_exists(database_url: str, schema_name: str):
         database_url (str): The URL of the PostgreSQL database.
         schema_name (str): The name of the schema to create.
     """
-    # Create the SQLAlchemy engine
-    engine = create_async_engine(database_url, echo=False)
+    # Get the shared SQLAlchemy engine
+    engine = get_engine(database_url)
 
     # Create a session for async operations
     async with engine.begin() as conn:
@@ -26,9 +177,6 @@ async def create_schema_if_not_exists(database_url: str, schema_name: str):
             lambda sync_conn: sync_conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema_name}"))
         )
 
-    # Close the engine
-    await engine.dispose()
-
 
 async def create_tables_if_not_exist(database_url: str, declarative_base: object):
     """
@@ -38,16 +186,36 @@ async def create_tables_if_not_exist(database_url: str, declarative_base: object
         database_url (str): The URL of the PostgreSQL database.
         declarative_base (object): The declarative base object containing the table definitions.
     """
-    # Create the SQLAlchemy engine
-    engine = create_async_engine(database_url, echo=False)
+    # Get the shared SQLAlchemy engine
+    engine = get_engine(database_url)
 
     # Create a session for async operations
     async with engine.begin() as conn:
         # Create the tables if they do not exist
         await conn.run_sync(declarative_base.metadata.create_all)
 
-    # Close the engine
-    await engine.dispose()
+
+async def create_events_decoded_view(database_url: str):
+    """
+    Asynchronously creates (or updates) the view of the bronze events with codes instead of keys.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+    """
+    # Get the shared SQLAlchemy engine
+    engine = get_engine(database_url)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                get_decoded_view_sql(
+                    view_name=EVENTS_DECODED_VIEW_NAME,
+                    table_name=EVENTS_TABLE_NAME,
+                    columns=[column.name for column in Events.__table__.columns],
+                    dimensions=EVENT_CODE_DIMENSIONS,
+                )
+            )
+        )
 
 
 async def df_to_postgres(
@@ -67,8 +235,8 @@ async def df_to_postgres(
         schema_name (str): The name of the schema containing the table.
         if_exists (str): Behavior when the table already exists: 'replace', 'append', 'fail'.
     """
-    # Create the SQLAlchemy engine
-    engine = create_async_engine(database_url, echo=False)
+    # Get the shared SQLAlchemy engine
+    engine = get_engine(database_url)
 
     # Create a session for async operations
     async with engine.begin() as conn:
@@ -84,32 +252,433 @@ async def df_to_postgres(
                 )
             )
 
-    # Close the engine
-    await engine.dispose()
 
+def batch_to_records(batch: Any) -> Tuple[List[str], List[tuple]]:
+    """
+    Converts a batch of rows into column names and records of native Python values.
 
-async def load_dataframes_to_bronze(
-    df_events_reader: TextFileReader, df_gkg_reader: TextFileReader, database_url: str
+    Args:
+        batch (Any): A DataFrame or an Arrow record batch or table.
+
+    Returns:
+        Tuple[List[str], List[tuple]]: The column names and the records, with nulls as None.
+    """
+    if isinstance(batch, pd.DataFrame):
+        values = batch.astype(object).where(batch.notna(), None)
+        return list(batch.columns), list(values.itertuples(index=False, name=None))
+    # Otherwise, assume it's an Arrow record batch or table
+    data = batch.to_pydict()
+    return list(data.keys()), list(zip(*data.values()))
+
+
+async def df_to_postgres_copy(
+    df_reader: Iterable[Any],
+    table_name: str,
+    database_url: str,
+    schema_name: str = "public",
 ):
+    """
+    Asynchronously bulk loads batches of rows into a PostgreSQL table using `COPY`.
+
+    The rows are sent with asyncpg's binary `COPY` protocol, which is much faster than
+    parameterized `INSERT` statements. All batches are loaded in a single transaction.
+
+    Args:
+        df_reader (Iterable[Any]): The batches to load: DataFrames (e.g. from a `TextFileReader`)
+            or Arrow record batches. A single DataFrame is also accepted.
+        table_name (str): The name of the table to load the data into.
+        database_url (str): The URL of the PostgreSQL database.
+        schema_name (str): The name of the schema containing the table.
+    """
+    if isinstance(df_reader, pd.DataFrame):
+        df_reader = [df_reader]
+
+    # Get the shared SQLAlchemy engine
+    engine = get_engine(database_url)
+
+    async with engine.connect() as conn:
+        # COPY is only available on the asyncpg connection itself
+        raw_conn = await conn.get_raw_connection()
+        driver_conn = raw_conn.driver_connection
+        async with driver_conn.transaction():
+            for batch in df_reader:
+                await _copy_batch(driver_conn, batch, table_name, schema_name)
+
+
+async def _copy_batch(driver_conn: Any, batch: Any, table_name: str, schema_name: str) -> int:
+    with measure("cast") as values:
+        columns, records = batch_to_records(batch)
+        values["rows"] = len(records)
+    if records:
+        await driver_conn.copy_records_to_table(
+            table_name,
+            records=records,
+            columns=columns,
+            schema_name=schema_name,
+        )
+    return len(records)
+
+
+async def _merge_batch(
+    driver_conn: Any,
+    batch: Any,
+    table_name: str,
+    schema_name: str,
+    key_columns: List[str],
+    version_column: str | None = None,
+    parent_name: str | None = None,
+) -> int:
+    with measure("cast") as values:
+        columns, records = batch_to_records(batch)
+        values["rows"] = len(records)
+    if not records:
+        return 0
+
+    # Rows are copied into a session-private staging table, emptied on every commit. It's
+    # modeled on the parent table when merging into a detached partition (named uniquely for
+    # each load), so that every load on a connection reuses the same staging table
+    staging_name = f"_staging_{parent_name or table_name}"
+    await driver_conn.execute(
+        f'CREATE TEMPORARY TABLE IF NOT EXISTS "{staging_name}" '
+        f'(LIKE "{schema_name}"."{parent_name or table_name}" INCLUDING DEFAULTS) '
+        "ON COMMIT DELETE ROWS"
+    )
+    await driver_conn.copy_records_to_table(staging_name, records=records, columns=columns)
+
+    # Then merged into the target, keeping only the newest version of each key
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    key_list = ", ".join(f'"{column}"' for column in key_columns)
+    order_by = f'ORDER BY {key_list}, "{version_column}" DESC' if version_column else ""
+    if version_column:
+        updates = ", ".join(
+            f'"{column}" = EXCLUDED."{column}"' for column in columns if column not in key_columns
+        )
+        on_conflict = (
+            f"DO UPDATE SET {updates} "
+            f'WHERE "{table_name}"."{version_column}" <= EXCLUDED."{version_column}"'
+        )
+    else:
+        on_conflict = "DO NOTHING"
+    await driver_conn.execute(
+        f'INSERT INTO "{schema_name}"."{table_name}" ({column_list}) '
+        f'SELECT DISTINCT ON ({key_list}) {column_list} FROM "{staging_name}" {order_by} '
+        f"ON CONFLICT ({key_list}) {on_conflict}"
+    )
+    return len(records)
+
+
+async def _iter_batches(df_reader: Any) -> AsyncIterator[Any]:
+    if isinstance(df_reader, pd.DataFrame):
+        yield df_reader
+    elif hasattr(df_reader, "__aiter__"):
+        async for batch in df_reader:
+            yield batch
+    else:
+        # Reading the next batch may block (e.g. parsing a CSV chunk), so it runs in a thread
+        iterator = iter(df_reader)
+        done = object()
+        while (batch := await asyncio.to_thread(next, iterator, done)) is not done:
+            yield batch
+
+
+async def _run_until_first_error(*coros: Coroutine) -> List[Any]:
+    # Like `asyncio.gather`, but cancels the remaining tasks as soon as one of them fails
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    for task in done:
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+    return [task.result() for task in tasks]
+
+
+async def write_batches_parallel(
+    df_reader: Any,
+    table_name: str,
+    database_url: str,
+    schema_name: str = "public",
+    concurrency: int = 4,
+    queue_size: int | None = None,
+    policy: WritePolicy = WritePolicy.PER_BATCH,
+    key_columns: List[str] | None = None,
+    version_column: str | None = None,
+    partition_column: str | None = None,
+    partition_value: int | None = None,
+    encode: Callable[[Any, Any], Awaitable[Any]] | None = None,
+    batch_sizer: AdaptiveBatchSizer | None = None,
+) -> int:
+    """
+    Asynchronously loads batches of rows into a PostgreSQL table over several connections.
+
+    Batches are read by a single producer into a bounded queue and written with `COPY` by
+    `concurrency` writers, each on its own pooled connection, so reading and writing overlap and
+    the database gets several backends to work with. The queue bounds how far reading can get
+    ahead of writing. With a batch sizer, the batches read are split and merged into batches of
+    the size it gives, and it's told how long each of them took to commit.
+
+    Args:
+        df_reader (Any): The batches to load: a (sync or async) iterable of DataFrames or Arrow
+            record batches. A single DataFrame is also accepted.
+        table_name (str): The name of the table to load the data into.
+        database_url (str): The URL of the PostgreSQL database.
+        schema_name (str): The name of the schema containing the table.
+        concurrency (int): The number of parallel writers. Writers take a connection only once
+            they get one of the engine's writer slots (see `get_writer_slots`), so the writers
+            of concurrent loads never exhaust the pool.
+        queue_size (int | None): The maximum number of batches waiting to be written. Defaults to
+            twice the number of writers.
+        policy (WritePolicy): How batches are committed. With `PER_BATCH`, a failure leaves the
+            batches committed so far in the table; with `ATOMIC`, either all rows are loaded or
+            none are; with `UPSERT`, batches are committed one at a time but can be loaded again
+            without conflicts; with `REPLACE_PARTITION`, the rows replace the whole partition
+            for `partition_value` at once.
+        key_columns (List[str] | None): The primary key of the table. Required for `UPSERT` and
+            `REPLACE_PARTITION`.
+        version_column (str | None): With `UPSERT` and `REPLACE_PARTITION`, the column that
+            tells which version of a row is the newest. The newest version wins on conflicts; if
+            not provided, conflicting rows are left as they are.
+        partition_column (str | None): The column the table is range partitioned by, if any.
+            Missing partitions are created as batches are written.
+        partition_value (int | None): With `REPLACE_PARTITION`, the value of the partition to
+            replace. All rows must belong to it.
+        encode (Callable[[Any, Any], Awaitable[Any]] | None): A coroutine function applied to
+            each batch (with the writer's asyncpg connection) before it's written, e.g.
+            `DimensionEncoder.encode`.
+        batch_sizer (AdaptiveBatchSizer | None): The sizer of the batches written. If None,
+            batches are written as they're read.
+
+    Returns:
+        int: The number of rows loaded.
+    """
+    if policy == WritePolicy.UPSERT and not key_columns:
+        raise ValueError("The key columns are required to upsert batches.")
+    if policy == WritePolicy.REPLACE_PARTITION and (
+        not key_columns or partition_column is None or partition_value is None
+    ):
+        raise ValueError(
+            "The key columns and the partition to replace are required to replace a partition."
+        )
+
+    engine = get_engine(database_url)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or 2 * concurrency)
+
+    # With the atomic policy, writers load into an unlogged copy of the table
+    target_name = table_name
+    if policy == WritePolicy.ATOMIC:
+        target_name = f"{table_name}_staging_{uuid4().hex[:8]}"
+        async with engine.begin() as conn:
+            await conn.execute(
+                text(
+                    f'CREATE UNLOGGED TABLE "{schema_name}"."{target_name}" '
+                    f'(LIKE "{schema_name}"."{table_name}" INCLUDING DEFAULTS)'
+                )
+            )
+    # With the partition replacement policy, they load into a detached copy of the partition
+    elif policy == WritePolicy.REPLACE_PARTITION:
+        async with engine.connect() as conn:
+            raw_conn = await conn.get_raw_connection()
+            target_name = await create_detached_partition(
+                raw_conn.driver_connection,
+                schema_name,
+                table_name,
+                column=partition_column,
+                value=partition_value,
+                key_columns=key_columns,
+            )
+
+    async def produce() -> int:
+        batches = _iter_batches(df_reader)
+        if batch_sizer is not None:
+            batches = rebatch(batches, batch_sizer)
+        async for batch in batches:
+            await queue.put(batch)
+        for _ in range(concurrency):
+            await queue.put(None)
+        return 0
+
+    async def write() -> int:
+        rows = 0
+        async with get_writer_slots(database_url), engine.connect() as conn:
+            raw_conn = await conn.get_raw_connection()
+            driver_conn = raw_conn.driver_connection
+            while (batch := await queue.get()) is not None:
+                # Batches are sized before they're encoded, so they're measured as they come
+                nbytes = batch.nbytes if batch_sizer is not None else 0
+                if encode is not None:
+                    with measure("encode") as values:
+                        batch = await encode(driver_conn, batch)
+                        values["rows"] = len(batch)
+                # Partitions can't be created in the middle of a COPY, so they're created first
+                if partition_column is not None and policy != WritePolicy.REPLACE_PARTITION:
+                    await ensure_partitions(
+                        driver_conn,
+                        schema_name,
+                        table_name,
+                        get_partition_values(batch, partition_column),
+                    )
+                # Writing includes casting the batch, which is also measured on its own
+                started_at = perf_counter()
+                with measure("write") as values:
+                    async with driver_conn.transaction():
+                        if policy in (WritePolicy.UPSERT, WritePolicy.REPLACE_PARTITION):
+                            values["rows"] = await _merge_batch(
+                                driver_conn,
+                                batch,
+                                target_name,
+                                schema_name,
+                                key_columns=key_columns,
+                                version_column=version_column,
+                                parent_name=table_name,
+                            )
+                        else:
+                            values["rows"] = await _copy_batch(
+                                driver_conn, batch, target_name, schema_name
+                            )
+                    values["bytes"] = nbytes
+                if batch_sizer is not None:
+                    batch_sizer.observe_commit(nbytes, perf_counter() - started_at)
+                rows += values["rows"]
+        return rows
+
+    try:
+        results = await _run_until_first_error(produce(), *[write() for _ in range(concurrency)])
+        if policy == WritePolicy.ATOMIC:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text(
+                        f'INSERT INTO "{schema_name}"."{table_name}" '
+                        f'SELECT * FROM "{schema_name}"."{target_name}"'
+                    )
+                )
+        elif policy == WritePolicy.REPLACE_PARTITION:
+            async with engine.connect() as conn:
+                raw_conn = await conn.get_raw_connection()
+                await swap_partition(
+                    raw_conn.driver_connection,
+                    schema_name,
+                    table_name,
+                    target_name,
+                    value=partition_value,
+                )
+    finally:
+        if policy in (WritePolicy.ATOMIC, WritePolicy.REPLACE_PARTITION):
+            async with engine.begin() as conn:
+                await conn.execute(text(f'DROP TABLE IF EXISTS "{schema_name}"."{target_name}"'))
+
+    return sum(results)
+
+
+async def load_dataframes_to_bronze(
+    df_events_reader: Iterable[Any] | None,
+    df_gkg_reader: Iterable[Any] | None,
+    database_url: str,
+    concurrency: int = 4,
+    policy: WritePolicy = WritePolicy.UPSERT,
+    partition_value: int | None = None,
+    df_gkg_derived_readers: Dict[str, Iterable[Any]] | None = None,
+    adaptive_batches: bool = True,
+    batch_target_seconds: float = 2.0,
+) -> Tuple[int, int]:
     """
     Asynchronously loads the DataFrames into bronze tables in the PostgreSQL database.
 
+    The code columns of the events are replaced with keys into their dimension tables (see
+    `bronze.EVENT_CODE_DIMENSIONS`) as they're loaded.
+
     Args:
-        df_events_reader (TextFileReader): The reader for the events DataFrame.
-        df_gkg_reader (TextFileReader): The reader for the GKG DataFrame.
+        df_events_reader (Iterable[Any] | None): The batches of the events DataFrame. If None,
+            the events table is left untouched (even when replacing partitions).
+        df_gkg_reader (Iterable[Any] | None): The batches of the GKG DataFrame. If None, the
+            GKG table is left untouched.
         database_url (str): The URL of the PostgreSQL database.
+        concurrency (int): The number of parallel writers for each table.
+        policy (WritePolicy): How the batches are committed. When upserting, rows that were
+            already loaded are left as they are. Events are keyed by `GlobalEventID` and
+            `DATEADDED` (the partition key), so an event added again on a later date is kept
+            once per date in bronze; silver only keeps its newest version (see
+            `silver.promote_date_to_silver`).
+        partition_value (int | None): With `REPLACE_PARTITION`, the date (`YYYYMMDD`) of the
+            partitions to replace.
+        df_gkg_derived_readers (Dict[str, Iterable[Any]] | None): The batches of the tables
+            derived from the GKG (see `gkg.GKG_DERIVED_TABLES`), by table name. These tables
+            are small next to the GKG, so each one is loaded by a single writer.
+        adaptive_batches (bool): Whether to size the batches written to each table by bytes,
+            adapting to how fast the database commits them (see `AdaptiveBatchSizer`). Sizes
+            are shared by all the loads into a table in this process, so they converge across
+            dates. If False, batches are written as they're read.
+        batch_target_seconds (float): With adaptive batches, the longest a commit should take
+            (only used the first time a table is loaded in this process).
+
+    Returns:
+        Tuple[int, int]: The number of rows loaded into the events and GKG tables, respectively.
     """
-    df_events_task = df_to_postgres(
-        df_reader=df_events_reader,
-        table_name=EVENTS_TABLE_NAME,
-        database_url=database_url,
-        schema_name="bronze",
+
+    def get_sizer(table_name: str) -> AdaptiveBatchSizer | None:
+        if not adaptive_batches:
+            return None
+        return get_batch_sizer(
+            database_url, "bronze", table_name, target_seconds=batch_target_seconds
+        )
+
+    async def skip() -> int:
+        return 0
+
+    # Tables without batches are skipped, as replacing their partitions would empty them
+    df_events_task = (
+        skip()
+        if df_events_reader is None
+        else write_batches_parallel(
+            df_reader=df_events_reader,
+            table_name=EVENTS_TABLE_NAME,
+            database_url=database_url,
+            schema_name="bronze",
+            concurrency=concurrency,
+            policy=policy,
+            key_columns=[column.name for column in Events.__table__.primary_key],
+            partition_column=PARTITION_COLUMNS[EVENTS_TABLE_NAME],
+            partition_value=partition_value,
+            encode=get_dimension_encoder(database_url, EVENT_CODE_DIMENSIONS).encode,
+            batch_sizer=get_sizer(EVENTS_TABLE_NAME),
+        )
     )
-    df_gkg_task = df_to_postgres(
-        df_reader=df_gkg_reader,
-        table_name=GKG_TABLE_NAME,
-        database_url=database_url,
-        schema_name="bronze",
+    df_gkg_task = (
+        skip()
+        if df_gkg_reader is None
+        else write_batches_parallel(
+            df_reader=df_gkg_reader,
+            table_name=GKG_TABLE_NAME,
+            database_url=database_url,
+            schema_name="bronze",
+            concurrency=concurrency,
+            policy=policy,
+            key_columns=[column.name for column in GKG.__table__.primary_key],
+            partition_column=PARTITION_COLUMNS[GKG_TABLE_NAME],
+            partition_value=partition_value,
+            batch_sizer=get_sizer(GKG_TABLE_NAME),
+        )
     )
 
-    await asyncio.gather(df_events_task, df_gkg_task)
+    tasks = [df_events_task, df_gkg_task]
+    for table_name, df_reader in (df_gkg_derived_readers or {}).items():
+        table = Base.metadata.tables[f"bronze.{table_name}"]
+        tasks.append(
+            write_batches_parallel(
+                df_reader=df_reader,
+                table_name=table_name,
+                database_url=database_url,
+                schema_name="bronze",
+                concurrency=1,
+                policy=policy,
+                key_columns=[column.name for column in table.primary_key],
+                partition_column=PARTITION_COLUMNS[table_name],
+                partition_value=partition_value,
+                batch_sizer=get_sizer(table_name),
+            )
+        )
+
+    events_rows, gkg_rows, *_ = await asyncio.gather(*tasks)
+    return events_rows, gkg_rows
@@ -1,14 +1,44 @@
 # -*- coding: utf-8 -*-
 import asyncio
-from datetime import datetime
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta
 from enum import Enum
+from io import BytesIO
+from os import getenv
 from pathlib import Path
-from typing import Tuple
+from time import monotonic, perf_counter
+from typing import AsyncIterator, Deque, Dict, List, Tuple
 from uuid import uuid4
+from weakref import WeakKeyDictionary
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from aiohttp import ClientResponseError
+from minerva_elders.base.cache import ArchiveCache
 from minerva_elders.base.db.utils import load_dataframes_to_bronze
-from minerva_elders.base.io import clear_directory, download_file, unzip_file
+from minerva_elders.base.executor import (
+    dataframe_from_ipc,
+    dataframe_to_ipc,
+    run_in_executor,
+)
+from minerva_elders.base.gkg import get_gkg_tone
+from minerva_elders.base.io import (
+    HTTPClient,
+    MemoryBudget,
+    clear_directory,
+    download_file,
+    get_http_client,
+    iter_line_blocks,
+    iter_unzipped_chunks,
+    iter_url_chunks,
+    unzip_file,
+)
+from minerva_elders.base.metrics import collect_metrics, measure, record
+from pandas.api.types import union_categoricals
 
 
 class GDELTFileType(str, Enum):
@@ -18,6 +48,19 @@ class GDELTFileType(str, Enum):
 
     EVENTS = "events"
     GKG = "gkg"
+    # GDELT 2.0 events, exported every 15 minutes
+    EVENTS_15MIN = "events_15min"
+
+
+# Types of the daily (GDELT 1.0) files
+DAILY_FILE_TYPES = (GDELTFileType.EVENTS, GDELTFileType.GKG)
+
+# Environment variable that overrides where GDELT files are downloaded from (e.g. a stub server)
+GDELT_BASE_URL_ENV_VAR = "GDELT_BASE_URL"
+DEFAULT_GDELT_BASE_URL = "http://data.gdeltproject.org"
+
+# How often GDELT 2.0 exports a new file
+GDELT_MICROBATCH_INTERVAL = timedelta(minutes=15)
 
 
 GDELT_FILE_TYPE_COLUMNS = {
@@ -29,28 +72,28 @@ GDELT_FILE_TYPE_COLUMNS = {
         "FractionDate": "Float64",
         "Actor1Code": str,
         "Actor1Name": str,
-        "Actor1CountryCode": str,
-        "Actor1KnownGroupCode": str,
-        "Actor1EthnicCode": str,
-        "Actor1Religion1Code": str,
-        "Actor1Religion2Code": str,
-        "Actor1Type1Code": str,
-        "Actor1Type2Code": str,
-        "Actor1Type3Code": str,
+        "Actor1CountryCode": "category",
+        "Actor1KnownGroupCode": "category",
+        "Actor1EthnicCode": "category",
+        "Actor1Religion1Code": "category",
+        "Actor1Religion2Code": "category",
+        "Actor1Type1Code": "category",
+        "Actor1Type2Code": "category",
+        "Actor1Type3Code": "category",
         "Actor2Code": str,
         "Actor2Name": str,
-        "Actor2CountryCode": str,
-        "Actor2KnownGroupCode": str,
-        "Actor2EthnicCode": str,
-        "Actor2Religion1Code": str,
-        "Actor2Religion2Code": str,
-        "Actor2Type1Code": str,
-        "Actor2Type2Code": str,
-        "Actor2Type3Code": str,
+        "Actor2CountryCode": "category",
+        "Actor2KnownGroupCode": "category",
+        "Actor2EthnicCode": "category",
+        "Actor2Religion1Code": "category",
+        "Actor2Religion2Code": "category",
+        "Actor2Type1Code": "category",
+        "Actor2Type2Code": "category",
+        "Actor2Type3Code": "category",
         "IsRootEvent": bool,
-        "EventCode": str,
-        "EventBaseCode": str,
-        "EventRootCode": str,
+        "EventCode": "category",
+        "EventBaseCode": "category",
+        "EventRootCode": "category",
         "QuadClass": "Int32",
         "GoldsteinScale": "Float64",
         "NumMentions": "Int32",
@@ -59,21 +102,21 @@ GDELT_FILE_TYPE_COLUMNS = {
         "AvgTone": "Float64",
         "Actor1Geo_Type": "Int32",
         "Actor1Geo_FullName": str,
-        "Actor1Geo_CountryCode": str,
+        "Actor1Geo_CountryCode": "category",
         "Actor1Geo_ADM1Code": str,
         "Actor1Geo_Lat": "Float64",
         "Actor1Geo_Long": "Float64",
         "Actor1Geo_FeatureID": str,
         "Actor2Geo_Type": "Int32",
         "Actor2Geo_FullName": str,
-        "Actor2Geo_CountryCode": str,
+        "Actor2Geo_CountryCode": "category",
         "Actor2Geo_ADM1Code": str,
         "Actor2Geo_Lat": "Float64",
         "Actor2Geo_Long": "Float64",
         "Actor2Geo_FeatureID": str,
         "ActionGeo_Type": "Int32",
         "ActionGeo_FullName": str,
-        "ActionGeo_CountryCode": str,
+        "ActionGeo_CountryCode": "category",
         "ActionGeo_ADM1Code": str,
         "ActionGeo_Lat": "Float64",
         "ActionGeo_Long": "Float64",
@@ -96,27 +139,510 @@ GDELT_FILE_TYPE_COLUMNS = {
     },
 }
 
+# GDELT 2.0 events add an ADM2 code to each location, and add the time to DATEADDED
+GDELT_FILE_TYPE_COLUMNS[GDELTFileType.EVENTS_15MIN] = {
+    column: dtype
+    for name, type_ in GDELT_FILE_TYPE_COLUMNS[GDELTFileType.EVENTS].items()
+    for column, dtype in (
+        [(name, type_), (name.replace("ADM1", "ADM2"), str)]
+        if name.endswith("_ADM1Code")
+        else [(name, "Int64" if name == "DATEADDED" else type_)]
+    )
+}
+
+
+# Arrow types used to parse the columns of GDELT files, by declared type
+GDELT_ARROW_TYPES = {
+    "Int32": pa.int32(),
+    "Int64": pa.int64(),
+    "Float64": pa.float64(),
+    str: pa.string(),
+    bool: pa.bool_(),
+    # Low-cardinality codes are dictionary encoded, and become categoricals in pandas
+    "category": pa.dictionary(pa.int32(), pa.string()),
+}
+
+
+def get_gdelt_arrow_schema(type_: GDELTFileType) -> pa.Schema:
+    """
+    Function that returns the Arrow schema used to parse a GDELT file type.
+
+    Args:
+        type (GDELTFileType): The type of the file.
+
+    Returns:
+        pa.Schema: The schema, with the columns in file order.
+    """
+    if type_ not in GDELT_FILE_TYPE_COLUMNS:
+        raise ValueError(f"Invalid GDELT file type: {type_}")
+    return pa.schema(
+        [
+            (column, GDELT_ARROW_TYPES[dtype])
+            for column, dtype in GDELT_FILE_TYPE_COLUMNS[type_].items()
+        ]
+    )
+
+
+def get_gdelt_base_url() -> str:
+    """
+    Function that returns the base URL GDELT files are downloaded from.
+
+    Returns:
+        str: The value of `GDELT_BASE_URL` if it's set, or GDELT's own server.
+    """
+    return getenv(GDELT_BASE_URL_ENV_VAR, DEFAULT_GDELT_BASE_URL).rstrip("/")
+
 
 def get_gdelt_file_url(date: datetime, type_: GDELTFileType) -> str:
     """
     Function that returns the URL of a GDELT file given a date and a type.
 
     Args:
-        date (datetime): The date of the file.
+        date (datetime): The date of the file. For 15-minute files, the time it was exported.
         type (GDELTFileType): The type of the file.
 
     Returns:
         str: The URL of the file.
     """
+    base_url = get_gdelt_base_url()
     date_str = date.strftime("%Y%m%d")
     if type_ == GDELTFileType.EVENTS:
-        return f"http://data.gdeltproject.org/events/{date_str}.export.CSV.zip"
+        return f"{base_url}/events/{date_str}.export.CSV.zip"
     elif type_ == GDELTFileType.GKG:
-        return f"http://data.gdeltproject.org/gkg/{date_str}.gkg.csv.zip"
+        return f"{base_url}/gkg/{date_str}.gkg.csv.zip"
+    elif type_ == GDELTFileType.EVENTS_15MIN:
+        return f"{base_url}/gdeltv2/{date.strftime('%Y%m%d%H%M%S')}.export.CSV.zip"
     raise ValueError(f"Invalid GDELT file type: {type_}")
 
 
-async def load_gdelt_file(date: datetime, type_: GDELTFileType, clear: bool = True) -> pd.DataFrame:
+def get_gdelt_md5sums_url(type_: GDELTFileType) -> str:
+    """
+    Function that returns the URL of the list of MD5 checksums published for a GDELT file type.
+
+    For 15-minute files, it's the list of the latest files, which has their checksums.
+
+    Args:
+        type (GDELTFileType): The type of the files.
+
+    Returns:
+        str: The URL of the checksum list.
+    """
+    base_url = get_gdelt_base_url()
+    if type_ == GDELTFileType.EVENTS:
+        return f"{base_url}/events/md5sums"
+    elif type_ == GDELTFileType.GKG:
+        return f"{base_url}/gkg/md5sums"
+    elif type_ == GDELTFileType.EVENTS_15MIN:
+        return f"{base_url}/gdeltv2/lastupdate.txt"
+    raise ValueError(f"Invalid GDELT file type: {type_}")
+
+
+# For how long a checksum list is trusted to tell that a file has no checksum, in seconds
+GDELT_MD5SUMS_MAX_AGE_SECONDS = 15 * 60
+
+# Checksums already fetched, by file type and file name, and when each list was last fetched
+_GDELT_MD5SUMS: Dict[GDELTFileType, Dict[str, str]] = {}
+_GDELT_MD5SUMS_FETCHED_AT: Dict[GDELTFileType, float] = {}
+
+# Locks that let a single task fetch each list at a time, per event loop (locks can't be used
+# across loops)
+_GDELT_MD5SUMS_LOCKS: "WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]"
+_GDELT_MD5SUMS_LOCKS = WeakKeyDictionary()
+
+
+def _parse_gdelt_md5sums(content: bytes) -> Dict[str, str]:
+    # Lines are either `<md5> <file name>` (daily lists) or `<size> <md5> <url>` (GDELT 2.0)
+    md5sums = {}
+    for line in content.decode().splitlines():
+        parts = line.split()
+        if len(parts) in (2, 3):
+            md5sums[parts[-1].rsplit("/", 1)[-1]] = parts[-2].lower()
+    return md5sums
+
+
+async def get_gdelt_file_md5(
+    date: datetime, type_: GDELTFileType, client: HTTPClient | None = None
+) -> str | None:
+    """
+    Function that returns the MD5 checksum published by GDELT for a file.
+
+    The checksum list is fetched once per file type, and only fetched again when it doesn't
+    contain the requested file yet and is older than `GDELT_MD5SUMS_MAX_AGE_SECONDS` (so files
+    missing from a fresh list don't fetch it again). Concurrent callers wait for a single fetch.
+
+    Args:
+        date (datetime): The date of the file.
+        type (GDELTFileType): The type of the file.
+        client (HTTPClient | None): The HTTP client to use. Defaults to the shared client.
+
+    Returns:
+        str | None: The checksum of the file, or None if GDELT hasn't published one.
+    """
+    file_name = get_gdelt_file_url(date=date, type_=type_).rsplit("/", 1)[-1]
+    md5sums = _GDELT_MD5SUMS.setdefault(type_, {})
+    if file_name in md5sums:
+        return md5sums[file_name]
+
+    locks = _GDELT_MD5SUMS_LOCKS.setdefault(asyncio.get_running_loop(), {})
+    async with locks.setdefault(type_, asyncio.Lock()):
+        # The list may have been fetched while waiting for the lock
+        fetched_at = _GDELT_MD5SUMS_FETCHED_AT.get(type_)
+        if file_name not in md5sums and (
+            fetched_at is None or monotonic() - fetched_at > GDELT_MD5SUMS_MAX_AGE_SECONDS
+        ):
+            url = get_gdelt_md5sums_url(type_)
+            content = b"".join([chunk async for chunk in iter_url_chunks(url, client=client)])
+            md5sums.update(_parse_gdelt_md5sums(content))
+            _GDELT_MD5SUMS_FETCHED_AT[type_] = monotonic()
+    return md5sums.get(file_name)
+
+
+async def get_gdelt_file_size(
+    date: datetime, type_: GDELTFileType, client: HTTPClient | None = None
+) -> int | None:
+    """
+    Function that returns the size of a GDELT archive, without downloading it.
+
+    Args:
+        date (datetime): The date of the file.
+        type (GDELTFileType): The type of the file.
+        client (HTTPClient | None): The HTTP client to use. Defaults to the shared client.
+
+    Returns:
+        int | None: The size of the archive, in bytes, or None if GDELT doesn't have the file
+        or doesn't tell its size.
+    """
+    client = client or get_http_client()
+    try:
+        return await client.get_content_length(get_gdelt_file_url(date=date, type_=type_))
+    except ClientResponseError as error:
+        if error.status == 404:
+            return None
+        raise
+
+
+async def get_latest_gdelt_microbatch(client: HTTPClient | None = None) -> datetime | None:
+    """
+    Function that returns the time of the latest 15-minute events file exported by GDELT.
+
+    GDELT's list of its latest files is fetched every time, and the checksums it has are kept
+    to validate the files once they're downloaded.
+
+    Args:
+        client (HTTPClient | None): The HTTP client to use. Defaults to the shared client.
+
+    Returns:
+        datetime | None: The time of the latest file, or None if none is listed.
+    """
+    url = get_gdelt_md5sums_url(GDELTFileType.EVENTS_15MIN)
+    content = b"".join([chunk async for chunk in iter_url_chunks(url, client=client)])
+    md5sums = _parse_gdelt_md5sums(content)
+    _GDELT_MD5SUMS.setdefault(GDELTFileType.EVENTS_15MIN, {}).update(md5sums)
+    _GDELT_MD5SUMS_FETCHED_AT[GDELTFileType.EVENTS_15MIN] = monotonic()
+    timestamps = [
+        datetime.strptime(name.split(".", 1)[0], "%Y%m%d%H%M%S")
+        for name in md5sums
+        if name.endswith(".export.CSV.zip")
+    ]
+    return max(timestamps, default=None)
+
+
+def get_gdelt_microbatches(start: datetime, end: datetime) -> List[datetime]:
+    """
+    Function that lists the times of the 15-minute files exported within a period.
+
+    Args:
+        start (datetime): The start of the period. Files exported before it are left out.
+        end (datetime): The end of the period (inclusive).
+
+    Returns:
+        List[datetime]: The times of the files, in order.
+    """
+    # Round the start up to the next export
+    midnight = datetime.combine(start.date(), datetime.min.time())
+    microbatch = midnight + -(-(start - midnight) // GDELT_MICROBATCH_INTERVAL) * (
+        GDELT_MICROBATCH_INTERVAL
+    )
+    microbatches = []
+    while microbatch <= end:
+        microbatches.append(microbatch)
+        microbatch += GDELT_MICROBATCH_INTERVAL
+    return microbatches
+
+
+async def iter_gdelt_archive_chunks(
+    date: datetime,
+    type_: GDELTFileType,
+    client: HTTPClient | None = None,
+    cache: ArchiveCache | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Function that iterates over the raw bytes of a GDELT archive.
+
+    When a cache is provided, cached archives are read from disk without touching the network,
+    and downloaded archives are validated against GDELT's checksums and added to the cache.
+
+    Args:
+        date (datetime): The date of the file.
+        type (GDELTFileType): The type of the file.
+        client (HTTPClient | None): The HTTP client to use. Defaults to the shared client.
+        cache (ArchiveCache | None): The cache of raw archives, if any.
+
+    Yields:
+        bytes: The chunks of the archive.
+    """
+    url = get_gdelt_file_url(date=date, type_=type_)
+    if cache is None:
+        chunks = iter_url_chunks(url, client=client)
+    elif cache.get(url) is not None:
+        chunks = cache.iter_chunks(url)
+    else:
+        expected_md5 = await get_gdelt_file_md5(date=date, type_=type_, client=client)
+        chunks = cache.iter_chunks(url, client=client, expected_md5=expected_md5)
+    # Only the time spent waiting for the bytes counts as downloading, as the consumer's time
+    # between chunks is measured by its own stages
+    seconds, nbytes = 0.0, 0
+    try:
+        while True:
+            started_at = perf_counter()
+            chunk = await anext(chunks, None)
+            seconds += perf_counter() - started_at
+            if chunk is None:
+                break
+            nbytes += len(chunk)
+            yield chunk
+    finally:
+        record("download", seconds=seconds, bytes=nbytes)
+
+
+def _get_pandas_type(type_: pa.DataType) -> pd.api.extensions.ExtensionDtype | None:
+    # Dictionary columns are left to the default conversion, which makes them categoricals
+    return None if pa.types.is_dictionary(type_) else pd.ArrowDtype(type_)
+
+
+def concat_gdelt_dataframes(dfs: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Function that concatenates DataFrames parsed from the same GDELT file type.
+
+    Each DataFrame has its own categories, so categorical columns are combined with
+    `union_categoricals` instead of being turned into strings by `pd.concat`.
+
+    Args:
+        dfs (List[pd.DataFrame]): The DataFrames to concatenate, with the same columns.
+
+    Returns:
+        pd.DataFrame: The concatenated DataFrame, with a new index.
+    """
+    categorical_columns = [
+        column for column, dtype in dfs[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)
+    ]
+    df = pd.concat([batch.drop(columns=categorical_columns) for batch in dfs], ignore_index=True)
+    for column in categorical_columns:
+        df[column] = union_categoricals([batch[column] for batch in dfs], ignore_order=True)
+    return df[dfs[0].columns]
+
+
+def read_gdelt_csv(source, type_: GDELTFileType, header: bool = False) -> pd.DataFrame:
+    """
+    Function that parses the contents of a GDELT CSV file into a typed, Arrow-backed DataFrame.
+
+    Args:
+        source: A path, file-like object or bytes with the tab-separated contents.
+        type (GDELTFileType): The type of the file.
+        header (bool): Whether the first row of the contents is a header.
+
+    Returns:
+        pd.DataFrame: The DataFrame containing the parsed data.
+    """
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    schema = get_gdelt_arrow_schema(type_)
+
+    # The schema is applied while parsing (with multiple threads), so each file is decoded once,
+    # straight into Arrow-backed columns. Column names are always taken from the schema, as only
+    # some files have a header, and GDELT files are never quoted.
+    table = pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(
+            column_names=schema.names,
+            skip_rows=1 if header else 0,
+            block_size=8 * 1024 * 1024,
+        ),
+        parse_options=pa_csv.ParseOptions(delimiter="\t", quote_char=False),
+        convert_options=pa_csv.ConvertOptions(column_types=schema, strings_can_be_null=True),
+    )
+    if type_ == GDELTFileType.EVENTS_15MIN:
+        # Load GDELT 2.0 events like the daily ones: without the ADM2 codes, and with the day
+        # they were added (which is what the events are partitioned by)
+        table = table.drop([name for name in table.column_names if name.endswith("_ADM2Code")])
+        table = table.set_column(
+            table.schema.get_field_index("DATEADDED"),
+            "DATEADDED",
+            pc.cast(pc.divide(table.column("DATEADDED"), 1_000_000), pa.int32()),
+        )
+    if type_ == GDELTFileType.GKG:
+        # Decode the tone into typed columns once, instead of in every query that uses it
+        tone = get_gkg_tone(table.column("TONE"))
+        for name in tone.column_names:
+            table = table.append_column(name, tone.column(name))
+    df = table.to_pandas(types_mapper=_get_pandas_type)
+    if type_ == GDELTFileType.GKG:
+        df["UUID"] = get_gkg_record_ids(df)
+
+    return df
+
+
+def _read_gdelt_csv_ipc(source, type_: GDELTFileType, header: bool = False) -> pa.Buffer:
+    # Runs in worker processes, which hand the parsed data back as Arrow buffers
+    return dataframe_to_ipc(read_gdelt_csv(source, type_=type_, header=header))
+
+
+async def parse_gdelt_csv(
+    source, type_: GDELTFileType, header: bool = False, executor: Executor | None = None
+) -> pd.DataFrame:
+    """
+    Function that parses the contents of a GDELT CSV file without blocking the event loop.
+
+    Parsing runs in an executor. With a process pool, the parsed data comes back as an Arrow IPC
+    stream, which is much cheaper to transfer than a pickled DataFrame, so several files (or
+    blocks of a file) are parsed on several cores at once.
+
+    Args:
+        source: A path or bytes with the tab-separated contents.
+        type (GDELTFileType): The type of the file.
+        header (bool): Whether the first row of the contents is a header.
+        executor (Executor | None): Where to parse. If None, the loop's default thread pool is
+            used.
+
+    Returns:
+        pd.DataFrame: The DataFrame containing the parsed data.
+    """
+    with measure("parse") as values:
+        if isinstance(executor, ProcessPoolExecutor):
+            data = await run_in_executor(executor, _read_gdelt_csv_ipc, source, type_, header)
+            df = dataframe_from_ipc(data, types_mapper=_get_pandas_type)
+        else:
+            df = await run_in_executor(executor, read_gdelt_csv, source, type_, header)
+        values.update(
+            rows=len(df),
+            bytes=len(source) if isinstance(source, bytes) else Path(source).stat().st_size,
+        )
+    return df
+
+
+def get_gkg_record_ids(df: pd.DataFrame) -> pd.Series:
+    """
+    Function that derives stable IDs for GKG records from their contents.
+
+    The IDs are 64-bit hashes over all the columns of the GKG file, computed in bulk, so reloading
+    the same file always produces the same IDs (and duplicates can be detected by key).
+
+    Args:
+        df (pd.DataFrame): The GKG records, with the columns in `GDELT_FILE_TYPE_COLUMNS`.
+
+    Returns:
+        pd.Series: The IDs, as signed 64-bit integers (to fit a PostgreSQL `bigint`).
+    """
+    columns = list(GDELT_FILE_TYPE_COLUMNS[GDELTFileType.GKG].keys())
+    hashes = pd.util.hash_pandas_object(df[columns], index=False)
+    return pd.Series(hashes.to_numpy().view(np.int64), index=df.index, name="UUID")
+
+
+async def stream_gdelt_file(
+    date: datetime,
+    type_: GDELTFileType,
+    block_size: int = 16 * 1024 * 1024,
+    client: HTTPClient | None = None,
+    cache: ArchiveCache | None = None,
+    budget: MemoryBudget | None = None,
+    executor: Executor | None = None,
+    parse_ahead: int = 2,
+) -> AsyncIterator[pd.DataFrame]:
+    """
+    Function that streams a GDELT file into DataFrame batches, without touching the disk.
+
+    The HTTP response is inflated and parsed while it's being received, so only a few blocks of
+    decompressed data are held in memory at a time. Blocks are parsed in an executor, up to
+    `parse_ahead` at once, while the oldest batch is being consumed. With a memory budget, each
+    block is reserved from it before being read and released once its batch was consumed (i.e.
+    when the next batch is requested), so the batches of all the files sharing a budget are
+    bounded together.
+
+    Args:
+        date (datetime): The date of the file.
+        type (GDELTFileType): The type of the file.
+        block_size (int): Approximate size, in decompressed bytes, of the data in each batch.
+        client (HTTPClient | None): The HTTP client to use. Defaults to the shared client.
+        cache (ArchiveCache | None): The cache of raw archives, if any.
+        budget (MemoryBudget | None): The memory budget to reserve batches from, if any.
+        executor (Executor | None): Where to parse the blocks. If None, the loop's default
+            thread pool is used.
+        parse_ahead (int): The maximum number of blocks being parsed (or waiting to be
+            consumed) at once.
+
+    Yields:
+        pd.DataFrame: Typed DataFrames with consecutive rows of the file.
+    """
+    chunks = iter_unzipped_chunks(
+        iter_gdelt_archive_chunks(date=date, type_=type_, client=client, cache=cache)
+    )
+    blocks = iter_line_blocks(chunks, block_size=block_size)
+    # Blocks being parsed, in file order, with the bytes they reserved from the budget
+    pending: Deque[Tuple[int, asyncio.Task]] = deque()
+    exhausted = False
+
+    # If it's GKG, the first row of the first block is a header
+    header = type_ == GDELTFileType.GKG
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max(parse_ahead, 1):
+                # Only wait for the budget when nothing is pending, as waiting while holding
+                # reservations that are released downstream could deadlock
+                if budget is None:
+                    reserved = 0
+                elif pending:
+                    reserved = budget.try_acquire(block_size)
+                    if reserved is None:
+                        break
+                else:
+                    reserved = await budget.acquire(block_size)
+                block = await anext(blocks, None)
+                if block is None:
+                    exhausted = True
+                    if budget is not None:
+                        await budget.release(reserved)
+                    break
+                parse = parse_gdelt_csv(block, type_=type_, header=header, executor=executor)
+                pending.append((reserved, asyncio.ensure_future(parse)))
+                del block
+                header = False
+
+            if not pending:
+                break
+            reserved, task = pending.popleft()
+            try:
+                df = await task
+                if len(df) > 0:
+                    yield df
+            finally:
+                if budget is not None:
+                    await budget.release(reserved)
+    finally:
+        for reserved, task in pending:
+            task.cancel()
+            if budget is not None:
+                await budget.release(reserved)
+
+
+async def load_gdelt_file(
+    date: datetime,
+    type_: GDELTFileType,
+    clear: bool = True,
+    stream: bool = False,
+    client: HTTPClient | None = None,
+    cache: ArchiveCache | None = None,
+    executor: Executor | None = None,
+) -> pd.DataFrame:
     """
     Function that loads a GDELT file into a DataFrame.
 
@@ -124,22 +650,52 @@ async def load_gdelt_file(date: datetime, type_: GDELTFileType, clear: bool = Tr
         date (datetime): The date of the file.
         type (GDELTFileType): The type of the file.
         clear (bool): Whether to clear the temporary files after loading the data.
+        stream (bool): Whether to inflate and parse the file while downloading it, instead of
+            going through temporary files on disk.
+        client (HTTPClient | None): The HTTP client to use. Defaults to the shared client.
+        cache (ArchiveCache | None): The cache of raw archives, if any.
+        executor (Executor | None): Where to parse the file. If None, the loop's default thread
+            pool is used.
 
     Returns:
         pd.DataFrame: The DataFrame containing the file data.
     """
+    if stream:
+        batches = [
+            df
+            async for df in stream_gdelt_file(
+                date=date, type_=type_, client=client, cache=cache, executor=executor
+            )
+        ]
+        if not batches:
+            raise ValueError("No rows streamed from the GDELT file.")
+        return concat_gdelt_dataframes(batches)
+
     # Create a temporary directory
     tmp_dir = Path("/tmp") / uuid4().hex
     tmp_dir.mkdir(parents=True, exist_ok=True)
 
-    # Download the file
+    # Download the file (or get it from the cache)
     url = get_gdelt_file_url(date=date, type_=type_)
-    zip_path = tmp_dir / f"{date.strftime('%Y%m%d')}-{type_}.zip"
-    await download_file(url=url, path=zip_path)
+    with measure("download") as values:
+        if cache is not None:
+            zip_path = cache.get(url)
+            if zip_path is None:
+                expected_md5 = await get_gdelt_file_md5(date=date, type_=type_, client=client)
+                zip_path = await cache.fetch(url, client=client, expected_md5=expected_md5)
+        else:
+            zip_path = tmp_dir / f"{date.strftime('%Y%m%d')}-{type_}.zip"
+            await download_file(url=url, path=zip_path, client=client)
+        values["bytes"] = Path(zip_path).stat().st_size
 
     # Unzip it
     extract_to = tmp_dir / f"{date.strftime('%Y%m%d')}-{type_}"
-    await unzip_file(zip_path=zip_path, extract_to=extract_to)
+    with measure("inflate") as values:
+        await unzip_file(zip_path=zip_path, extract_to=extract_to)
+        values.update(
+            input_bytes=Path(zip_path).stat().st_size,
+            bytes=sum(path.stat().st_size for path in extract_to.rglob("*") if path.is_file()),
+        )
 
     # Get the CSV file
     csv_files = list(Path(extract_to).glob("*.csv")) + list(Path(extract_to).glob("*.CSV"))
@@ -152,18 +708,9 @@ async def load_gdelt_file(date: datetime, type_: GDELTFileType, clear: bool = Tr
 
     # Load the CSV file into a DataFrame
     # If it's GKG, the first row is a header
-    if type_ == GDELTFileType.GKG:
-        df = pd.read_csv(csv_path, sep="\t", header=0)
-        df["UUID"] = [str(uuid4()) for _ in range(len(df))]
-    # If it's Events, there are no column names. We need to specify them.
-    elif type_ == GDELTFileType.EVENTS:
-        df = pd.read_csv(csv_path, sep="\t", header=None)
-        df.columns = list(GDELT_FILE_TYPE_COLUMNS[type_].keys())
-    else:
-        raise ValueError(f"Invalid GDELT file type: {type_}")
-
-    # Fix column types
-    df = df.astype(GDELT_FILE_TYPE_COLUMNS[type_])
+    df = await parse_gdelt_csv(
+        str(csv_path), type_=type_, header=type_ == GDELTFileType.GKG, executor=executor
+    )
 
     # Clear the temporary files if needed
     if clear:
@@ -172,26 +719,94 @@ async def load_gdelt_file(date: datetime, type_: GDELTFileType, clear: bool = Tr
     return df
 
 
-async def load_gdelt_files(date: datetime, clear: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
+async def load_gdelt_files(
+    date: datetime,
+    clear: bool = True,
+    stream: bool = False,
+    client: HTTPClient | None = None,
+    cache: ArchiveCache | None = None,
+    executor: Executor | None = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Load GDELT files for a specific date.
 
     Args:
         date (datetime): The date to load the files for.
         clear (bool): Whether to clear the temporary files after loading the data.
+        stream (bool): Whether to stream the files instead of going through temporary files.
+        client (HTTPClient | None): The HTTP client to use. Defaults to the shared client.
+        cache (ArchiveCache | None): The cache of raw archives, if any.
+        executor (Executor | None): Where to parse the files. With a process pool, both files
+            are parsed on separate cores. If None, the loop's default thread pool is used.
 
     Returns:
         Tuple[pd.DataFrame, pd.DataFrame]: A tuple containing the DataFrames for the Events and GKG
         files, respectively.
     """
-    df_events_task = load_gdelt_file(date=date, type_=GDELTFileType.EVENTS)
-    df_gkg_task = load_gdelt_file(date=date, type_=GDELTFileType.GKG)
+    df_events_task = load_gdelt_file(
+        date=date,
+        type_=GDELTFileType.EVENTS,
+        clear=clear,
+        stream=stream,
+        client=client,
+        cache=cache,
+        executor=executor,
+    )
+    df_gkg_task = load_gdelt_file(
+        date=date,
+        type_=GDELTFileType.GKG,
+        clear=clear,
+        stream=stream,
+        client=client,
+        cache=cache,
+        executor=executor,
+    )
 
     df_events, df_gkg = await asyncio.gather(df_events_task, df_gkg_task)
 
     return df_events, df_gkg
 
 
+async def iter_gdelt_files(
+    date: datetime,
+    block_size: int = 16 * 1024 * 1024,
+    client: HTTPClient | None = None,
+    cache: ArchiveCache | None = None,
+    budget: MemoryBudget | None = None,
+    executor: Executor | None = None,
+) -> AsyncIterator[Tuple[GDELTFileType, pd.DataFrame]]:
+    """
+    Streams the GDELT files for a specific date, one after the other, in DataFrame batches.
+
+    Unlike `load_gdelt_files`, neither file is ever fully held in memory, so many dates can be
+    processed at once. Consumers should handle each batch before requesting the next one.
+
+    Args:
+        date (datetime): The date to load the files for.
+        block_size (int): Approximate size, in decompressed bytes, of the data in each batch.
+        client (HTTPClient | None): The HTTP client to use. Defaults to the shared client.
+        cache (ArchiveCache | None): The cache of raw archives, if any.
+        budget (MemoryBudget | None): The memory budget to reserve batches from, if any.
+        executor (Executor | None): Where to parse the files. If None, the loop's default thread
+            pool is used.
+
+    Yields:
+        Tuple[GDELTFileType, pd.DataFrame]: The type of the file each batch comes from, and the
+        batch.
+    """
+    for type_ in DAILY_FILE_TYPES:
+        async for df in stream_gdelt_file(
+            date=date,
+            type_=type_,
+            block_size=block_size,
+            client=client,
+            cache=cache,
+            budget=budget,
+            executor=executor,
+        ):
+            yield type_, df
+
+
 async def process_date(date: datetime):
     """
     Process and load GDELT data for a specific date.
@@ -199,9 +814,11 @@ async def process_date(date: datetime):
     Args:
         date (datetime): The date to load and process the data for.
     """
-    try:
-        df_events, df_gkg = await load_gdelt_files(date)
-        await load_dataframes_to_bronze(df_events, df_gkg)
-        print(f"Successfully processed data for {date.strftime('%Y-%m-%d')}")
-    except Exception as e:
-        print(f"Failed to process data for {date.strftime('%Y-%m-%d')}: {e}")
+    with collect_metrics(date=date.strftime("%Y-%m-%d")) as metrics:
+        try:
+            df_events, df_gkg = await load_gdelt_files(date)
+            await load_dataframes_to_bronze(df_events, df_gkg)
+            print(f"Successfully processed data for {date.strftime('%Y-%m-%d')}")
+        except Exception as e:
+            print(f"Failed to process data for {date.strftime('%Y-%m-%d')}: {e}")
+    print(metrics.format_summary())
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple
+
+
+class Stage(NamedTuple):
+    """
+    A stage of a pipeline: a coroutine function applied to every item, by a pool of workers.
+    """
+
+    # The name of the stage, used in the logs and statistics
+    name: str
+    # The coroutine function that processes an item, returning what's passed to the next stage
+    func: Callable[[Any], Awaitable[Any]]
+    # The number of items processed at once
+    concurrency: int = 1
+    # The maximum number of items waiting for the stage. When it's full, the workers of the
+    # previous stage wait for room before taking their next item
+    queue_size: int = 1
+    # The number of times an item is processed again after failing
+    retries: int = 0
+    # How long to wait before processing a failed item again, in seconds
+    retry_delay_seconds: float = 0
+
+
+class PipelineError(Exception):
+    """
+    Raised when some items of a pipeline failed, after all the others went through it.
+
+    Only the descriptions of the errors are kept, so that it can be pickled (e.g. by Prefect)
+    whatever the errors hold.
+
+    Args:
+        failures (Dict[Any, str]): The description of the error of each failed item, by item.
+    """
+
+    def __init__(self, failures: Dict[Any, str]):
+        self.failures = failures
+        super().__init__(
+            f"{len(failures)} items failed: "
+            + "; ".join(f"{item}: {error}" for item, error in failures.items())
+        )
+
+    def __reduce__(self):
+        return type(self), (self.failures,)
+
+
+class Pipeline:
+    """
+    Runs items through stages connected by bounded queues, each stage with its own workers.
+
+    Stages overlap, as each one takes the next item as soon as one of its workers is free. The
+    queues bound how far a stage can get ahead of the next one: when a stage falls behind (e.g.
+    loading into the database), its queue fills up and the stages before it pause. So the
+    throughput of the pipeline follows its slowest stage, and the items in flight (and the
+    memory or disk they hold) are bounded by the concurrencies and queue sizes of the stages.
+
+    An item that fails a stage (after its retries) leaves the pipeline, without stopping the
+    other items.
+
+    Args:
+        stages (List[Stage]): The stages, in order.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage.")
+        self.stages = stages
+        # Seconds each stage spent processing items (busy), waiting for an item (starved) and
+        # waiting for room in the next queue (blocked), and the items it processed and failed
+        self.stats: Dict[str, Dict[str, float]] = {
+            stage.name: {"items": 0, "failed": 0, "busy": 0.0, "starved": 0.0, "blocked": 0.0}
+            for stage in stages
+        }
+
+    async def _process(self, stage: Stage, value: Any) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return await stage.func(value)
+            except Exception as error:
+                if attempt >= stage.retries:
+                    raise
+                attempt += 1
+                print(
+                    f"Stage {stage.name} failed ({error!r}), "
+                    f"retrying in {stage.retry_delay_seconds} s ({attempt}/{stage.retries})"
+                )
+                await asyncio.sleep(stage.retry_delay_seconds)
+
+    async def _work(
+        self,
+        stage: Stage,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue | None,
+        results: Dict[Any, Any],
+        failures: Dict[Any, BaseException],
+    ) -> None:
+        stats = self.stats[stage.name]
+        while True:
+            started_at = perf_counter()
+            entry = await inbox.get()
+            stats["starved"] += perf_counter() - started_at
+            if entry is None:
+                return
+            item, value = entry
+
+            started_at = perf_counter()
+            try:
+                value = await self._process(stage, value)
+            except Exception as error:
+                stats["failed"] += 1
+                print(f"Stage {stage.name} failed for {item}: {error!r}")
+                failures[item] = error
+                continue
+            finally:
+                stats["busy"] += perf_counter() - started_at
+            stats["items"] += 1
+
+            if outbox is None:
+                results[item] = value
+            else:
+                started_at = perf_counter()
+                await outbox.put((item, value))
+                stats["blocked"] += perf_counter() - started_at
+
+    async def run(self, items: Iterable[Any], raise_on_failure: bool = True) -> Dict[Any, Any]:
+        """
+        Asynchronously runs items through the pipeline.
+
+        Args:
+            items (Iterable[Any]): The items (hashable, e.g. dates), which are also the input of
+                the first stage.
+            raise_on_failure (bool): Whether to raise a `PipelineError` if some items failed,
+                once all the items went through the pipeline.
+
+        Returns:
+            Dict[Any, Any]: The output of the last stage, by item, for the items that went
+            through every stage, in the order they finished.
+        """
+        queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        results: Dict[Any, Any] = {}
+        failures: Dict[Any, BaseException] = {}
+
+        async def feed() -> None:
+            for item in items:
+                await queues[0].put((item, item))
+
+        async def run_stage(index: int, stage: Stage) -> None:
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+            await asyncio.gather(
+                *[
+                    self._work(stage, queues[index], outbox, results, failures)
+                    for _ in range(max(stage.concurrency, 1))
+                ]
+            )
+
+        # Each stage's workers are told to stop once the previous stage is done, so every item
+        # it passed on is processed first
+        tasks = [
+            asyncio.ensure_future(run_stage(index, stage))
+            for index, stage in enumerate(self.stages)
+        ]
+        try:
+            await feed()
+            for index, (stage, task) in enumerate(zip(self.stages, tasks)):
+                for _ in range(max(stage.concurrency, 1)):
+                    await queues[index].put(None)
+                await task
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if failures and raise_on_failure:
+            raise PipelineError({item: repr(error) for item, error in failures.items()})
+        return results
+
+    def format_stats(self) -> str:
+        """
+        Formats how each stage spent its time, to tell which one limits the pipeline.
+
+        The slowest stage is busy most of the time, the stages before it are blocked on it, and
+        the stages after it are starved.
+
+        Returns:
+            str: The statistics, one line per stage.
+        """
+        lines = []
+        for stage in self.stages:
+            stats = self.stats[stage.name]
+            lines.append(
+                f"  {stage.name} (x{stage.concurrency}): {stats['items']:.0f} items, "
+                f"{stats['failed']:.0f} failed, busy {stats['busy']:.1f} s, "
+                f"starved {stats['starved']:.1f} s, blocked {stats['blocked']:.1f} s"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import argparse
+import asyncio
+from pathlib import Path
+
+from .database import start_local_database
+from .runner import (
+    DATABASE_STAGES,
+    STAGES,
+    compare_results,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures the GDELT ingestion stages over synthetic files, served locally."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="Numbers of events to generate (GDELT has about 200k a day).",
+    )
+    parser.add_argument(
+        "--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="Stages to measure."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Runs of each stage (the fastest counts)."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated files.")
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        default=Path("/tmp/minerva-benchmarks"),
+        help="Where to write files.",
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database to load into. Defaults to a local server started in the work directory.",
+    )
+    parser.add_argument("--output", type=Path, help="Where to save the results, as JSON.")
+    parser.add_argument("--baseline", type=Path, help="Results of a previous run to compare with.")
+    args = parser.parse_args()
+
+    database_url, server = args.database_url, None
+    if database_url is None and DATABASE_STAGES.intersection(args.stages):
+        database_url, server = start_local_database(args.workdir / "pgdata")
+
+    results = asyncio.run(
+        run_benchmarks(
+            sizes=args.sizes,
+            stages=args.stages,
+            workdir=args.workdir,
+            database_url=database_url,
+            repeat=args.repeat,
+            seed=args.seed,
+        )
+    )
+    if args.output is not None:
+        save_results(results, args.output)
+        print(f"Results saved to {args.output}")
+    if args.baseline is not None:
+        print(f"Compared to {args.baseline}:")
+        print(compare_results(results, load_results(args.baseline)))
+    del server
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+from typing import Any, Tuple
+
+import pgserver
+
+
+def start_local_database(pgdata: str | Path) -> Tuple[str, Any]:
+    """
+    Starts (or reuses) a local PostgreSQL server, as a stand-in for the real database.
+
+    The server binaries come with `pgserver`, so nothing needs to be installed system-wide. The
+    server keeps running as long as the returned handle is referenced.
+
+    Args:
+        pgdata (str | Path): The data directory of the server. It's created if needed.
+
+    Returns:
+        Tuple[str, Any]: The URL of the database, for SQLAlchemy with asyncpg, and the handle of
+        the server.
+    """
+    pgdata = Path(pgdata)
+    pgdata.parent.mkdir(parents=True, exist_ok=True)
+    server = pgserver.get_server(pgdata)
+    return server.get_uri().replace("postgresql://", "postgresql+asyncpg://", 1), server
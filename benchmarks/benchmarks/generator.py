@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from minerva_elders.base.gdelt import (
+    GDELT_FILE_TYPE_COLUMNS,
+    GDELTFileType,
+    get_gdelt_file_url,
+)
+from minerva_elders.base.stub import zip_gdelt_file
+
+# Values commonly found in GDELT files, so that strings have realistic lengths and cardinalities
+ACTORS = [
+    ("USA", "UNITED STATES", "USA"),
+    ("USAGOV", "WHITE HOUSE", "USA"),
+    ("USAMIL", "PENTAGON", "USA"),
+    ("GBR", "BRITISH", "GBR"),
+    ("CHN", "CHINA", "CHN"),
+    ("CHNGOV", "BEIJING", "CHN"),
+    ("RUS", "RUSSIA", "RUS"),
+    ("RUSMIL", "RUSSIAN ARMY", "RUS"),
+    ("UKR", "UKRAINE", "UKR"),
+    ("ISR", "ISRAEL", "ISR"),
+    ("PSE", "PALESTINIAN", "PSE"),
+    ("IRN", "TEHRAN", "IRN"),
+    ("IND", "NEW DELHI", "IND"),
+    ("FRA", "FRANCE", "FRA"),
+    ("DEU", "GERMANY", "DEU"),
+    ("BRA", "BRAZIL", "BRA"),
+    ("NGA", "NIGERIA", "NGA"),
+    ("GOV", "GOVERNMENT", None),
+    ("POL", "POLITICIAN", None),
+    ("COP", "POLICE", None),
+    ("BUS", "COMPANY", None),
+    ("MED", "JOURNALIST", None),
+    ("EDU", "UNIVERSITY", None),
+    ("CVL", "RESIDENTS", None),
+    ("JUD", "COURT", None),
+    ("LEG", "SENATE", None),
+]
+KNOWN_GROUP_CODES = ["UNO", "NAT", "EEC", "HMS", "TAL", "AFR", "WTO", "IMF", "OPC"]
+ETHNIC_CODES = ["ara", "kur", "pas", "jew", "hut", "tam", "bal", "yor"]
+RELIGION_CODES = ["CHR", "MOS", "JEW", "HIN", "BUD", "SHI", "SUN", "CTH", "PRO", "ORT"]
+TYPE_CODES = [
+    "GOV", "MIL", "BUS", "CVL", "JUD", "MED", "EDU", "COP", "LEG", "OPP", "REB", "NGO",
+    "IGO", "ELI", "REF", "LAB", "AGR", "HLH", "SPY", "CRM",
+]  # fmt: skip
+EVENT_CODES = [
+    "010", "011", "012", "013", "014", "015", "016", "017", "018", "019", "020", "021", "030",
+    "036", "040", "042", "043", "045", "046", "051", "057", "061", "071", "080", "090", "100",
+    "111", "112", "120", "128", "130", "138", "141", "145", "160", "173", "180", "190", "193",
+    "0841", "1823", "1124",
+]  # fmt: skip
+PLACES = [
+    ("Washington, District of Columbia, United States", "US", "USDC", 38.8951, -77.0364, "531871"),
+    ("New York, New York, United States", "US", "USNY", 40.7143, -74.006, "977396"),
+    ("London, London, City of, United Kingdom", "UK", "UKH9", 51.5, -0.1167, "-2601889"),
+    ("Beijing, Beijing, China", "CH", "CH22", 39.9289, 116.388, "-1898541"),
+    ("Moscow, Moskva, Russia", "RS", "RS48", 55.7522, 37.6156, "-2960561"),
+    ("Kyiv, Kyyiv, Misto, Ukraine", "UP", "UP12", 50.4333, 30.5167, "-1044367"),
+    ("Jerusalem, Israel (general), Israel", "IS", "IS06", 31.7667, 35.2333, "-797156"),
+    ("Gaza, Israel (general), Israel", "IS", "IS00", 31.5, 34.4667, "-788931"),
+    ("Tehran, Tehran, Iran", "IR", "IR26", 35.6719, 51.4244, "10074674"),
+    ("New Delhi, National Capital Territory of Delhi, India", "IN", "IN07", 28.6, 77.2, "-2106102"),
+    ("Paris, Ile-de-France, France", "FR", "FRA8", 48.8667, 2.3333, "-1456928"),
+    ("Berlin, Berlin, Germany", "GM", "GM16", 52.5167, 13.4, "-1746443"),
+    ("Sao Paulo, Sao Paulo, Brazil", "BR", "BR27", -23.5333, -46.6167, "-676082"),
+    ("Lagos, Lagos, Nigeria", "NI", "NI05", 6.45306, 3.39583, "-2015400"),
+    ("Texas, United States", "US", "USTX", 31.106, -97.6475, "TX"),
+    ("Canada", "CA", "CA", 60.0, -96.0, "CA"),
+]
+COUNT_TYPES = ["KILL", "WOUND", "PROTEST", "ARREST", "AFFECT", "KIDNAP", "SEIZE", "EVACUATION"]
+COUNT_OBJECTS = ["people", "protesters", "soldiers", "civilians", "students", "police officers"]
+THEMES = [
+    "TAX_FNCACT", "TAX_FNCACT_PRESIDENT", "LEADER", "GENERAL_GOVERNMENT", "EPU_POLICY",
+    "ARMEDCONFLICT", "KILL", "PROTEST", "SECURITY_SERVICES", "TAX_FNCACT_POLICE", "MEDIA_MSM",
+    "USPEC_POLITICS_GENERAL1", "EDUCATION", "ECON_STOCKMARKET", "WB_696_PUBLIC_SECTOR_MANAGEMENT",
+    "CRISISLEX_CRISISLEXREC", "TAX_ETHNICITY", "ELECTION", "TERROR", "MANMADE_DISASTER_IMPLIED",
+    "WB_2432_FRAGILITY_CONFLICT_AND_VIOLENCE", "SOC_POINTSOFINTEREST_HOSPITAL", "IMMIGRATION",
+]  # fmt: skip
+PERSONS = [
+    "joe biden", "donald trump", "vladimir putin", "xi jinping", "volodymyr zelensky",
+    "benjamin netanyahu", "narendra modi", "emmanuel macron", "olaf scholz", "rishi sunak",
+    "antony blinken", "luiz inacio lula da silva", "kamala harris",
+]  # fmt: skip
+ORGANIZATIONS = [
+    "united nations", "european union", "nato", "white house", "associated press", "reuters",
+    "world health organization", "international monetary fund", "supreme court", "facebook",
+    "federal reserve", "world bank", "hamas",
+]  # fmt: skip
+DOMAINS = [
+    "reuters.com", "apnews.com", "bbc.co.uk", "nytimes.com", "theguardian.com", "aljazeera.com",
+    "washingtonpost.com", "timesofindia.indiatimes.com", "dailymail.co.uk", "yahoo.com",
+    "cnn.com", "foxnews.com", "news.sky.com", "abc.net.au", "thehindu.com", "lemonde.fr",
+]  # fmt: skip
+SLUG_WORDS = [
+    "government", "president", "says", "police", "protest", "court", "election", "talks", "war",
+    "minister", "after", "killed", "new", "report", "security", "attack", "deal", "leaders",
+    "economy", "border", "vote", "crisis", "officials", "calls", "plan", "amid", "urges",
+]  # fmt: skip
+
+# Share of empty values in the columns of the events that are often empty
+EVENT_NULL_RATES = {
+    "Actor1Code": 0.1,
+    "Actor2Code": 0.3,
+    "KnownGroupCode": 0.98,
+    "EthnicCode": 0.99,
+    "Religion1Code": 0.97,
+    "Religion2Code": 0.995,
+    "Type1Code": 0.6,
+    "Type2Code": 0.95,
+    "Type3Code": 0.995,
+    "Geo": 0.15,
+}
+
+
+def _strings(values: np.ndarray, nulls: np.ndarray) -> np.ndarray:
+    # Empty strings are how GDELT writes nulls
+    return np.where(nulls, "", values.astype(str)).astype(object)
+
+
+def _pick(rng: np.random.Generator, options: List, rows: int) -> np.ndarray:
+    # Popular values are picked more often, as in the real data
+    weights = 1 / np.arange(1, len(options) + 1)
+    array = np.empty(len(options), dtype=object)
+    array[:] = options
+    return array[rng.choice(len(options), size=rows, p=weights / weights.sum())]
+
+
+def _urls(rng: np.random.Generator, rows: int, date: datetime) -> List[str]:
+    domains = _pick(rng, DOMAINS, rows)
+    lengths = rng.integers(4, 12, size=rows)
+    words = _pick(rng, SLUG_WORDS, int(lengths.sum()))
+    slugs = np.split(words, np.cumsum(lengths)[:-1])
+    return [
+        f"https://www.{domain}/{date:%Y/%m/%d}/{'-'.join(slug)}-{number}.html"
+        for domain, slug, number in zip(domains, slugs, rng.integers(10**5, 10**8, size=rows))
+    ]
+
+
+def generate_events(
+    rows: int, date: datetime, type_: GDELTFileType = GDELTFileType.EVENTS, seed: int = 0
+) -> bytes:
+    """
+    Generates the contents of a synthetic GDELT events file.
+
+    Columns are those in `GDELT_FILE_TYPE_COLUMNS`, in order. Codes, names, places and URLs are
+    drawn from real values, with the skewed frequencies, string lengths and empty rates of the
+    real files, so parsing, encoding and loading them costs about as much as real data.
+
+    Args:
+        rows (int): The number of events.
+        date (datetime): The date the events were added. For 15-minute files, the time they
+            were exported.
+        type (GDELTFileType): The type of the file (`events` or `events_15min`).
+        seed (int): The seed of the random generator, so that the same file can be regenerated.
+
+    Returns:
+        bytes: The tab-separated contents, without a header.
+    """
+    rng = np.random.default_rng(seed)
+    columns: Dict[str, np.ndarray] = {}
+    event_ids = np.arange(rows) + 1_000_000_000 + (seed % 100) * 1_000_000
+    columns["GlobalEventID"] = event_ids.astype(str)
+
+    # Most events happened on the day they were added, some up to a year before
+    days_before = np.where(rng.random(rows) < 0.8, 0, rng.integers(1, 365, size=rows))
+    event_dates = np.datetime64(date.date()) - days_before.astype("timedelta64[D]")
+    day_strings = np.datetime_as_string(event_dates, unit="D")
+    columns["Day"] = np.char.replace(day_strings, "-", "")
+    columns["MonthYear"] = np.array([day[:6] for day in columns["Day"]])
+    columns["Year"] = np.array([day[:4] for day in columns["Day"]])
+    day_of_year = (event_dates - event_dates.astype("datetime64[Y]")).astype(int)
+    columns["FractionDate"] = np.char.mod("%.4f", columns["Year"].astype(int) + day_of_year / 365)
+
+    for actor in ("Actor1", "Actor2"):
+        picked = rng.choice(len(ACTORS), size=rows)
+        nulls = rng.random(rows) < EVENT_NULL_RATES[f"{actor}Code"]
+        codes, names, countries = (
+            np.array(values, dtype=object)[picked] for values in zip(*ACTORS)
+        )
+        columns[f"{actor}Code"] = _strings(codes, nulls)
+        columns[f"{actor}Name"] = _strings(names, nulls)
+        columns[f"{actor}CountryCode"] = _strings(countries, nulls | (countries == None))  # noqa
+        for suffix, options in (
+            ("KnownGroupCode", KNOWN_GROUP_CODES),
+            ("EthnicCode", ETHNIC_CODES),
+            ("Religion1Code", RELIGION_CODES),
+            ("Religion2Code", RELIGION_CODES),
+            ("Type1Code", TYPE_CODES),
+            ("Type2Code", TYPE_CODES),
+            ("Type3Code", TYPE_CODES),
+        ):
+            values = _pick(rng, options, rows)
+            columns[f"{actor}{suffix}"] = _strings(
+                values, nulls | (rng.random(rows) < EVENT_NULL_RATES[suffix])
+            )
+
+    columns["IsRootEvent"] = (rng.random(rows) < 0.6).astype(int).astype(str)
+    event_codes = _pick(rng, EVENT_CODES, rows).astype(str)
+    columns["EventCode"] = event_codes
+    columns["EventBaseCode"] = np.array([code[:3] for code in event_codes])
+    root_codes = np.array([code[:2] for code in event_codes])
+    columns["EventRootCode"] = root_codes
+    columns["QuadClass"] = np.digitize(root_codes.astype(int), [6, 10, 15]) + 1
+    columns["GoldsteinScale"] = np.round(rng.uniform(-10, 10, size=rows), 1)
+    columns["NumMentions"] = rng.geometric(0.3, size=rows) * 2
+    columns["NumSources"] = rng.geometric(0.7, size=rows)
+    columns["NumArticles"] = columns["NumMentions"]
+    columns["AvgTone"] = np.char.mod("%.10f", rng.normal(-2, 3.5, size=rows))
+
+    for geo in ("Actor1Geo", "Actor2Geo", "ActionGeo"):
+        picked = rng.choice(len(PLACES), size=rows)
+        nulls = rng.random(rows) < EVENT_NULL_RATES["Geo"]
+        names, countries, adm1s, lats, longs, features = (
+            np.array(values, dtype=object)[picked] for values in zip(*PLACES)
+        )
+        geo_types = np.where(nulls, 0, np.where(np.char.count(names.astype(str), ",") >= 2, 4, 2))
+        columns[f"{geo}_Type"] = geo_types.astype(str)
+        columns[f"{geo}_FullName"] = _strings(names, nulls)
+        columns[f"{geo}_CountryCode"] = _strings(countries, nulls)
+        columns[f"{geo}_ADM1Code"] = _strings(adm1s, nulls)
+        columns[f"{geo}_ADM2Code"] = _strings(adm1s + "12", nulls | (geo_types != 4))
+        columns[f"{geo}_Lat"] = _strings(lats, nulls)
+        columns[f"{geo}_Long"] = _strings(longs, nulls)
+        columns[f"{geo}_FeatureID"] = _strings(features, nulls)
+
+    date_format = "%Y%m%d%H%M%S" if type_ == GDELTFileType.EVENTS_15MIN else "%Y%m%d"
+    columns["DATEADDED"] = np.full(rows, date.strftime(date_format))
+    columns["SOURCEURL"] = _urls(rng, rows, date)
+
+    names = list(GDELT_FILE_TYPE_COLUMNS[type_])
+    values = [np.asarray(columns[name]).astype(str) for name in names]
+    return ("\n".join("\t".join(row) for row in zip(*values)) + "\n").encode()
+
+
+def _join_blocks(
+    rng: np.random.Generator, rows: int, max_blocks: int, empty_rate: float, make_block
+) -> List[str]:
+    counts = np.where(rng.random(rows) < empty_rate, 0, rng.integers(1, max_blocks + 1, rows))
+    return [";".join(make_block() for _ in range(count)) for count in counts]
+
+
+def generate_gkg(rows: int, date: datetime, events: int = 0, seed: int = 0) -> bytes:
+    """
+    Generates the contents of a synthetic GDELT GKG file.
+
+    Columns are those in `GDELT_FILE_TYPE_COLUMNS`, in order, with a header row like the real
+    files. Counts, themes, locations, persons and organizations are lists of real values with
+    realistic lengths, and event IDs point to the events generated with the same seed.
+
+    Args:
+        rows (int): The number of records.
+        date (datetime): The date of the records.
+        events (int): The number of events generated for the same date, to link records to.
+        seed (int): The seed of the random generator, so that the same file can be regenerated.
+
+    Returns:
+        bytes: The tab-separated contents, with a header.
+    """
+    rng = np.random.default_rng(seed + 1)
+    first_event_id = 1_000_000_000 + (seed % 100) * 1_000_000
+
+    def place() -> str:
+        name, country, adm1, lat, long, feature = PLACES[rng.integers(len(PLACES))]
+        return f"{rng.integers(1, 5)}#{name}#{country}#{adm1}#{lat}#{long}#{feature}"
+
+    def count() -> str:
+        count_type = COUNT_TYPES[rng.integers(len(COUNT_TYPES))]
+        count_object = COUNT_OBJECTS[rng.integers(len(COUNT_OBJECTS))]
+        return f"{count_type}#{rng.geometric(0.05)}#{count_object}#{place()}"
+
+    counts = _join_blocks(rng, rows, 3, 0.6, count)
+    themes = [
+        ";".join(_pick(rng, THEMES, number)) + ";" for number in rng.integers(1, 25, size=rows)
+    ]
+    locations = _join_blocks(rng, rows, 5, 0.3, place)
+    persons = _join_blocks(rng, rows, 6, 0.35, lambda: PERSONS[rng.integers(len(PERSONS))])
+    organizations = _join_blocks(
+        rng, rows, 5, 0.4, lambda: ORGANIZATIONS[rng.integers(len(ORGANIZATIONS))]
+    )
+    tones = rng.normal(-2, 3.5, size=(rows, 6))
+    event_ids = [
+        ",".join(str(first_event_id + event) for event in rng.integers(0, events, size=number))
+        for number in np.where(
+            (rng.random(rows) < 0.45) | (events == 0), 0, rng.integers(1, 6, size=rows)
+        )
+    ]
+    urls = _urls(rng, rows, date)
+
+    lines = ["\t".join(GDELT_FILE_TYPE_COLUMNS[GDELTFileType.GKG])]
+    for row in range(rows):
+        domain = urls[row].split("/")[2].removeprefix("www.")
+        lines.append(
+            "\t".join(
+                [
+                    date.strftime("%Y%m%d"),
+                    str(rng.geometric(0.6)),
+                    counts[row],
+                    themes[row],
+                    locations[row],
+                    persons[row],
+                    organizations[row],
+                    ",".join(f"{tone:.10f}" for tone in tones[row]),
+                    event_ids[row],
+                    domain,
+                    urls[row],
+                ]
+            )
+        )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def generate_gdelt_files(
+    rows: int, date: datetime, directory: str | Path, seed: int = 0
+) -> Dict[GDELTFileType, Path]:
+    """
+    Generates zipped synthetic events and GKG files for a date, named like GDELT's.
+
+    Files that were already generated (with the same size and seed) are reused, as generating
+    large files takes longer than most of the stages being measured.
+
+    Args:
+        rows (int): The number of events. The GKG file has half as many records, which is about
+            the ratio of the real daily files.
+        date (datetime): The date of the files.
+        directory (str | Path): Where to write the files.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        Dict[GDELTFileType, Path]: The paths of the archives, by file type.
+    """
+    directory = Path(directory) / f"{rows}-{seed}"
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for type_ in (GDELTFileType.EVENTS, GDELTFileType.GKG):
+        file_name = get_gdelt_file_url(date=date, type_=type_).rsplit("/", 1)[-1]
+        path = directory / file_name
+        if not path.exists():
+            if type_ == GDELTFileType.EVENTS:
+                data = generate_events(rows, date=date, seed=seed)
+            else:
+                data = generate_gkg(rows // 2, date=date, events=rows, seed=seed)
+            path.write_bytes(zip_gdelt_file(file_name.removesuffix(".zip"), data))
+        paths[type_] = path
+    return paths
+
+
+def get_benchmark_date(index: int) -> datetime:
+    """
+    Returns the date the files of a benchmarked size are generated for.
+
+    Each size gets its own date, so that its rows are loaded into their own partitions.
+
+    Args:
+        index (int): The index of the size.
+
+    Returns:
+        datetime: The date.
+    """
+    return datetime(2024, 1, 1) + timedelta(days=index)
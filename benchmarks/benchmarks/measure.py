@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Dict, Iterator
+
+import psutil
+
+
+def get_rss() -> int:
+    """
+    Returns the resident memory of this process and its children (e.g. parsing workers).
+
+    Returns:
+        int: The resident memory, in bytes.
+    """
+    process = psutil.Process()
+    rss = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return rss
+
+
+class RSSSampler:
+    """
+    Samples the resident memory in a background thread, to find its peak during a stage.
+
+    Sampling in a thread catches peaks even while the event loop (or the GIL, briefly) is busy
+    in the code being measured.
+
+    Args:
+        interval (float): How often to sample, in seconds.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, get_rss())
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """
+        Starts sampling.
+        """
+        self.peak = get_rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> int:
+        """
+        Stops sampling.
+
+        Returns:
+            int: The peak resident memory since sampling started, in bytes.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.peak = max(self.peak, get_rss())
+        return self.peak
+
+
+@contextmanager
+def measure(stage: str, rows: int, size: int) -> Iterator[Dict[str, Any]]:
+    """
+    Measures the wall time and peak memory of a stage.
+
+    The stage sets how many bytes it processed in the yielded result (`bytes`), from which its
+    throughput is derived once it's done.
+
+    Args:
+        stage (str): The name of the stage.
+        rows (int): The number of rows the stage processes.
+        size (int): The benchmarked size (the number of events generated).
+
+    Yields:
+        Dict[str, Any]: The result of the stage, filled in when the block exits.
+    """
+    result: Dict[str, Any] = {"stage": stage, "size": size, "rows": rows, "bytes": 0}
+    sampler = RSSSampler()
+    sampler.start()
+    rss_before = get_rss()
+    started_at = perf_counter()
+    try:
+        yield result
+    finally:
+        wall_seconds = perf_counter() - started_at
+        peak_rss = sampler.stop()
+        result.update(
+            wall_seconds=wall_seconds,
+            rows_per_second=rows / wall_seconds if wall_seconds else 0.0,
+            bytes_per_second=result["bytes"] / wall_seconds if wall_seconds else 0.0,
+            peak_rss_bytes=peak_rss,
+            peak_rss_increase_bytes=max(peak_rss - rss_before, 0),
+        )
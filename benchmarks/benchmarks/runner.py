@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+import platform
+import sys
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+from minerva_elders.base.db.bronze import Base
+from minerva_elders.base.db.utils import (
+    WritePolicy,
+    create_events_decoded_view,
+    create_schema_if_not_exists,
+    create_tables_if_not_exist,
+    df_to_postgres,
+    dispose_engines,
+    get_engine,
+    load_dataframes_to_bronze,
+)
+from minerva_elders.base.gdelt import (
+    DAILY_FILE_TYPES,
+    GDELT_BASE_URL_ENV_VAR,
+    GDELTFileType,
+    get_gdelt_file_url,
+    load_gdelt_file,
+)
+from minerva_elders.base.gkg import GKG_DERIVED_TABLES
+from minerva_elders.base.io import close_http_client, download_file, unzip_file
+from minerva_elders.base.stub import GDELTStubServer
+from sqlalchemy import text
+
+from .generator import generate_gdelt_files, get_benchmark_date
+from .measure import measure
+
+# Directory of the flows, which aren't an installable package
+FLOWS_DIR = Path(__file__).resolve().parents[2] / "flows"
+
+# Number of rows in each batch loaded into the database
+CHUNK_SIZE = 50_000
+
+
+class BenchmarkContext:
+    """
+    State shared by the stages of a benchmarked size.
+
+    Args:
+        size (int): The number of events generated.
+        date (datetime): The date of the generated files.
+        paths (Dict[GDELTFileType, Path]): The generated archives, by file type.
+        workdir (Path): Where stages write their files.
+        database_url (str): The URL of the PostgreSQL database.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        date: datetime,
+        paths: Dict[GDELTFileType, Path],
+        workdir: Path,
+        database_url: str,
+    ):
+        self.size = size
+        self.date = date
+        self.paths = paths
+        self.workdir = workdir
+        self.database_url = database_url
+        self.csv_bytes = {}
+        for type_, path in paths.items():
+            with zipfile.ZipFile(path) as archive:
+                self.csv_bytes[type_] = sum(info.file_size for info in archive.infolist())
+        self.zip_bytes = {type_: path.stat().st_size for type_, path in paths.items()}
+        # The GKG file has half as many records as there are events
+        self.rows = size + size // 2
+        self.dataframes: Dict[GDELTFileType, pd.DataFrame] = {}
+
+
+def _chunks(df: pd.DataFrame) -> List[pd.DataFrame]:
+    starts = range(0, len(df), CHUNK_SIZE)
+    return [df.iloc[start:end] for start, end in zip(starts, [*starts[1:], len(df)])]
+
+
+async def _get_dataframes(context: BenchmarkContext) -> Dict[GDELTFileType, pd.DataFrame]:
+    # Database stages start from parsed files, which are only parsed once per size
+    if not context.dataframes:
+        for type_ in DAILY_FILE_TYPES:
+            context.dataframes[type_] = await load_gdelt_file(date=context.date, type_=type_)
+    return context.dataframes
+
+
+async def bench_download(context: BenchmarkContext, result: Dict[str, Any]) -> None:
+    for type_ in DAILY_FILE_TYPES:
+        url = get_gdelt_file_url(date=context.date, type_=type_)
+        await download_file(url=url, path=context.workdir / url.rsplit("/", 1)[-1])
+    result["bytes"] = sum(context.zip_bytes.values())
+
+
+async def bench_unzip(context: BenchmarkContext, result: Dict[str, Any]) -> None:
+    for type_, path in context.paths.items():
+        await unzip_file(zip_path=path, extract_to=context.workdir / type_.value)
+    result["bytes"] = sum(context.csv_bytes.values())
+
+
+async def bench_load(context: BenchmarkContext, result: Dict[str, Any]) -> None:
+    for type_ in DAILY_FILE_TYPES:
+        context.dataframes[type_] = await load_gdelt_file(date=context.date, type_=type_)
+    result["bytes"] = sum(context.csv_bytes.values())
+
+
+async def bench_load_stream(context: BenchmarkContext, result: Dict[str, Any]) -> None:
+    for type_ in DAILY_FILE_TYPES:
+        await load_gdelt_file(date=context.date, type_=type_, stream=True)
+    result["bytes"] = sum(context.csv_bytes.values())
+
+
+async def bench_df_to_postgres(context: BenchmarkContext, result: Dict[str, Any]) -> None:
+    dataframes = await _get_dataframes(context)
+    engine = get_engine(context.database_url)
+    for type_, df in dataframes.items():
+        table_name = f"{type_.value}_{context.size}"
+        async with engine.begin() as conn:
+            await conn.execute(text(f'DROP TABLE IF EXISTS benchmark."{table_name}"'))
+        await df_to_postgres(
+            _chunks(df),
+            table_name=table_name,
+            database_url=context.database_url,
+            schema_name="benchmark",
+        )
+    result["bytes"] = sum(context.csv_bytes.values())
+
+
+async def bench_upload(context: BenchmarkContext, result: Dict[str, Any]) -> None:
+    dataframes = await _get_dataframes(context)
+    df_gkg = dataframes[GDELTFileType.GKG]
+    await load_dataframes_to_bronze(
+        df_events_reader=_chunks(dataframes[GDELTFileType.EVENTS]),
+        df_gkg_reader=_chunks(df_gkg),
+        database_url=context.database_url,
+        policy=WritePolicy.REPLACE_PARTITION,
+        partition_value=int(context.date.strftime("%Y%m%d")),
+        df_gkg_derived_readers={
+            table_name: [
+                derive(pa.Table.from_pandas(chunk[columns], preserve_index=False))
+                for chunk in _chunks(df_gkg)
+            ]
+            for table_name, (columns, derive) in GKG_DERIVED_TABLES.items()
+        },
+    )
+    result["bytes"] = sum(context.csv_bytes.values())
+
+
+async def bench_flow(context: BenchmarkContext, result: Dict[str, Any]) -> None:
+    if str(FLOWS_DIR) not in sys.path:
+        sys.path.insert(0, str(FLOWS_DIR))
+    from flows.ingestion import gdelt_ingestion_flow
+
+    # The flow runs its own event loop, while this one keeps serving the files
+    await asyncio.to_thread(
+        gdelt_ingestion_flow,
+        database_url=context.database_url,
+        start_date=context.date,
+        end_date=context.date,
+        reprocess=True,
+        promote_silver=False,
+    )
+    result["bytes"] = sum(context.csv_bytes.values())
+
+
+# Benchmarked stages, in the order they run
+STAGES: Dict[str, Callable[[BenchmarkContext, Dict[str, Any]], Awaitable[None]]] = {
+    "download": bench_download,
+    "unzip": bench_unzip,
+    "load": bench_load,
+    "load_stream": bench_load_stream,
+    "df_to_postgres": bench_df_to_postgres,
+    "upload": bench_upload,
+    "flow": bench_flow,
+}
+
+# Stages that need the database
+DATABASE_STAGES = {"df_to_postgres", "upload", "flow"}
+
+
+async def setup_database(database_url: str) -> None:
+    """
+    Asynchronously creates the schemas and tables the database stages load into.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+    """
+    await create_schema_if_not_exists(database_url=database_url, schema_name="bronze")
+    await create_schema_if_not_exists(database_url=database_url, schema_name="benchmark")
+    await create_tables_if_not_exist(database_url=database_url, declarative_base=Base)
+    await create_events_decoded_view(database_url=database_url)
+
+
+async def run_benchmarks(
+    sizes: List[int],
+    stages: List[str],
+    workdir: str | Path,
+    database_url: str | None = None,
+    repeat: int = 1,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Asynchronously measures the ingestion stages over synthetic files of several sizes.
+
+    Files are generated (or reused) for each size, served by a local stub of GDELT's server,
+    and loaded into the given database. Each stage runs `repeat` times, and its fastest run is
+    kept.
+
+    Args:
+        sizes (List[int]): The numbers of events to generate (GDELT has about 200k a day).
+        stages (List[str]): The stages to measure, from `STAGES`.
+        workdir (str | Path): Where generated and intermediate files are written.
+        database_url (str | None): The URL of the PostgreSQL database. Only needed for the
+            database stages.
+        repeat (int): How many times to run each stage.
+        seed (int): The seed of the generated files.
+
+    Returns:
+        List[Dict[str, Any]]: For each size and stage, the rows and bytes it processed, its wall
+        time, throughputs and peak resident memory.
+    """
+    workdir = Path(workdir)
+    if DATABASE_STAGES.intersection(stages):
+        if database_url is None:
+            raise ValueError("A database URL is needed to benchmark the database stages.")
+        await setup_database(database_url)
+
+    results = []
+    async with GDELTStubServer() as server:
+        os.environ[GDELT_BASE_URL_ENV_VAR] = server.base_url
+        for index, size in enumerate(sizes):
+            date = get_benchmark_date(index)
+            print(f"Generating files with {size} events for {date:%Y-%m-%d}")
+            paths = await asyncio.to_thread(
+                generate_gdelt_files, size, date, workdir / "files", seed
+            )
+            for type_, path in paths.items():
+                server.publish_archive(date=date, type_=type_, archive=path.read_bytes())
+            context = BenchmarkContext(
+                size=size,
+                date=date,
+                paths=paths,
+                workdir=workdir / "stages" / str(size),
+                database_url=database_url,
+            )
+            context.workdir.mkdir(parents=True, exist_ok=True)
+
+            for stage in stages:
+                runs = []
+                for _ in range(repeat):
+                    with measure(stage, rows=context.rows, size=size) as result:
+                        await STAGES[stage](context, result)
+                    runs.append(result)
+                best = min(runs, key=lambda run: run["wall_seconds"])
+                print(format_result(best))
+                results.append(best)
+    await close_http_client()
+    await dispose_engines()
+    return results
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    """
+    Formats the result of a stage as a line of the report.
+
+    Args:
+        result (Dict[str, Any]): The result, as returned by `run_benchmarks`.
+
+    Returns:
+        str: The line.
+    """
+    return (
+        f"{result['stage']:>15} {result['size']:>10} events: "
+        f"{result['wall_seconds']:8.2f} s, {result['rows_per_second']:12,.0f} rows/s, "
+        f"{result['bytes_per_second'] / 1024**2:8.1f} MB/s, "
+        f"peak RSS {result['peak_rss_bytes'] / 1024**2:8.0f} MB "
+        f"(+{result['peak_rss_increase_bytes'] / 1024**2:.0f} MB)"
+    )
+
+
+def compare_results(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> str:
+    """
+    Formats how the throughput of each stage changed from a baseline run.
+
+    Args:
+        results (List[Dict[str, Any]]): The results of this run.
+        baseline (List[Dict[str, Any]]): The results of the baseline run.
+
+    Returns:
+        str: One line per stage and size measured in both runs.
+    """
+    baseline_by_key = {(result["stage"], result["size"]): result for result in baseline}
+    lines = []
+    for result in results:
+        previous = baseline_by_key.get((result["stage"], result["size"]))
+        if previous is None or not previous["wall_seconds"]:
+            continue
+        speedup = previous["wall_seconds"] / result["wall_seconds"]
+        memory = result["peak_rss_bytes"] / previous["peak_rss_bytes"]
+        lines.append(
+            f"{result['stage']:>15} {result['size']:>10} events: {speedup:5.2f}x faster, "
+            f"{memory:5.2f}x peak RSS"
+        )
+    return "\n".join(lines)
+
+
+def get_environment() -> Dict[str, Any]:
+    """
+    Describes the machine the benchmarks ran on, to tell apart results from different machines.
+
+    Returns:
+        Dict[str, Any]: The Python version, platform and number of CPUs.
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ran_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def save_results(results: List[Dict[str, Any]], path: str | Path) -> None:
+    """
+    Saves the results of a run (with its environment) as JSON, to compare later runs with.
+
+    Args:
+        results (List[Dict[str, Any]]): The results, as returned by `run_benchmarks`.
+        path (str | Path): The path of the JSON file.
+    """
+    Path(path).write_text(
+        json.dumps({"environment": get_environment(), "results": results}, indent=2)
+    )
+
+
+def load_results(path: str | Path) -> List[Dict[str, Any]]:
+    """
+    Loads the results saved by `save_results`.
+
+    Args:
+        path (str | Path): The path of the JSON file.
+
+    Returns:
+        List[Dict[str, Any]]: The results.
+    """
+    return json.loads(Path(path).read_text())["results"]
@@ -1,4 +1,6 @@
 
+-- One-off backfill of the whole history. New dates are promoted incrementally by the ingestion
+-- flow (see minerva_elders.base.db.silver), which uses the same column mapping.
 INSERT INTO silver.explicit_gkg (
     "GlobalKnowledgeGraphUUID",
     "RecordDate",
@@ -67,6 +67,11 @@ CREATE TABLE silver.explicit_gdelt_events (
     "Source_URL" varchar NULL -- URL of the source document
 );
 
+CREATE INDEX IF NOT EXISTS "explicit_gdelt_events_Event_DateAdded_idx"
+    ON silver.explicit_gdelt_events ("Event_DateAdded");
+
+-- One-off backfill of the whole history. New dates are promoted incrementally by the ingestion
+-- flow (see minerva_elders.base.db.silver), which uses the same column mapping.
 INSERT INTO silver.explicit_gdelt_events (
     "GlobalEventID",
     "EventDate_Day",
@@ -186,6 +191,6 @@ SELECT
     "ActionGeo_FeatureID",
     "DATEADDED" AS "Event_DateAdded",
     "SOURCEURL" AS "Source_URL"
-FROM bronze.events;
+FROM bronze.events_decoded;
 
 
@@ -1,24 +1,18 @@
--- Join using default gkg tables
-WITH exploded_events AS (
-	SELECT 
-		CAST(UNNEST(STRING_TO_ARRAY("CAMEOEVENTIDS", ',')) AS INT) AS "ExplodedEvents",
-		*
-	FROM bronze.gkg
-)
+-- Join using default gkg tables (links between GKG records and events are exploded at ingest)
+SELECT
+	g."DATE" AS "NewsPublicationDate",
+	e.*
+FROM bronze.events_decoded AS e
+LEFT JOIN bronze.gkg_event_links AS l
+	ON e."GlobalEventID" = l.global_event_id
+LEFT JOIN bronze.gkg AS g
+	ON g."UUID" = l.gkg_id
+	AND g."DATE" = l.date
 
-SELECT 
-	ee."DATE" AS "NewsPublicationDate",
-	
-FROM bronze.events
-LEFT JOIN exploded_events AS ee
-	ON "GlobalEventID" = ee."ExplodedEvents"
 
-
--- exploding CAMEOEVENTIDS
-select * 
-from bronze.events as e
-where "GlobalEventID" in (
-	select cast(unnest(string_to_array("CAMEOEVENTIDS", ',')) as INT) AS parts
-	from bronze.gkg
-	where "UUID" = 'cbdef974-b299-4f9a-8fad-47f02fe18f0e'
-)
\ No newline at end of file
+-- events of a gkg record
+select e.*
+from bronze.gkg_event_links as l
+join bronze.events_decoded as e
+	on e."GlobalEventID" = l.global_event_id
+where l.gkg_id = 3077508263638313967
@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date, datetime, time
+from functools import partial
+from os import getenv, getpid
+from pathlib import Path
+from socket import gethostname
+from typing import Any, Dict, List, Tuple
+
+from minerva_elders.base.cache import ArchiveCache
+from minerva_elders.base.db.leases import (
+    BackfillUnit,
+    LeaseStatus,
+    claim_backfill_units,
+    enqueue_backfill_units,
+    get_backfill_progress,
+    release_backfill_unit,
+    renew_backfill_leases,
+)
+from minerva_elders.base.db.manifest import ManifestStatus, get_manifest_statuses
+from minerva_elders.base.db.silver import promote_to_silver
+from minerva_elders.base.db.utils import WritePolicy, dispose_engines
+from minerva_elders.base.executor import get_process_pool
+from minerva_elders.base.gdelt import (
+    DAILY_FILE_TYPES,
+    GDELTFileType,
+    get_gdelt_file_size,
+)
+from minerva_elders.base.instrumentation import scope
+from minerva_elders.base.io import (
+    HTTPClient,
+    MemoryBudget,
+    close_http_client,
+    get_http_client,
+    get_memory_budget,
+)
+from minerva_elders.base.metrics import collect_metrics, write_openmetrics
+from prefect import flow, task
+
+from flows.ingestion import (
+    generate_date_list,
+    load_staged_files,
+    setup_bronze_schema,
+    setup_silver_schema,
+    stage_gdelt_file,
+)
+
+
+def get_backfill_id(start_date: datetime, end_date: datetime) -> str:
+    """
+    Returns the default identifier of the backfill of a period, shared by all of its workers.
+
+    Args:
+        start_date (datetime): The start date.
+        end_date (datetime): The end date (inclusive).
+    """
+    return f"gdelt-{start_date:%Y%m%d}-{end_date:%Y%m%d}"
+
+
+@task(retries=3, retry_delay_seconds=10, tags=["data-fetching"])
+async def plan_backfill(
+    database_url: str,
+    backfill_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    skip_completed: bool = True,
+    max_connections: int = 16,
+    max_connections_per_host: int = 8,
+) -> int:
+    """
+    Task that records the units of work of a backfill (one per date and file type) in the
+    lease table, with the size of their archives.
+
+    Sizes are read from GDELT with HEAD requests, without downloading the archives, so workers
+    can start with the largest files. Planning a backfill again only adds the units it
+    doesn't have yet.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        backfill_id (str): The identifier of the backfill.
+        start_date (datetime): The start date.
+        end_date (datetime): The end date (inclusive).
+        skip_completed (bool): Whether to leave out files that the manifest shows as loaded.
+        max_connections (int): The maximum number of simultaneous requests.
+        max_connections_per_host (int): The maximum number of simultaneous requests per host.
+
+    Returns:
+        int: The number of units that were added to the backfill.
+    """
+    date_list = generate_date_list.fn(start_date=start_date, end_date=end_date)
+    statuses = {}
+    if skip_completed:
+        statuses = await get_manifest_statuses(
+            database_url, [date.date() for date in date_list]
+        )
+    pairs = [
+        (date, type_)
+        for date in date_list
+        for type_ in DAILY_FILE_TYPES
+        if statuses.get((date.date(), type_.value)) != ManifestStatus.COMPLETED
+    ]
+
+    # HEAD requests are cheap, the connection limits keep them from flooding GDELT
+    client = get_http_client(
+        limit=max_connections, limit_per_host=max_connections_per_host
+    )
+    sizes = await asyncio.gather(
+        *[
+            get_gdelt_file_size(date=date, type_=type_, client=client)
+            for date, type_ in pairs
+        ]
+    )
+    units = [
+        BackfillUnit(date=date.date(), file_type=type_.value, expected_bytes=size)
+        for (date, type_), size in zip(pairs, sizes)
+    ]
+    added = await enqueue_backfill_units(database_url, backfill_id, units)
+    total_bytes = sum(size or 0 for size in sizes)
+    print(
+        f"Planned {len(units)} units ({total_bytes / 1024**3:.2f} GB) for backfill "
+        f"{backfill_id}, {added} of them new"
+    )
+    return added
+
+
+async def ingest_backfill_unit(
+    unit: BackfillUnit,
+    database_url: str,
+    client: HTTPClient,
+    cache: ArchiveCache | None,
+    budget: MemoryBudget | None = None,
+    executor: Executor | None = None,
+    stream: bool = True,
+    policy: WritePolicy = WritePolicy.REPLACE_PARTITION,
+    promote_silver: bool = True,
+    upload_options: Dict[str, Any] | None = None,
+) -> List[str]:
+    """
+    Ingests the file of a unit of a backfill into bronze (and silver), like the ingestion flow
+    does for the files of a date.
+
+    Only the tables of the unit's file type are loaded, so the files of a date can be ingested
+    by different workers.
+
+    Returns:
+        List[str]: The names of the bronze tables that were loaded.
+    """
+    date = datetime.combine(unit.date, time())
+    type_ = GDELTFileType(unit.file_type)
+    path = await stage_gdelt_file(
+        date=date,
+        type_=type_,
+        database_url=database_url,
+        stream=stream,
+        client=client,
+        cache=cache,
+        budget=budget,
+        executor=executor,
+    )
+    try:
+        loaded_tables = await load_staged_files(
+            date=date,
+            paths={type_: path},
+            database_url=database_url,
+            policy=policy,
+            **(upload_options or {}),
+        )
+    finally:
+        Path(path).unlink(missing_ok=True)
+    if promote_silver:
+        await promote_to_silver(
+            database_url=database_url,
+            bronze_table_names=loaded_tables,
+            values=[int(date.strftime("%Y%m%d"))],
+        )
+    return loaded_tables
+
+
+async def run_backfill_worker(
+    database_url: str,
+    backfill_id: str,
+    worker_id: str | None = None,
+    concurrency: int = 2,
+    lease_seconds: float = 600,
+    heartbeat_seconds: float = 60,
+    poll_seconds: float = 30,
+    max_attempts: int = 3,
+    stream: bool = True,
+    max_connections: int = 16,
+    max_connections_per_host: int = 8,
+    cache_dir: str | None = "/tmp/gdelt/archives",
+    cache_max_bytes: int = 20 * 1024**3,
+    memory_budget_bytes: int = 1024**3,
+    parse_processes: int = 0,
+    policy: WritePolicy = WritePolicy.REPLACE_PARTITION,
+    promote_silver: bool = True,
+    upload_options: Dict[str, Any] | None = None,
+    metrics_file: str | None = None,
+) -> Dict[str, int]:
+    """
+    Asynchronously works on a backfill until none of its units are left.
+
+    Each of the worker's slots leases the largest unit left, ingests it, and records its
+    outcome. While units are being ingested, their leases are renewed every
+    `heartbeat_seconds` (the worker's heartbeat). When a worker dies or hangs, its leases
+    expire, and the other workers steal its units. Once no unit is pending, idle slots keep
+    polling until the units leased by other workers are done, in case they have to be stolen.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        backfill_id (str): The identifier of the backfill.
+        worker_id (str | None): The identifier of the worker. Defaults to the host name and
+            process ID.
+        concurrency (int): The number of units ingested at once.
+        lease_seconds (float): For how long units are leased, from the last heartbeat. It
+            should be several heartbeats long, so that a slow heartbeat doesn't lose a lease.
+        heartbeat_seconds (float): How often the leases are renewed.
+        poll_seconds (float): How long idle slots wait before looking for units to steal.
+        max_attempts (int): How many times a unit is leased before it's given up.
+        stream (bool): Whether to parse the files while downloading them.
+        max_connections (int): The maximum number of simultaneous download connections.
+        max_connections_per_host (int): The maximum number of simultaneous connections per host.
+        cache_dir (str | None): Where to cache the raw archives. If None, they're not cached.
+        cache_max_bytes (int): The maximum size of the archive cache, in bytes.
+        memory_budget_bytes (int): When streaming, the maximum size of the batches held in
+            memory at once, in bytes.
+        parse_processes (int): The number of worker processes that parse the files. If 0,
+            files are parsed in threads.
+        policy (WritePolicy): How the batches are committed. Replacing partitions keeps units
+            idempotent, in case a stolen unit is also finished by its first worker.
+        promote_silver (bool): Whether to promote the loaded rows to the silver tables.
+        upload_options (Dict[str, Any] | None): Arguments for `load_staged_files` (e.g.
+            `concurrency`).
+        metrics_file (str | None): Where to write the metrics of the units ingested by the
+            worker, in the OpenMetrics text format. If None, they're only logged.
+
+    Returns:
+        Dict[str, int]: The number of units the worker completed and failed.
+    """
+    worker_id = worker_id or f"{gethostname()}-{getpid()}"
+    client = get_http_client(
+        limit=max_connections, limit_per_host=max_connections_per_host
+    )
+    cache = ArchiveCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+    budget = get_memory_budget(memory_budget_bytes)
+    executor = get_process_pool(parse_processes) if parse_processes > 0 else None
+    # Units being ingested, whose leases the heartbeat renews
+    held: Dict[Tuple[date, str], BackfillUnit] = {}
+    counts = {LeaseStatus.COMPLETED.value: 0, LeaseStatus.FAILED.value: 0}
+
+    async def heartbeat() -> None:
+        while True:
+            await asyncio.sleep(heartbeat_seconds)
+            try:
+                lost = await renew_backfill_leases(
+                    database_url,
+                    backfill_id,
+                    worker_id,
+                    units=list(held.values()),
+                    lease_seconds=lease_seconds,
+                )
+            except Exception as error:
+                # The leases may still be renewed by the next heartbeat
+                print(f"Worker {worker_id} failed to renew its leases: {error!r}")
+                continue
+            for unit in lost:
+                print(
+                    f"Worker {worker_id} lost its lease on {unit.file_type} {unit.date}, "
+                    "another worker took it over"
+                )
+
+    async def work() -> None:
+        while True:
+            units = await claim_backfill_units(
+                database_url,
+                backfill_id,
+                worker_id,
+                limit=1,
+                lease_seconds=lease_seconds,
+                max_attempts=max_attempts,
+            )
+            if not units:
+                progress = await get_backfill_progress(database_url, backfill_id)
+                if (
+                    not progress[LeaseStatus.PENDING]
+                    and not progress[LeaseStatus.LEASED]
+                ):
+                    return
+                # Other workers hold the units left, which can be stolen once they expire
+                await asyncio.sleep(poll_seconds)
+                continue
+
+            unit = units[0]
+            key = (unit.date, unit.file_type)
+            held[key] = unit
+            label = unit.date.strftime("%Y-%m-%d")
+            size = (
+                f"{unit.expected_bytes / 1024**2:.1f} MB"
+                if unit.expected_bytes
+                else "?"
+            )
+            print(f"Worker {worker_id} ingesting {unit.file_type} for {label} ({size})")
+            error_description = None
+            try:
+                with (
+                    scope(label),
+                    collect_metrics(
+                        date=label, step=f"backfill_{unit.file_type}"
+                    ) as metrics,
+                ):
+                    await ingest_backfill_unit(
+                        unit,
+                        database_url=database_url,
+                        client=client,
+                        cache=cache,
+                        budget=budget,
+                        executor=executor,
+                        stream=stream,
+                        policy=policy,
+                        promote_silver=promote_silver,
+                        upload_options=upload_options,
+                    )
+            except Exception as error:
+                error_description = repr(error)
+                print(
+                    f"Worker {worker_id} failed {unit.file_type} for {label}: {error!r}"
+                )
+            else:
+                print(metrics.format_summary())
+                if metrics_file:
+                    write_openmetrics(metrics_file)
+            finally:
+                held.pop(key, None)
+            status = LeaseStatus.FAILED if error_description else LeaseStatus.COMPLETED
+            counts[status.value] += 1
+            owned = await release_backfill_unit(
+                database_url,
+                backfill_id,
+                worker_id,
+                unit,
+                status=status,
+                error=error_description,
+                max_attempts=max_attempts,
+            )
+            if not owned:
+                print(
+                    f"Worker {worker_id} finished {unit.file_type} for {label} after "
+                    "its lease was taken over"
+                )
+
+    print(f"Worker {worker_id} joining backfill {backfill_id}")
+    heartbeat_task = asyncio.ensure_future(heartbeat())
+    try:
+        await asyncio.gather(*[work() for _ in range(max(concurrency, 1))])
+    finally:
+        heartbeat_task.cancel()
+        await asyncio.gather(heartbeat_task, return_exceptions=True)
+    print(
+        f"Worker {worker_id} done with backfill {backfill_id}: "
+        f"{counts['completed']} units completed, {counts['failed']} failed"
+    )
+    return counts
+
+
+def run_backfill_worker_process(**kwargs) -> Dict[str, int]:
+    """
+    Runs a backfill worker in its own event loop, e.g. in a separate process.
+
+    Args:
+        **kwargs: Arguments for `run_backfill_worker`.
+
+    Returns:
+        Dict[str, int]: The number of units the worker completed and failed.
+    """
+
+    async def run() -> Dict[str, int]:
+        try:
+            return await run_backfill_worker(**kwargs)
+        finally:
+            await close_http_client()
+            await dispose_engines()
+
+    return asyncio.run(run())
+
+
+@task(tags=["data-fetching", "database-operations"], cache_result_in_memory=False)
+async def run_backfill_workers(
+    database_url: str, backfill_id: str, processes: int = 1, **worker_options
+) -> Dict[str, int]:
+    """
+    Task that runs backfill workers until none of the backfill's units are left.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        backfill_id (str): The identifier of the backfill.
+        processes (int): The number of worker processes. With 1, the worker runs in the
+            task's own event loop; with more, each one runs in a spawned process, like workers
+            on separate machines would.
+        **worker_options: Arguments for `run_backfill_worker`.
+
+    Returns:
+        Dict[str, int]: The number of units the workers completed and failed.
+    """
+    if processes <= 1:
+        return await run_backfill_worker(database_url, backfill_id, **worker_options)
+
+    loop = asyncio.get_running_loop()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        results = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    pool,
+                    partial(
+                        run_backfill_worker_process,
+                        database_url=database_url,
+                        backfill_id=backfill_id,
+                        **worker_options,
+                    ),
+                )
+                for _ in range(processes)
+            ]
+        )
+    return {status: sum(result[status] for result in results) for status in results[0]}
+
+
+@flow
+async def gdelt_backfill_flow(
+    database_url: str,
+    start_date: datetime,
+    end_date: datetime,
+    backfill_id: str | None = None,
+    plan: bool = True,
+    skip_completed: bool = True,
+    processes: int = 1,
+    promote_silver: bool = True,
+    worker_options: Dict[str, Any] | None = None,
+) -> Dict[str, int]:
+    """
+    Flow that backfills a period with workers sharing its units of work through leases.
+
+    The period is split into one unit per date and file type, recorded in a lease table in the
+    database. Any number of runs of this flow (e.g. on several machines) with the same
+    backfill ID work on the same units: each unit is leased by a single worker at a time, the
+    largest first, and units left behind by dead workers are stolen by the others.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        start_date (datetime): The start date.
+        end_date (datetime): The end date (inclusive).
+        backfill_id (str | None): The identifier of the backfill. Defaults to one derived from
+            the period, so runs with the same dates join the same backfill.
+        plan (bool): Whether to plan the backfill. Runs that join a backfill that was already
+            planned can skip it.
+        skip_completed (bool): When planning, whether to leave out files that the manifest
+            shows as loaded.
+        processes (int): The number of worker processes run by this flow.
+        promote_silver (bool): Whether to promote the loaded rows to the silver tables.
+        worker_options (Dict[str, Any] | None): Arguments for `run_backfill_worker` (e.g.
+            `concurrency`, `lease_seconds`).
+
+    Returns:
+        Dict[str, int]: The number of units of the backfill with each status, once the workers
+        are done.
+    """
+    backfill_id = backfill_id or get_backfill_id(start_date, end_date)
+
+    # Set up the bronze schema (including the lease table) and the silver tables
+    await setup_bronze_schema(database_url=database_url)
+    if promote_silver:
+        await setup_silver_schema(database_url=database_url)
+
+    if plan:
+        await plan_backfill(
+            database_url=database_url,
+            backfill_id=backfill_id,
+            start_date=start_date,
+            end_date=end_date,
+            skip_completed=skip_completed,
+        )
+    await run_backfill_workers(
+        database_url=database_url,
+        backfill_id=backfill_id,
+        processes=processes,
+        promote_silver=promote_silver,
+        **(worker_options or {}),
+    )
+
+    progress = await get_backfill_progress(database_url, backfill_id)
+    print(
+        f"Backfill {backfill_id}: "
+        + ", ".join(f"{count} {status.value}" for status, count in progress.items())
+    )
+    if progress[LeaseStatus.FAILED]:
+        raise RuntimeError(
+            f"{progress[LeaseStatus.FAILED]} units of backfill {backfill_id} failed."
+        )
+    return {status.value: count for status, count in progress.items()}
+
+
+if __name__ == "__main__":
+    # This is just for local execution, e.g. with several worker processes against one database
+    # Get input values
+    required_envs = ["START_DATE", "END_DATE", "DATABASE_URL"]
+    missing_envs = [env for env in required_envs if not getenv(env)]
+    if missing_envs:
+        raise ValueError(f"Missing required environment variables: {missing_envs}")
+    env_values = {env: getenv(env) for env in required_envs}
+
+    # Parse the dates
+    try:
+        start_date = datetime.strptime(env_values["START_DATE"], "%Y-%m-%d")
+        end_date = datetime.strptime(env_values["END_DATE"], "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+    # Run the flow
+    asyncio.run(
+        gdelt_backfill_flow(
+            database_url=env_values["DATABASE_URL"],
+            start_date=start_date,
+            end_date=end_date,
+            processes=int(getenv("BACKFILL_PROCESSES", "2")),
+        )
+    )
@@ -1,18 +1,74 @@
 # -*- coding: utf-8 -*-
-from datetime import datetime, timedelta
+import asyncio
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from datetime import datetime, time, timedelta
 from os import getenv
 from pathlib import Path
-from typing import List, Tuple
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
 
-import pandas as pd
+from aiohttp import ClientResponseError
+from minerva_elders.base.cache import ArchiveCache
 from minerva_elders.base.db import bronze
+from minerva_elders.base.db.manifest import (
+    ManifestStatus,
+    get_manifest_statuses,
+    get_watermark,
+    record_manifest_entry,
+)
+from minerva_elders.base.db.silver import create_silver_tables, promote_to_silver
 from minerva_elders.base.db.utils import (
+    WritePolicy,
+    create_events_decoded_view,
     create_schema_if_not_exists,
     create_tables_if_not_exist,
+    get_engine,
     load_dataframes_to_bronze,
 )
-from minerva_elders.base.gdelt import load_gdelt_files
+from minerva_elders.base.executor import get_process_pool
+from minerva_elders.base.gdelt import (
+    DAILY_FILE_TYPES,
+    GDELTFileType,
+    get_gdelt_file_md5,
+    get_gdelt_file_url,
+    get_gdelt_microbatches,
+    get_latest_gdelt_microbatch,
+    load_gdelt_file,
+    stream_gdelt_file,
+)
+from minerva_elders.base.gkg import GKG_DERIVED_TABLES
+from minerva_elders.base.instrumentation import (
+    LoopMonitor,
+    get_loop_monitor,
+    instrumentation_enabled,
+    scope,
+    stage,
+)
+from minerva_elders.base.io import (
+    HTTPClient,
+    MemoryBudget,
+    get_http_client,
+    get_memory_budget,
+    iter_parquet_batches,
+    write_parquet,
+    write_parquet_batches,
+)
+from minerva_elders.base.metrics import (
+    MetricsCollector,
+    collect_metrics,
+    write_openmetrics,
+)
+from minerva_elders.base.pipeline import Pipeline, Stage
 from prefect import flow, task
+from prefect.artifacts import create_table_artifact
+
+# Bronze tables loaded from each type of GDELT file
+BRONZE_TABLE_NAMES = {
+    GDELTFileType.EVENTS: bronze.EVENTS_TABLE_NAME,
+    GDELTFileType.GKG: bronze.GKG_TABLE_NAME,
+}
 
 
 @task(retries=3, retry_delay_seconds=10)
@@ -28,9 +84,23 @@ async def setup_bronze_schema(database_url: str) -> None:
     await create_tables_if_not_exist(
         database_url=database_url, declarative_base=bronze.Base
     )
+    await create_events_decoded_view(database_url=database_url)
     print("Bronze schema set up in the database")
 
 
+@task(retries=3, retry_delay_seconds=10)
+async def setup_silver_schema(database_url: str) -> None:
+    """
+    Task that sets up the silver schema in the PostgreSQL database.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+    """
+    print("Setting up silver schema in the database")
+    await create_silver_tables(database_url=database_url)
+    print("Silver schema set up in the database")
+
+
 @task
 def generate_date_list(start_date: datetime, end_date: datetime) -> List[datetime]:
     """
@@ -48,31 +118,348 @@ def generate_date_list(start_date: datetime, end_date: datetime) -> List[datetim
     return date_list
 
 
+async def get_pending_file_types(
+    database_url: str, date: datetime
+) -> List[GDELTFileType]:
+    """
+    Returns the types of the files of a date that haven't been completely loaded yet.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        date (datetime): The date of the files.
+    """
+    statuses = await get_manifest_statuses(database_url, [date.date()])
+    return [
+        type_
+        for type_ in DAILY_FILE_TYPES
+        if statuses.get((date.date(), type_.value)) != ManifestStatus.COMPLETED
+    ]
+
+
+@task(retries=3, retry_delay_seconds=10)
+async def plan_dates(
+    database_url: str,
+    start_date: datetime = None,
+    end_date: datetime = None,
+    skip_completed: bool = True,
+) -> List[datetime]:
+    """
+    Task that lists the dates that need to be ingested, according to the manifest.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        start_date (datetime): The start date. If not provided, defaults to the day after the
+            unbroken run of completely loaded dates (or to yesterday, if nothing was loaded
+            yet), so dates that failed before later ones were loaded are resumed.
+        end_date (datetime): The end date (inclusive). If not provided, defaults to the start
+            date when it's provided, and to yesterday otherwise.
+        skip_completed (bool): Whether to leave out dates whose files were all loaded already.
+    """
+    yesterday = datetime.combine(datetime.now().date(), time()) - timedelta(days=1)
+    if start_date is None:
+        file_types = [type_.value for type_ in DAILY_FILE_TYPES]
+        watermark = await get_watermark(database_url, file_types)
+        if watermark is not None:
+            start_date = datetime.combine(watermark, time()) + timedelta(days=1)
+        else:
+            start_date = yesterday
+        end_date = end_date or yesterday
+    end_date = end_date or start_date
+    date_list = generate_date_list.fn(start_date=start_date, end_date=end_date)
+
+    if skip_completed:
+        statuses = await get_manifest_statuses(
+            database_url, [date.date() for date in date_list]
+        )
+        date_list = [
+            date
+            for date in date_list
+            if any(
+                statuses.get((date.date(), type_.value)) != ManifestStatus.COMPLETED
+                for type_ in DAILY_FILE_TYPES
+            )
+        ]
+    print(f"Planned {len(date_list)} dates to ingest")
+    return date_list
+
+
+def report_loop_health(monitor: LoopMonitor | None, date: datetime, step: str) -> None:
+    """
+    Logs the health of the event loop and what blocked it while processing a date, if monitored.
+
+    Args:
+        monitor (LoopMonitor | None): The monitor of the event loop, if any.
+        date (datetime): The date that was processed.
+        step (str): What was done with the date (e.g. `loading`).
+    """
+    if monitor is not None:
+        label = date.strftime("%Y-%m-%d")
+        print(
+            f"Event loop health while {step} {label}:\n"
+            + monitor.format_report(scope=label, clear=True)
+        )
+
+
+async def publish_metrics(
+    collector: MetricsCollector, key: str, metrics_file: str | None = None
+) -> None:
+    """
+    Logs the metrics of each stage of a task, and publishes them as a Prefect table artifact.
+
+    Args:
+        collector (MetricsCollector): The metrics collected while the task ran.
+        key (str): The key of the artifact (lowercase letters, numbers and dashes), e.g.
+            `gdelt-load-20240101`.
+        metrics_file (str | None): Where to write the metrics of every task that ran in this
+            process so far, in the OpenMetrics text format. If None, they aren't written.
+    """
+    print(collector.format_summary())
+    labels = ", ".join(f"{name} {value}" for name, value in collector.labels.items())
+    await create_table_artifact(
+        key=key,
+        table=collector.summary(),
+        description=f"Metrics of each stage for {labels}",
+    )
+    if metrics_file:
+        write_openmetrics(metrics_file)
+
+
+async def stage_gdelt_file(
+    date: datetime,
+    type_: GDELTFileType,
+    database_url: str,
+    stream: bool,
+    client: HTTPClient,
+    cache: ArchiveCache | None,
+    budget: MemoryBudget | None = None,
+    executor: Executor | None = None,
+) -> str:
+    """
+    Loads a GDELT file, writes it to a Parquet file and records it in the manifest.
+
+    When streaming, batches are written as they're parsed, so the file is never fully held in
+    memory, and the batches in flight are bounded by the memory budget.
+
+    Returns:
+        str: The path to the Parquet file.
+    """
+    started_at = monotonic()
+    # Hand the data over as a typed, compressed Parquet file, named uniquely so that concurrent
+    # loads of the same file (e.g. after a backfill lease was stolen) don't overwrite it
+    path = (
+        Path(f"/tmp/gdelt/{date.strftime('%Y%m%d')}")
+        / f"{type_.value}_{uuid4().hex[:8]}.parquet"
+    )
+    try:
+        with stage(f"load_{type_.value}"):
+            if stream:
+                rows = await write_parquet_batches(
+                    stream_gdelt_file(
+                        date=date,
+                        type_=type_,
+                        client=client,
+                        cache=cache,
+                        budget=budget,
+                        executor=executor,
+                    ),
+                    path,
+                )
+                if rows == 0:
+                    raise ValueError("No rows streamed from the GDELT file.")
+            else:
+                df = await load_gdelt_file(
+                    date=date,
+                    type_=type_,
+                    client=client,
+                    cache=cache,
+                    executor=executor,
+                )
+                write_parquet(df, path)
+                del df
+    except Exception:
+        # A partial file is of no use, retries write to a new one
+        path.unlink(missing_ok=True)
+        raise
+    await record_manifest_entry(
+        database_url=database_url,
+        date_=date.date(),
+        file_type=type_.value,
+        status=ManifestStatus.DOWNLOADED,
+        checksum=await get_gdelt_file_md5(date=date, type_=type_, client=client),
+        byte_size=path.stat().st_size,
+        download_seconds=monotonic() - started_at,
+    )
+    return str(path)
+
+
 @task(
     retries=3,
     retry_delay_seconds=10,
     tags=["data-fetching"],
     cache_result_in_memory=False,
 )
-async def get_raw_dataframes(date: datetime) -> Tuple[str, str]:
+async def get_raw_dataframes(
+    date: datetime,
+    database_url: str,
+    stream: bool = True,
+    max_connections: int = 16,
+    max_connections_per_host: int = 8,
+    cache_dir: str | None = "/tmp/gdelt/archives",
+    cache_max_bytes: int = 20 * 1024**3,
+    skip_completed: bool = True,
+    memory_budget_bytes: int = 1024**3,
+    parse_processes: int = 0,
+    instrument: bool = False,
+    metrics_file: str | None = None,
+) -> Tuple[Optional[str], Optional[str]]:
     """
     Task that loads GDELT files for a single date and returns the DataFrames.
 
+    Downloads go through an HTTP client shared by every task running in the same event loop, so
+    connections are reused across dates and the connection limits apply to all of them.
+
     Args:
         date (datetime): The date to process.
+        database_url (str): The URL of the PostgreSQL database, where the manifest is kept.
+        stream (bool): Whether to parse the files while downloading them, without scratch files.
+        max_connections (int): The maximum number of simultaneous download connections.
+        max_connections_per_host (int): The maximum number of simultaneous connections per host.
+        cache_dir (str | None): Where to cache the raw archives, so that retries and reruns
+            don't download them again. If None, archives are not cached.
+        cache_max_bytes (int): The maximum size of the archive cache, in bytes.
+        skip_completed (bool): Whether to skip files that the manifest shows as loaded.
+        memory_budget_bytes (int): When streaming, the maximum size of the batches held in memory
+            at once by all the tasks running in the same event loop, in bytes.
+        parse_processes (int): The number of worker processes that parse the files, shared by
+            all the tasks running in the same process. If 0, files are parsed in threads.
+        instrument (bool): Whether to monitor the event loop and log what blocked it.
+        metrics_file (str | None): Where to write the metrics of the tasks that ran in this
+            process, in the OpenMetrics text format. If None, they're only published as an
+            artifact.
 
     Returns:
-        Tuple[str, str]: Paths to the DataFrames containing the GDELT data.
+        Tuple[Optional[str], Optional[str]]: Paths to the DataFrames containing the GDELT data
+        (Events and GKG, respectively), or None for files that were skipped.
     """
     print(f"Loading GDELT files for date: {date}")
-    df_events, df_gkg = await load_gdelt_files(date=date)
-    print(f"Loaded GDELT files for date: {date}")
-    output_dir = Path(f"/tmp/gdelt/{date.strftime('%Y%m%d')}")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    df_events.to_csv(output_dir / "events.csv", index=False)
-    df_gkg.to_csv(output_dir / "gkg.csv", index=False)
-    del df_events, df_gkg
-    return str(output_dir / "events.csv"), str(output_dir / "gkg.csv")
+    client = get_http_client(
+        limit=max_connections, limit_per_host=max_connections_per_host
+    )
+    cache = ArchiveCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+    budget = get_memory_budget(memory_budget_bytes)
+    executor = get_process_pool(parse_processes) if parse_processes > 0 else None
+    if skip_completed:
+        file_types = await get_pending_file_types(database_url=database_url, date=date)
+    else:
+        file_types = list(DAILY_FILE_TYPES)
+    monitoring = instrument or instrumentation_enabled()
+    async with get_loop_monitor() if monitoring else nullcontext() as monitor:
+        label = date.strftime("%Y-%m-%d")
+        with scope(label), collect_metrics(date=label, step="load") as metrics:
+            paths = await asyncio.gather(
+                *[
+                    stage_gdelt_file(
+                        date=date,
+                        type_=type_,
+                        database_url=database_url,
+                        stream=stream,
+                        client=client,
+                        cache=cache,
+                        budget=budget,
+                        executor=executor,
+                    )
+                    for type_ in file_types
+                ]
+            )
+        print(f"Loaded GDELT files for date: {date}")
+        report_loop_health(monitor, date=date, step="loading")
+    await publish_metrics(
+        metrics, key=f"gdelt-load-{date:%Y%m%d}", metrics_file=metrics_file
+    )
+    paths_by_type = dict(zip(file_types, paths))
+    return paths_by_type.get(GDELTFileType.EVENTS), paths_by_type.get(GDELTFileType.GKG)
+
+
+async def load_staged_files(
+    date: datetime,
+    paths: Dict[GDELTFileType, Optional[str]],
+    database_url: str,
+    chunksize: int = 50_000,
+    concurrency: int = 4,
+    policy: WritePolicy = WritePolicy.UPSERT,
+    adaptive_batches: bool = True,
+    batch_target_seconds: float = 2.0,
+) -> List[str]:
+    """
+    Loads the staged Parquet files of a date into bronze, and records the outcome in the
+    manifest.
+
+    The tables derived from the GKG are exploded from the GKG file and loaded along with it.
+    The tables of the file types without a path are left untouched, even when replacing
+    partitions.
+
+    Args:
+        date (datetime): The date of the files.
+        paths (Dict[GDELTFileType, Optional[str]]): The paths of the Parquet files, by file
+            type (None for skipped files).
+        database_url (str): The URL of the PostgreSQL database.
+        chunksize (int): The number of rows read from the files at a time.
+        concurrency (int): The number of parallel writers for each table.
+        policy (WritePolicy): How the batches are committed.
+        adaptive_batches (bool): Whether to size the batches loaded into each table by bytes.
+        batch_target_seconds (float): With adaptive batches, the longest a commit should take.
+
+    Returns:
+        List[str]: The names of the bronze tables that were loaded.
+    """
+    paths = {type_: path for type_, path in paths.items() if path}
+    readers = {
+        type_: iter_parquet_batches(path, batch_size=chunksize)
+        for type_, path in paths.items()
+    }
+    path_gkg = paths.get(GDELTFileType.GKG)
+    gkg_derived_readers = {
+        table_name: map(
+            derive,
+            iter_parquet_batches(path_gkg, batch_size=chunksize, columns=columns),
+        )
+        for table_name, (columns, derive) in GKG_DERIVED_TABLES.items()
+        if path_gkg
+    }
+    started_at = monotonic()
+    try:
+        events_rows, gkg_rows = await load_dataframes_to_bronze(
+            df_events_reader=readers.get(GDELTFileType.EVENTS),
+            df_gkg_reader=readers.get(GDELTFileType.GKG),
+            database_url=database_url,
+            concurrency=concurrency,
+            policy=policy,
+            partition_value=int(date.strftime("%Y%m%d")),
+            df_gkg_derived_readers=gkg_derived_readers,
+            adaptive_batches=adaptive_batches,
+            batch_target_seconds=batch_target_seconds,
+        )
+    except Exception:
+        for type_ in paths:
+            await record_manifest_entry(
+                database_url=database_url,
+                date_=date.date(),
+                file_type=type_.value,
+                status=ManifestStatus.FAILED,
+            )
+        raise
+    load_seconds = monotonic() - started_at
+    row_counts = {GDELTFileType.EVENTS: events_rows, GDELTFileType.GKG: gkg_rows}
+    for type_ in paths:
+        await record_manifest_entry(
+            database_url=database_url,
+            date_=date.date(),
+            file_type=type_.value,
+            status=ManifestStatus.COMPLETED,
+            row_count=row_counts[type_],
+            load_seconds=load_seconds,
+        )
+    return [BRONZE_TABLE_NAMES[type_] for type_ in paths]
 
 
 @task(
@@ -82,31 +469,285 @@ async def get_raw_dataframes(date: datetime) -> Tuple[str, str]:
     cache_result_in_memory=False,
 )
 async def upload_to_bronze(
-    dataframes: Tuple[str, str], database_url: str, chunksize: int = 100
-) -> None:
+    date: datetime,
+    dataframes: Tuple[Optional[str], Optional[str]],
+    database_url: str,
+    chunksize: int = 50_000,
+    pool_size: int = 10,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    concurrency: int = 4,
+    policy: WritePolicy = WritePolicy.UPSERT,
+    instrument: bool = False,
+    metrics_file: str | None = None,
+    adaptive_batches: bool = True,
+    batch_target_seconds: float = 2.0,
+) -> List[str]:
     """
     Task that uploads the GDELT DataFrames to the PostgreSQL database.
 
+    Connections come from a pool shared by every task running in the same event loop. The
+    tables derived from the GKG (links to events, counts and locations) are exploded from the
+    GKG file and loaded along with it. The outcome of each upload is recorded in the manifest.
+
     Args:
-        dataframes (Tuple[str]): Paths for the DataFrames to upload.
+        date (datetime): The date of the files.
+        dataframes (Tuple[str]): Paths for the DataFrames to upload (None for skipped files).
         database_url (str): The URL of the PostgreSQL database.
+        chunksize (int): The number of rows read from the files at a time. Unless
+            `adaptive_batches` is False, the batches loaded are split and merged from them.
+        pool_size (int): The number of connections kept open in the shared pool.
+        max_overflow (int): The number of extra connections allowed when the pool is exhausted.
+        pool_timeout (float): How long to wait for a connection when the pool is exhausted.
+        concurrency (int): The number of parallel writers for each table. Writers of all the
+            dates uploaded at once share the pool, those beyond its capacity wait for a
+            connection to be released (see `get_writer_slots`).
+        policy (WritePolicy): How the batches are committed: one at a time (`per_batch`), all
+            or nothing (`atomic`), one at a time merged by primary key (`upsert`), so that
+            retries don't conflict with the batches loaded by previous attempts, or replacing
+            the date's partitions at once (`replace_partition`).
+        instrument (bool): Whether to monitor the event loop and log what blocked it.
+        metrics_file (str | None): Where to write the metrics of the tasks that ran in this
+            process, in the OpenMetrics text format. If None, they're only published as an
+            artifact.
+        adaptive_batches (bool): Whether to size the batches loaded into each table by bytes,
+            growing them while commits are fast and shrinking them when the database slows
+            down. Sizes carry over to the next dates uploaded in the same process.
+        batch_target_seconds (float): With adaptive batches, the longest a commit should take.
+
+    Returns:
+        List[str]: The names of the bronze tables that were loaded (those of skipped files are
+        left out).
     """
-    path_events, path_gkg = dataframes
-    df_events_reader = pd.read_csv(
-        path_events,
-        chunksize=chunksize,
-    )
-    df_gkg_reader = pd.read_csv(
-        path_gkg,
-        chunksize=chunksize,
+    get_engine(
+        database_url,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
     )
+    path_events, path_gkg = dataframes
+    paths = {GDELTFileType.EVENTS: path_events, GDELTFileType.GKG: path_gkg}
     print("Uploading DataFrames to the database")
-    await load_dataframes_to_bronze(
-        df_events_reader=df_events_reader,
-        df_gkg_reader=df_gkg_reader,
+    monitoring = instrument or instrumentation_enabled()
+    async with get_loop_monitor() if monitoring else nullcontext() as monitor:
+        label = date.strftime("%Y-%m-%d")
+        with (
+            scope(label),
+            stage("upload"),
+            collect_metrics(date=label, step="upload") as metrics,
+        ):
+            loaded_tables = await load_staged_files(
+                date=date,
+                paths=paths,
+                database_url=database_url,
+                chunksize=chunksize,
+                concurrency=concurrency,
+                policy=policy,
+                adaptive_batches=adaptive_batches,
+                batch_target_seconds=batch_target_seconds,
+            )
+        print("DataFrames uploaded to the database")
+        report_loop_health(monitor, date=date, step="uploading")
+    await publish_metrics(
+        metrics, key=f"gdelt-upload-{date:%Y%m%d}", metrics_file=metrics_file
+    )
+    return loaded_tables
+
+
+@task(retries=3, retry_delay_seconds=10, tags=["database-operations"])
+async def promote_to_silver_layer(
+    date: datetime, loaded_tables: List[str], database_url: str
+) -> None:
+    """
+    Task that promotes the bronze rows of a date that were just loaded to the silver tables.
+
+    Args:
+        date (datetime): The date of the loaded files.
+        loaded_tables (List[str]): The names of the bronze tables that were loaded.
+        database_url (str): The URL of the PostgreSQL database.
+    """
+    if not loaded_tables:
+        print(f"Nothing to promote to silver for date: {date}")
+        return
+    print(f"Promoting {', '.join(loaded_tables)} to silver for date: {date}")
+    started_at = monotonic()
+    row_counts = await promote_to_silver(
         database_url=database_url,
+        bronze_table_names=loaded_tables,
+        values=[int(date.strftime("%Y%m%d"))],
+    )
+    print(
+        f"Promoted {row_counts} rows to silver for date: {date} "
+        f"in {monotonic() - started_at:.1f} s"
     )
-    print("DataFrames uploaded to the database")
+
+
+async def download_gdelt_archives(
+    date: datetime,
+    database_url: str,
+    cache: ArchiveCache,
+    client: HTTPClient,
+    skip_completed: bool = True,
+) -> None:
+    """
+    Downloads the GDELT archives of a date into the archive cache, without parsing them.
+
+    Args:
+        date (datetime): The date of the files.
+        database_url (str): The URL of the PostgreSQL database, where the manifest is kept.
+        cache (ArchiveCache): The cache to download the archives into.
+        client (HTTPClient): The HTTP client to use.
+        skip_completed (bool): Whether to skip files that the manifest shows as loaded.
+    """
+    if skip_completed:
+        file_types = await get_pending_file_types(database_url=database_url, date=date)
+    else:
+        file_types = list(DAILY_FILE_TYPES)
+
+    async def download(type_: GDELTFileType) -> None:
+        url = get_gdelt_file_url(date=date, type_=type_)
+        if cache.get(url) is None:
+            expected_md5 = await get_gdelt_file_md5(
+                date=date, type_=type_, client=client
+            )
+            await cache.fetch(url, client=client, expected_md5=expected_md5)
+
+    await asyncio.gather(*[download(type_) for type_ in file_types])
+
+
+@task(tags=["data-fetching", "database-operations"], cache_result_in_memory=False)
+async def run_ingestion_pipeline(
+    date_list: List[datetime],
+    database_url: str,
+    download_dates: int = 4,
+    parse_dates: int = 2,
+    upload_dates: int = 1,
+    queue_size: int = 1,
+    skip_completed: bool = True,
+    promote_silver: bool = True,
+    load_options: Dict[str, Any] | None = None,
+    upload_options: Dict[str, Any] | None = None,
+) -> None:
+    """
+    Task that ingests dates through a pipeline of stages connected by bounded queues.
+
+    Dates are downloaded into the archive cache, parsed into Parquet files, uploaded to bronze
+    and promoted to silver by separate stages, each working on a few dates at once, so
+    downloads, parsing and uploads overlap. When uploads fall behind, parsing pauses, and so do
+    downloads after it: at most `parse_dates + queue_size + upload_dates` dates of Parquet files
+    are on disk at once, as they're deleted once uploaded. Each stage retries a date like the
+    tasks of the mapped mode, and a date that keeps failing doesn't stop the others.
+
+    Args:
+        date_list (List[datetime]): The dates to ingest.
+        database_url (str): The URL of the PostgreSQL database.
+        download_dates (int): The number of dates downloaded at once.
+        parse_dates (int): The number of dates parsed at once.
+        upload_dates (int): The number of dates uploaded (and promoted) at once.
+        queue_size (int): The number of dates each stage can get ahead of the next one.
+        skip_completed (bool): Whether to skip files that the manifest shows as loaded.
+        promote_silver (bool): Whether to promote the dates that were loaded to silver.
+        load_options (Dict[str, Any] | None): Arguments for `get_raw_dataframes`. Without an
+            archive cache (`cache_dir`), there's no download stage, and files are downloaded
+            as they're parsed.
+        upload_options (Dict[str, Any] | None): Arguments for `upload_to_bronze`.
+    """
+    load_options = load_options or {}
+    upload_options = upload_options or {}
+    cache_dir = load_options.get("cache_dir", "/tmp/gdelt/archives")
+
+    async def download(date: datetime) -> datetime:
+        cache = ArchiveCache(
+            cache_dir, max_bytes=load_options.get("cache_max_bytes", 20 * 1024**3)
+        )
+        client = get_http_client(
+            limit=load_options.get("max_connections", 16),
+            limit_per_host=load_options.get("max_connections_per_host", 8),
+        )
+        await download_gdelt_archives(
+            date=date,
+            database_url=database_url,
+            cache=cache,
+            client=client,
+            skip_completed=skip_completed,
+        )
+        return date
+
+    async def parse(date: datetime) -> Tuple[datetime, Tuple[Optional[str], ...]]:
+        paths = await get_raw_dataframes.fn(
+            date=date,
+            database_url=database_url,
+            skip_completed=skip_completed,
+            **load_options,
+        )
+        return date, paths
+
+    async def upload(
+        entry: Tuple[datetime, Tuple[Optional[str], ...]],
+    ) -> Tuple[datetime, List[str]]:
+        date, paths = entry
+        loaded_tables = await upload_to_bronze.fn(
+            date=date, dataframes=paths, database_url=database_url, **upload_options
+        )
+        # Staged files are only needed until they're uploaded
+        for path in paths:
+            if path:
+                Path(path).unlink(missing_ok=True)
+        return date, loaded_tables
+
+    async def promote(entry: Tuple[datetime, List[str]]) -> None:
+        date, loaded_tables = entry
+        await promote_to_silver_layer.fn(
+            date=date, loaded_tables=loaded_tables, database_url=database_url
+        )
+
+    stages = [
+        Stage(
+            "parse",
+            parse,
+            concurrency=parse_dates,
+            queue_size=queue_size,
+            retries=3,
+            retry_delay_seconds=10,
+        ),
+        Stage(
+            "upload",
+            upload,
+            concurrency=upload_dates,
+            queue_size=queue_size,
+            retries=3,
+            retry_delay_seconds=10,
+        ),
+    ]
+    if cache_dir:
+        stages.insert(
+            0,
+            Stage(
+                "download",
+                download,
+                concurrency=download_dates,
+                queue_size=queue_size,
+                retries=3,
+                retry_delay_seconds=10,
+            ),
+        )
+    if promote_silver:
+        stages.append(
+            Stage(
+                "promote",
+                promote,
+                concurrency=upload_dates,
+                queue_size=queue_size,
+                retries=3,
+                retry_delay_seconds=10,
+            )
+        )
+
+    pipeline = Pipeline(stages)
+    try:
+        await pipeline.run(date_list)
+    finally:
+        print("Pipeline stages:\n" + pipeline.format_stats())
 
 
 @flow
@@ -114,34 +755,394 @@ def gdelt_ingestion_flow(
     database_url: str,
     start_date: datetime = None,
     end_date: datetime = None,
-    upload_chunk_size: int = 100,
+    upload_chunk_size: int = 50_000,
+    stream_downloads: bool = True,
+    max_download_connections: int = 16,
+    max_download_connections_per_host: int = 8,
+    archive_cache_dir: str | None = "/tmp/gdelt/archives",
+    archive_cache_max_bytes: int = 20 * 1024**3,
+    download_memory_budget_bytes: int = 1024**3,
+    parse_processes: int = 0,
+    db_pool_size: int = 10,
+    db_max_overflow: int = 10,
+    db_pool_timeout: float = 30,
+    upload_concurrency: int = 4,
+    upload_policy: WritePolicy = WritePolicy.UPSERT,
+    adaptive_upload_batches: bool = True,
+    upload_batch_target_seconds: float = 2.0,
+    reprocess: bool = False,
+    instrument: bool = False,
+    promote_silver: bool = True,
+    metrics_file: str | None = None,
+    pipelined: bool = False,
+    pipeline_download_dates: int = 4,
+    pipeline_parse_dates: int = 2,
+    pipeline_upload_dates: int = 1,
+    pipeline_queue_size: int = 1,
 ) -> None:
     """
     Flow that processes GDELT files for a range of dates and stores them in a PostgreSQL database.
 
     Args:
         database_url (str): The URL of the PostgreSQL database.
-        start_date (datetime): The start date. If not provided, defaults to yesterday.
-        end_date (datetime): The end date (inclusive). If not provided, defaults to yesterday.
+        start_date (datetime): The start date. If not provided, defaults to the day after the
+            unbroken run of completely loaded dates (or to yesterday, on the first run).
+        end_date (datetime): The end date (inclusive). If not provided, defaults to the start
+            date when it's provided, and to yesterday otherwise.
+        upload_chunk_size (int): The number of rows read from the staged files at a time.
+        stream_downloads (bool): Whether to parse the files while downloading them.
+        max_download_connections (int): The maximum number of simultaneous downloads.
+        max_download_connections_per_host (int): The maximum number of simultaneous downloads
+            from a single host.
+        archive_cache_dir (str | None): Where to cache the raw GDELT archives. If None,
+            archives are not cached.
+        archive_cache_max_bytes (int): The maximum size of the archive cache, in bytes.
+        download_memory_budget_bytes (int): When streaming downloads, the maximum size of the
+            parsed batches held in memory at once, across all the dates being downloaded.
+        parse_processes (int): The number of worker processes that parse the downloaded files
+            (e.g. the number of cores). If 0, files are parsed in threads, which mostly run on
+            a single core.
+        db_pool_size (int): The number of database connections kept open for uploads.
+        db_max_overflow (int): The number of extra database connections allowed under load.
+        db_pool_timeout (float): How long to wait for a database connection when the pool is
+            exhausted, in seconds.
+        upload_concurrency (int): The number of parallel writers for the events and GKG tables.
+            Both are uploaded at once (along with a writer for each table derived from the GKG),
+            for every date being uploaded. Writers share the pool, and those beyond its
+            capacity wait for a connection instead of failing.
+        upload_policy (WritePolicy): How uploaded batches are committed.
+        adaptive_upload_batches (bool): Whether to size uploaded batches by bytes for each
+            table, adapting to the commit latency of the database, instead of uploading
+            `upload_chunk_size` rows at a time.
+        upload_batch_target_seconds (float): With adaptive batches, the longest a commit should
+            take. Batches shrink when commits take longer (e.g. under load), which keeps them
+            well within statement timeouts.
+        reprocess (bool): Whether to ingest files again even if the manifest shows them as
+            loaded. Reprocessed dates replace their partitions of the bronze tables as a whole,
+            regardless of `upload_policy`.
+        instrument (bool): Whether to monitor the event loop of the tasks, and log the callbacks
+            that blocked it (by date and stage). It can also be turned on by setting the
+            `MINERVA_INSTRUMENTATION` environment variable.
+        promote_silver (bool): Whether to promote the dates that were loaded to the silver
+            tables (replacing their previously promoted rows).
+        metrics_file (str | None): Where to write the metrics of each stage, by date, in the
+            OpenMetrics text format (e.g. for the textfile collector of the Prometheus node
+            exporter). Metrics are always published as artifacts of the tasks.
+        pipelined (bool): Whether to ingest the dates through a pipeline of stages connected
+            by bounded queues (see `run_ingestion_pipeline`), instead of loading every date and
+            then uploading every date. Stages overlap, and pause when the ones after them fall
+            behind, so throughput follows the slowest stage while the dates in flight (and
+            their files) stay bounded.
+        pipeline_download_dates (int): When pipelined, the number of dates downloaded at once.
+        pipeline_parse_dates (int): When pipelined, the number of dates parsed at once.
+        pipeline_upload_dates (int): When pipelined, the number of dates uploaded at once.
+        pipeline_queue_size (int): When pipelined, the number of dates each stage can get
+            ahead of the next one.
     """
+    # Set up the bronze schema (including the manifest)
+    setup_bronze_schema(database_url=database_url)
+    if promote_silver:
+        setup_silver_schema(database_url=database_url)
+
     # Generate the list of dates to process
-    start_date = start_date or datetime.now() - timedelta(days=1)
-    end_date = end_date or start_date
-    date_list = generate_date_list(start_date=start_date, end_date=end_date)
+    date_list = plan_dates(
+        database_url=database_url,
+        start_date=start_date,
+        end_date=end_date,
+        skip_completed=not reprocess,
+    )
 
-    # Set up the bronze schema
-    setup_bronze_schema(database_url=database_url)
+    load_options = dict(
+        stream=stream_downloads,
+        max_connections=max_download_connections,
+        max_connections_per_host=max_download_connections_per_host,
+        cache_dir=archive_cache_dir,
+        cache_max_bytes=archive_cache_max_bytes,
+        memory_budget_bytes=download_memory_budget_bytes,
+        parse_processes=parse_processes,
+        instrument=instrument,
+        metrics_file=metrics_file,
+    )
+    upload_options = dict(
+        chunksize=upload_chunk_size,
+        pool_size=db_pool_size,
+        max_overflow=db_max_overflow,
+        pool_timeout=db_pool_timeout,
+        concurrency=upload_concurrency,
+        policy=WritePolicy.REPLACE_PARTITION if reprocess else upload_policy,
+        instrument=instrument,
+        metrics_file=metrics_file,
+        adaptive_batches=adaptive_upload_batches,
+        batch_target_seconds=upload_batch_target_seconds,
+    )
+
+    # Ingest every date through the pipeline, if asked to
+    if pipelined:
+        run_ingestion_pipeline(
+            date_list=date_list,
+            database_url=database_url,
+            download_dates=pipeline_download_dates,
+            parse_dates=pipeline_parse_dates,
+            upload_dates=pipeline_upload_dates,
+            queue_size=pipeline_queue_size,
+            skip_completed=not reprocess,
+            promote_silver=promote_silver,
+            load_options=load_options,
+            upload_options=upload_options,
+        )
+        return
 
     # Load data for each date
-    raw_dataframes = get_raw_dataframes.map(date=date_list)
+    raw_dataframes = get_raw_dataframes.map(
+        date=date_list,
+        database_url=database_url,
+        skip_completed=not reprocess,
+        **load_options,
+    )
 
     # Upload the data to the database
-    upload_to_bronze.map(
+    loaded_tables = upload_to_bronze.map(
+        date=date_list,
         dataframes=raw_dataframes,
         database_url=database_url,
-        chunksize=upload_chunk_size,
+        **upload_options,
     )
 
+    # Promote the newly loaded dates to the silver layer
+    if promote_silver:
+        promote_to_silver_layer.map(
+            date=date_list, loaded_tables=loaded_tables, database_url=database_url
+        )
+
+
+def get_microbatch_file_type(microbatch: datetime) -> str:
+    """
+    Returns the file type a 15-minute file is recorded as in the manifest (with its date).
+
+    Args:
+        microbatch (datetime): The time the file was exported.
+
+    Returns:
+        str: The file type, e.g. `events_15min_2315` for the file exported at 23:15.
+    """
+    return f"{GDELTFileType.EVENTS_15MIN.value}_{microbatch.strftime('%H%M')}"
+
+
+@task(retries=3, retry_delay_seconds=10)
+async def plan_microbatches(
+    database_url: str,
+    start: datetime | None = None,
+    lookback_minutes: int = 60,
+    missing_retry_minutes: int = 30,
+) -> List[datetime]:
+    """
+    Task that lists the 15-minute files that need to be ingested, up to the latest one.
+
+    Files that GDELT didn't export are requested again until they're `missing_retry_minutes`
+    older than the latest file (in case they're published late), and skipped after that.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        start (datetime | None): The time of the first file to ingest. If not provided, defaults
+            to `lookback_minutes` before the latest file.
+        lookback_minutes (int): How far back to look for files that weren't ingested yet.
+        missing_retry_minutes (int): For how long files that weren't exported are retried.
+
+    Returns:
+        List[datetime]: The times of the files that weren't completely loaded yet, in order.
+    """
+    latest = await get_latest_gdelt_microbatch(client=get_http_client())
+    if latest is None:
+        return []
+    start = start or latest - timedelta(minutes=lookback_minutes)
+    microbatches = get_gdelt_microbatches(start=start, end=latest)
+    statuses = await get_manifest_statuses(
+        database_url, sorted({microbatch.date() for microbatch in microbatches})
+    )
+    retry_cutoff = latest - timedelta(minutes=missing_retry_minutes)
+    planned = []
+    for microbatch in microbatches:
+        status = statuses.get((microbatch.date(), get_microbatch_file_type(microbatch)))
+        if status == ManifestStatus.COMPLETED or (
+            status == ManifestStatus.MISSING and microbatch < retry_cutoff
+        ):
+            continue
+        planned.append(microbatch)
+    return planned
+
+
+@task(
+    retries=3,
+    retry_delay_seconds=10,
+    tags=["database-operations"],
+    cache_result_in_memory=False,
+)
+async def ingest_microbatch(
+    microbatch: datetime,
+    database_url: str,
+    concurrency: int = 2,
+    parse_processes: int = 0,
+    metrics_file: str | None = None,
+) -> int:
+    """
+    Task that ingests a 15-minute events file into the bronze events.
+
+    The file is streamed from GDELT straight into the database, through the same parsing and
+    loading as the daily files, without staging it on disk. Batches are merged by primary key,
+    so events that are also in the daily file (or a retry) aren't duplicated.
+
+    Args:
+        microbatch (datetime): The time the file was exported.
+        database_url (str): The URL of the PostgreSQL database.
+        concurrency (int): The number of parallel writers.
+        parse_processes (int): The number of worker processes that parse the file, shared by
+            all the tasks running in the same process. If 0, the file is parsed in threads.
+        metrics_file (str | None): Where to write the metrics of the tasks that ran in this
+            process, in the OpenMetrics text format. If None, they're only published as an
+            artifact.
+
+    Returns:
+        int: The number of events loaded.
+    """
+    client = get_http_client()
+    executor = get_process_pool(parse_processes) if parse_processes > 0 else None
+    file_type = get_microbatch_file_type(microbatch)
+    started_at = monotonic()
+    label = microbatch.strftime("%Y-%m-%dT%H:%M")
+    try:
+        with collect_metrics(date=label, step="microbatch") as metrics:
+            row_count, _ = await load_dataframes_to_bronze(
+                df_events_reader=stream_gdelt_file(
+                    date=microbatch,
+                    type_=GDELTFileType.EVENTS_15MIN,
+                    client=client,
+                    executor=executor,
+                ),
+                df_gkg_reader=None,
+                database_url=database_url,
+                concurrency=concurrency,
+                policy=WritePolicy.UPSERT,
+                partition_value=int(microbatch.strftime("%Y%m%d")),
+            )
+    except Exception as error:
+        if isinstance(error, ClientResponseError) and error.status == 404:
+            # GDELT occasionally skips an export, it's recorded so that it's only retried for a
+            # while (see `plan_microbatches`)
+            print(f"No events file was exported at {microbatch}, skipping it")
+            await record_manifest_entry(
+                database_url=database_url,
+                date_=microbatch.date(),
+                file_type=file_type,
+                status=ManifestStatus.MISSING,
+            )
+            return 0
+        await record_manifest_entry(
+            database_url=database_url,
+            date_=microbatch.date(),
+            file_type=file_type,
+            status=ManifestStatus.FAILED,
+        )
+        raise
+    await record_manifest_entry(
+        database_url=database_url,
+        date_=microbatch.date(),
+        file_type=file_type,
+        status=ManifestStatus.COMPLETED,
+        row_count=row_count,
+        checksum=await get_gdelt_file_md5(
+            date=microbatch, type_=GDELTFileType.EVENTS_15MIN, client=client
+        ),
+        load_seconds=monotonic() - started_at,
+    )
+    print(
+        f"Ingested {row_count} events exported at {microbatch} "
+        f"in {monotonic() - started_at:.1f} s"
+    )
+    await publish_metrics(
+        metrics,
+        key=f"gdelt-microbatch-{microbatch:%Y%m%d%H%M}",
+        metrics_file=metrics_file,
+    )
+    return row_count
+
+
+@flow
+async def gdelt_microbatch_flow(
+    database_url: str,
+    start: datetime | None = None,
+    lookback_minutes: int = 60,
+    missing_retry_minutes: int = 30,
+    poll_interval_seconds: float = 60,
+    max_polls: int | None = None,
+    upload_concurrency: int = 2,
+    parse_processes: int = 0,
+    promote_silver: bool = True,
+    metrics_file: str | None = None,
+) -> None:
+    """
+    Long-running flow that ingests the GDELT 2.0 15-minute events files as they're exported.
+
+    GDELT's list of its latest files is polled, and every file that wasn't ingested yet is
+    streamed into the bronze events, in order, as soon as it's listed. Compared to the daily
+    files, events are available within minutes, and the load is spread over the day. After
+    every poll that loaded events, their dates are promoted to silver again.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        start (datetime | None): The time of the first file to ingest. If not provided, only
+            files from the last `lookback_minutes` are ingested.
+        lookback_minutes (int): How far back to look for files that weren't ingested yet, on
+            every poll (e.g. to catch up after a restart).
+        missing_retry_minutes (int): For how long files that GDELT didn't export are retried.
+        poll_interval_seconds (float): How long to wait between polls.
+        max_polls (int | None): The number of polls after which the flow stops. If None, it
+            runs until it's cancelled.
+        upload_concurrency (int): The number of parallel writers for each file.
+        parse_processes (int): The number of worker processes that parse the files. If 0,
+            files are parsed in threads.
+        promote_silver (bool): Whether to promote the dates that were loaded to silver.
+        metrics_file (str | None): Where to write the metrics of each stage, by file, in the
+            OpenMetrics text format. Metrics are always published as artifacts of the tasks.
+    """
+    # Set up the bronze schema (including the manifest)
+    await setup_bronze_schema(database_url=database_url)
+    if promote_silver:
+        await setup_silver_schema(database_url=database_url)
+
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        microbatches = await plan_microbatches(
+            database_url=database_url,
+            start=start,
+            lookback_minutes=lookback_minutes,
+            missing_retry_minutes=missing_retry_minutes,
+        )
+        # Files are ingested in order, so that the manifest never has gaps behind the latest
+        loaded_dates = set()
+        for microbatch in microbatches:
+            row_count = await ingest_microbatch(
+                microbatch=microbatch,
+                database_url=database_url,
+                concurrency=upload_concurrency,
+                parse_processes=parse_processes,
+                metrics_file=metrics_file,
+            )
+            if row_count:
+                loaded_dates.add(microbatch.date())
+        # Dates are promoted whole, so once per poll rather than once per file
+        if promote_silver:
+            for date_ in sorted(loaded_dates):
+                await promote_to_silver_layer(
+                    date=datetime.combine(date_, time()),
+                    loaded_tables=[bronze.EVENTS_TABLE_NAME],
+                    database_url=database_url,
+                )
+        # Only the first poll starts from the given time, later ones catch up from the latest
+        start = None
+        polls += 1
+        if max_polls is None or polls < max_polls:
+            await asyncio.sleep(poll_interval_seconds)
+
 
 if __name__ == "__main__":
     # This is just for local execution
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+from pathlib import Path
+from typing import AsyncIterator
+from uuid import uuid4
+
+import aiofiles
+import aiofiles.os
+from minerva_elders.base.io import HTTPClient, iter_url_chunks
+
+
+class ArchiveCache:
+    """
+    Content-addressed on-disk cache for immutable remote archives.
+
+    Archives are stored under `objects/<md5>` and looked up through a small index that maps the
+    SHA-256 of each URL to the MD5 of its contents. Downloads are hashed while they are streamed,
+    and only committed to the cache (with an atomic rename) once their checksum is validated.
+    When the cache grows over its byte budget, the least recently used archives are evicted.
+
+    Args:
+        directory (str | Path): The directory where the cache is stored.
+        max_bytes (int): The maximum total size of the cached archives, in bytes.
+        chunk_size (int): The size of the chunks read from cached archives, in bytes.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = 20 * 1024**3,
+        chunk_size: int = 64 * 1024,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.objects_dir = self.directory / "objects"
+        self.index_dir = self.directory / "index"
+        self.tmp_dir = self.directory / "tmp"
+        for directory in (self.objects_dir, self.index_dir, self.tmp_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def get(self, url: str, expected_md5: str | None = None) -> Path | None:
+        """
+        Looks up a cached archive, marking it as recently used.
+
+        Args:
+            url (str): The URL of the archive.
+            expected_md5 (str | None): The expected checksum of the archive, if known. Entries
+                with a different checksum are treated as misses.
+
+        Returns:
+            Path | None: The path to the cached archive, or None if it isn't cached.
+        """
+        expected_md5 = expected_md5.lower() if expected_md5 else None
+        index_path = self.index_dir / self._url_key(url)
+        try:
+            md5 = index_path.read_text().strip()
+        except FileNotFoundError:
+            md5 = expected_md5
+        if md5 is None or (expected_md5 is not None and md5 != expected_md5):
+            return None
+
+        object_path = self.objects_dir / md5
+        try:
+            # Bump the modification time, which is used as the LRU clock
+            os.utime(object_path)
+        except FileNotFoundError:
+            index_path.unlink(missing_ok=True)
+            return None
+        if not index_path.exists():
+            index_path.write_text(md5)
+        return object_path
+
+    async def iter_chunks(
+        self, url: str, client: HTTPClient | None = None, expected_md5: str | None = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Asynchronously iterates over an archive, from the cache if possible.
+
+        On a miss, the archive is streamed from the network and written to the cache at the same
+        time. It's only committed once the whole body was consumed and its checksum matches, so
+        consumers must read it to the end (as `iter_unzipped_chunks` does): a checksum mismatch
+        is raised by the last iteration.
+
+        Args:
+            url (str): The URL of the archive.
+            client (HTTPClient | None): The HTTP client to use on a miss.
+            expected_md5 (str | None): The expected checksum of the archive, if known.
+
+        Yields:
+            bytes: The chunks of the archive.
+        """
+        object_path = self.get(url, expected_md5=expected_md5)
+        if object_path is not None:
+            async with aiofiles.open(object_path, "rb") as file:
+                while chunk := await file.read(self.chunk_size):
+                    yield chunk
+            return
+
+        tmp_path = self.tmp_dir / f"{uuid4().hex}.part"
+        md5 = hashlib.md5()
+        try:
+            async with aiofiles.open(tmp_path, "wb") as file:
+                async for chunk in iter_url_chunks(url, client=client):
+                    md5.update(chunk)
+                    await file.write(chunk)
+                    yield chunk
+            await self._commit(url, tmp_path, md5.hexdigest(), expected_md5)
+        finally:
+            if tmp_path.exists():
+                await aiofiles.os.remove(tmp_path)
+
+    async def fetch(
+        self, url: str, client: HTTPClient | None = None, expected_md5: str | None = None
+    ) -> Path:
+        """
+        Ensures an archive is cached, downloading it if needed.
+
+        Args:
+            url (str): The URL of the archive.
+            client (HTTPClient | None): The HTTP client to use on a miss.
+            expected_md5 (str | None): The expected checksum of the archive, if known.
+
+        Returns:
+            Path: The path to the cached archive.
+        """
+        object_path = self.get(url, expected_md5=expected_md5)
+        if object_path is None:
+            async for _ in self.iter_chunks(url, client=client, expected_md5=expected_md5):
+                pass
+            object_path = self.get(url)
+        return object_path
+
+    async def _commit(
+        self, url: str, tmp_path: Path, md5: str, expected_md5: str | None = None
+    ) -> None:
+        if expected_md5 is not None and md5 != expected_md5.lower():
+            raise ValueError(
+                f"Checksum mismatch for {url}: expected {expected_md5.lower()}, got {md5}."
+            )
+        await aiofiles.os.replace(tmp_path, self.objects_dir / md5)
+        (self.index_dir / self._url_key(url)).write_text(md5)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used archives until the cache fits its byte budget.
+
+        The most recently used archive is always kept, even if it's over the budget by itself.
+        """
+        entries = [(path.stat(), path) for path in self.objects_dir.iterdir()]
+        total_bytes = sum(stat.st_size for stat, _ in entries)
+        for stat, path in sorted(entries, key=lambda entry: entry[0].st_mtime)[:-1]:
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= stat.st_size
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+from typing import Any, AsyncIterator, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+
+
+class AdaptiveBatchSizer:
+    """
+    Sizes the batches written to a table by bytes, adapting to how fast the database commits
+    them.
+
+    Batch sizes follow an additive increase, multiplicative decrease (AIMD) rule: while commits
+    take less than `target_seconds` and throughput keeps up with what smaller batches achieved,
+    batches grow by `increase_bytes`; as soon as a commit takes longer, they shrink by
+    `decrease_factor`. Sizes are kept in bytes, so tables with wide rows (e.g. the GKG) get
+    fewer rows per batch than tables with narrow ones, and are turned into row counts with the
+    average size of the rows seen so far.
+
+    Args:
+        initial_bytes (int): The size of the first batches, in bytes.
+        min_bytes (int): The minimum size of a batch, in bytes.
+        max_bytes (int): The maximum size of a batch, in bytes.
+        target_seconds (float): The longest a commit should take. Slower commits (e.g. when the
+            database is under load) make batches shrink.
+        increase_bytes (int): How much batches grow after a fast commit, in bytes.
+        decrease_factor (float): How much batches shrink after a slow commit.
+        tolerance (float): How much lower than the average throughput a fast commit's
+            throughput can be for batches to keep growing.
+    """
+
+    def __init__(
+        self,
+        initial_bytes: int = 4 * 1024**2,
+        min_bytes: int = 256 * 1024,
+        max_bytes: int = 64 * 1024**2,
+        target_seconds: float = 2.0,
+        increase_bytes: int = 2 * 1024**2,
+        decrease_factor: float = 0.5,
+        tolerance: float = 0.1,
+    ):
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.target_seconds = target_seconds
+        self.increase_bytes = increase_bytes
+        self.decrease_factor = decrease_factor
+        self.tolerance = tolerance
+        self.batch_bytes = min(max(initial_bytes, min_bytes), max_bytes)
+        # Moving averages of the size of a row and of the throughput of commits, in bytes
+        self.row_bytes: float | None = None
+        self.throughput: float | None = None
+
+    def get_batch_rows(self) -> int:
+        """
+        Returns the number of rows the next batch should have.
+
+        Returns:
+            int: The number of rows, at least 1.
+        """
+        if not self.row_bytes:
+            return 1
+        return max(int(self.batch_bytes / self.row_bytes), 1)
+
+    def observe_rows(self, nbytes: int, rows: int) -> None:
+        """
+        Updates the average size of the rows with rows about to be batched.
+
+        Args:
+            nbytes (int): The size of the rows, in bytes.
+            rows (int): The number of rows.
+        """
+        if rows > 0:
+            row_bytes = nbytes / rows
+            self.row_bytes = (
+                row_bytes if self.row_bytes is None else (0.8 * self.row_bytes + 0.2 * row_bytes)
+            )
+
+    def observe_commit(self, nbytes: int, seconds: float) -> None:
+        """
+        Adapts the size of the batches to how long a batch took to commit.
+
+        Args:
+            nbytes (int): The size of the batch, in bytes.
+            seconds (float): How long it took to write and commit it.
+        """
+        if nbytes <= 0:
+            return
+        throughput = nbytes / max(seconds, 1e-6)
+        if seconds > self.target_seconds:
+            # The database slows down, back off quickly
+            self.batch_bytes = max(int(self.batch_bytes * self.decrease_factor), self.min_bytes)
+        elif self.throughput is None or throughput >= self.throughput * (1 - self.tolerance):
+            # Larger batches still pay off, probe further
+            self.batch_bytes = min(self.batch_bytes + self.increase_bytes, self.max_bytes)
+        self.throughput = (
+            throughput if self.throughput is None else (0.8 * self.throughput + 0.2 * throughput)
+        )
+
+
+# Shared sizers, by database URL and table, so that sizes carry over from a load to the next
+_BATCH_SIZERS: Dict[str, AdaptiveBatchSizer] = {}
+
+
+def get_batch_sizer(
+    database_url: str, schema_name: str, table_name: str, **kwargs
+) -> AdaptiveBatchSizer:
+    """
+    Returns the batch sizer shared by all the loads into a table in this process.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        schema_name (str): The name of the schema containing the table.
+        table_name (str): The name of the table.
+        **kwargs: Arguments for `AdaptiveBatchSizer`, only used when the sizer is created.
+
+    Returns:
+        AdaptiveBatchSizer: The shared sizer.
+    """
+    key = f"{database_url}/{schema_name}.{table_name}"
+    sizer = _BATCH_SIZERS.get(key)
+    if sizer is None:
+        sizer = AdaptiveBatchSizer(**kwargs)
+        _BATCH_SIZERS[key] = sizer
+    return sizer
+
+
+def to_arrow_table(batch: Any) -> pa.Table:
+    """
+    Converts a batch of rows into an Arrow table that can be concatenated with other batches.
+
+    Dictionary indices are sized by each batch's categories, so they're widened to 32 bits.
+
+    Args:
+        batch (Any): A DataFrame or an Arrow record batch or table.
+
+    Returns:
+        pa.Table: The table.
+    """
+    if isinstance(batch, pd.DataFrame):
+        table = pa.Table.from_pandas(batch, preserve_index=False)
+    elif isinstance(batch, pa.RecordBatch):
+        table = pa.Table.from_batches([batch])
+    else:
+        table = batch
+    if not any(pa.types.is_dictionary(field.type) for field in table.schema):
+        return table
+    schema = pa.schema(
+        [
+            (
+                pa.field(field.name, pa.dictionary(pa.int32(), pa.string()))
+                if pa.types.is_dictionary(field.type)
+                else field
+            )
+            for field in table.schema
+        ],
+        metadata=table.schema.metadata,
+    )
+    return table.cast(schema)
+
+
+async def rebatch(
+    batches: AsyncIterator[Any], sizer: AdaptiveBatchSizer
+) -> AsyncIterator[pa.Table]:
+    """
+    Splits and merges batches of rows into batches of the size given by a sizer.
+
+    Batches are sliced and concatenated without copying their data. The size is read again
+    before each batch, so it follows the sizer as it adapts.
+
+    Args:
+        batches (AsyncIterator[Any]): The batches: DataFrames or Arrow record batches or tables.
+        sizer (AdaptiveBatchSizer): The sizer.
+
+    Yields:
+        pa.Table: The resized batches.
+    """
+    pending: List[pa.Table] = []
+    pending_rows = 0
+    async for batch in batches:
+        table = to_arrow_table(batch)
+        if table.num_rows == 0:
+            continue
+        sizer.observe_rows(table.nbytes, table.num_rows)
+        pending.append(table)
+        pending_rows += table.num_rows
+        while pending_rows >= (rows := sizer.get_batch_rows()):
+            merged = pa.concat_tables(pending)
+            rest = merged.slice(rows)
+            yield merged.slice(0, rows)
+            pending = [rest] if rest.num_rows else []
+            pending_rows = rest.num_rows
+    if pending_rows:
+        yield pa.concat_tables(pending)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+from typing import Any, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def _get_dictionary_column(batch: Any, column: str) -> pa.DictionaryArray:
+    # Categoricals (and Arrow dictionaries) are used as they are, other columns are encoded
+    if isinstance(batch, pd.DataFrame):
+        values = pa.array(batch[column])
+    else:
+        values = batch.column(column)
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if not pa.types.is_dictionary(values.type):
+        values = values.dictionary_encode()
+    return values
+
+
+def _set_column(batch: Any, column: str, values: pa.Array) -> Any:
+    if isinstance(batch, pd.DataFrame):
+        series = values.to_pandas(types_mapper=pd.ArrowDtype).set_axis(batch.index)
+        return batch.assign(**{column: series})
+    return batch.set_column(batch.schema.get_field_index(column), column, values)
+
+
+class DimensionEncoder:
+    """
+    Replaces code columns with small integer keys into dimension tables.
+
+    Each dimension table maps keys to codes, and several columns can share one. Codes that aren't
+    in a dimension table yet are added to it as batches are encoded, and the keys already seen are
+    cached, so after the first few batches encoding doesn't need the database at all. Only the
+    distinct codes of each batch (its dictionary) are looked up, and rows are mapped to keys with a
+    single `take`.
+
+    Args:
+        dimensions (Dict[str, List[str]]): The columns to encode, by dimension table.
+        schema_name (str): The name of the schema containing the dimension tables.
+    """
+
+    def __init__(self, dimensions: Dict[str, List[str]], schema_name: str = "bronze"):
+        self.dimensions = dimensions
+        self.schema_name = schema_name
+        self._keys: Dict[str, Dict[str, int]] = {name: {} for name in dimensions}
+
+    async def get_keys(self, driver_conn: Any, dimension: str, codes: List[str]) -> Dict[str, int]:
+        """
+        Asynchronously returns the keys of some codes, adding the codes that are new.
+
+        Args:
+            driver_conn (Any): The asyncpg connection to use.
+            dimension (str): The name of the dimension table.
+            codes (List[str]): The codes to look up.
+
+        Returns:
+            Dict[str, int]: The known keys of the dimension, including those of `codes`.
+        """
+        keys = self._keys[dimension]
+        missing = [code for code in codes if code not in keys]
+        if missing:
+            table = f'"{self.schema_name}"."{dimension}"'
+            # Codes that already exist are skipped before inserting, so that identity values
+            # are only wasted when writers race to add the same code
+            await driver_conn.execute(
+                f"INSERT INTO {table} (code) "
+                f"SELECT new.code FROM unnest($1::text[]) AS new(code) "
+                f"WHERE NOT EXISTS (SELECT FROM {table} AS dim WHERE dim.code = new.code) "
+                f"ON CONFLICT (code) DO NOTHING",
+                missing,
+            )
+            rows = await driver_conn.fetch(
+                f"SELECT code, id FROM {table} WHERE code = ANY($1::text[])", missing
+            )
+            keys.update((row["code"], row["id"]) for row in rows)
+        return keys
+
+    async def encode(self, driver_conn: Any, batch: Any) -> Any:
+        """
+        Asynchronously replaces the code columns of a batch with their keys.
+
+        Args:
+            driver_conn (Any): The asyncpg connection to use.
+            batch (Any): A DataFrame or an Arrow record batch.
+
+        Returns:
+            Any: The batch (of the same kind), with `smallint` keys instead of codes.
+        """
+        for dimension, columns in self.dimensions.items():
+            arrays = {column: _get_dictionary_column(batch, column) for column in columns}
+            codes = set()
+            for array in arrays.values():
+                codes.update(array.dictionary.to_pylist())
+            codes.discard(None)
+            keys = await self.get_keys(driver_conn, dimension, sorted(codes))
+
+            for column, array in arrays.items():
+                # Map the (few) dictionary entries to keys, then every row through its index
+                lookup = pa.array(
+                    [keys.get(code) for code in array.dictionary.to_pylist()], pa.int16()
+                )
+                batch = _set_column(batch, column, pc.take(lookup, array.indices))
+        return batch
+
+
+# Shared encoders, by database URL and schema, so that the keys they cached carry over from a load
+# to the next
+_DIMENSION_ENCODERS: Dict[str, DimensionEncoder] = {}
+
+
+def get_dimension_encoder(
+    database_url: str, dimensions: Dict[str, List[str]], schema_name: str = "bronze"
+) -> DimensionEncoder:
+    """
+    Returns the dimension encoder shared by all the loads into a database in this process.
+
+    Keys never change once a code is added, so they're valid for every load (and event loop).
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        dimensions (Dict[str, List[str]]): The columns to encode, by dimension table. Only used
+            when the encoder is created.
+        schema_name (str): The name of the schema containing the dimension tables.
+
+    Returns:
+        DimensionEncoder: The shared encoder.
+    """
+    key = f"{database_url}/{schema_name}"
+    encoder = _DIMENSION_ENCODERS.get(key)
+    if encoder is None:
+        encoder = DimensionEncoder(dimensions, schema_name=schema_name)
+        _DIMENSION_ENCODERS[key] = encoder
+    return encoder
+
+
+def get_decoded_view_sql(
+    view_name: str,
+    table_name: str,
+    columns: List[str],
+    dimensions: Dict[str, List[str]],
+    schema_name: str = "bronze",
+) -> str:
+    """
+    Returns the statement that creates a view of a table with its codes instead of their keys.
+
+    Args:
+        view_name (str): The name of the view.
+        table_name (str): The name of the table with encoded columns.
+        columns (List[str]): All the columns of the table, in order.
+        dimensions (Dict[str, List[str]]): The encoded columns, by dimension table.
+        schema_name (str): The name of the schema containing the table and dimension tables.
+
+    Returns:
+        str: The `CREATE OR REPLACE VIEW` statement.
+    """
+    dimension_by_column = {
+        column: dimension for dimension, encoded in dimensions.items() for column in encoded
+    }
+    selects, joins = [], []
+    for column in columns:
+        if column in dimension_by_column:
+            alias = f"d{len(joins)}"
+            selects.append(f'{alias}.code AS "{column}"')
+            joins.append(
+                f'LEFT JOIN "{schema_name}"."{dimension_by_column[column]}" AS {alias} '
+                f'ON {alias}.id = t."{column}"'
+            )
+        else:
+            selects.append(f't."{column}"')
+    return (
+        f'CREATE OR REPLACE VIEW "{schema_name}"."{view_name}" AS\n'
+        f"SELECT\n    " + ",\n    ".join(selects) + "\n"
+        f'FROM "{schema_name}"."{table_name}" AS t\n' + "\n".join(joins)
+    )
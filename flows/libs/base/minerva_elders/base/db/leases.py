@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Dict, List, NamedTuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from .bronze import BACKFILL_LEASES_TABLE_NAME, BackfillLease
+from .utils import get_engine
+
+# Units added per statement, so that statements stay well under the 32767 bind parameters that
+# PostgreSQL allows (each unit takes 7)
+ENQUEUE_CHUNK_SIZE = 1000
+
+
+class LeaseStatus(str, Enum):
+    """
+    Enum that represents the status of a unit of work of a backfill.
+    """
+
+    PENDING = "pending"
+    LEASED = "leased"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BackfillUnit(NamedTuple):
+    """
+    A unit of work of a backfill: the file of a type for a date.
+    """
+
+    date: date
+    file_type: str
+    # Size of the source archive, in bytes, if it's known
+    expected_bytes: int | None = None
+
+
+async def enqueue_backfill_units(
+    database_url: str, backfill_id: str, units: List[BackfillUnit]
+) -> int:
+    """
+    Asynchronously adds units of work to a backfill.
+
+    Units that the backfill already has are left as they are, so a backfill can be planned
+    again (e.g. by every worker) without losing its progress. Units are inserted in chunks, in
+    a single transaction.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        backfill_id (str): The identifier of the backfill.
+        units (List[BackfillUnit]): The units to add.
+
+    Returns:
+        int: The number of units that were added.
+    """
+    if not units:
+        return 0
+    now = datetime.now(timezone.utc)
+    added = 0
+    engine = get_engine(database_url)
+    async with engine.begin() as conn:
+        for start in range(0, len(units), ENQUEUE_CHUNK_SIZE):
+            stop = start + ENQUEUE_CHUNK_SIZE
+            chunk = units[start:stop]
+            statement = (
+                insert(BackfillLease)
+                .values(
+                    [
+                        {
+                            "backfill_id": backfill_id,
+                            "date": unit.date,
+                            "file_type": unit.file_type,
+                            "status": LeaseStatus.PENDING.value,
+                            "expected_bytes": unit.expected_bytes,
+                            "attempts": 0,
+                            "updated_at": now,
+                        }
+                        for unit in chunk
+                    ]
+                )
+                .on_conflict_do_nothing()
+            )
+            result = await conn.execute(statement)
+            added += result.rowcount
+    return added
+
+
+async def claim_backfill_units(
+    database_url: str,
+    backfill_id: str,
+    worker_id: str,
+    limit: int = 1,
+    lease_seconds: float = 600,
+    max_attempts: int = 3,
+) -> List[BackfillUnit]:
+    """
+    Asynchronously leases the next units of work of a backfill to a worker.
+
+    The largest units are leased first, so the longest files start early and don't straggle
+    at the end of the backfill. Besides pending units, units whose lease expired (their worker
+    died or stopped renewing it) are stolen from their worker. Rows are locked with
+    `SKIP LOCKED`, so concurrent workers never lease the same unit and don't wait for each
+    other.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        backfill_id (str): The identifier of the backfill.
+        worker_id (str): The identifier of the worker.
+        limit (int): The maximum number of units to lease.
+        lease_seconds (float): For how long the units are leased, unless the lease is renewed.
+        max_attempts (int): How many times a unit is leased before it's given up. Expired units
+            that ran out of attempts are marked as failed instead of being stolen.
+
+    Returns:
+        List[BackfillUnit]: The leased units, largest first. Empty if there's nothing to lease.
+    """
+    table = f'bronze."{BACKFILL_LEASES_TABLE_NAME}"'
+    parameters = {
+        "backfill_id": backfill_id,
+        "worker_id": worker_id,
+        "limit": limit,
+        "lease_seconds": lease_seconds,
+        "max_attempts": max_attempts,
+    }
+
+    engine = get_engine(database_url)
+    async with engine.begin() as conn:
+        # Units whose workers kept dying on them (e.g. out of memory) aren't retried forever
+        await conn.execute(
+            text(
+                f"UPDATE {table} SET status = '{LeaseStatus.FAILED.value}', "
+                "error = 'The lease expired after ' || attempts || ' attempts', "
+                "updated_at = now() "
+                f"WHERE backfill_id = :backfill_id AND status = '{LeaseStatus.LEASED.value}' "
+                "AND lease_expires_at < now() AND attempts >= :max_attempts"
+            ),
+            parameters,
+        )
+        result = await conn.execute(
+            text(
+                f"UPDATE {table} AS lease SET status = '{LeaseStatus.LEASED.value}', "
+                "worker_id = :worker_id, "
+                "lease_expires_at = now() + make_interval(secs => :lease_seconds), "
+                "attempts = lease.attempts + 1, updated_at = now()\n"
+                f"FROM (SELECT date, file_type FROM {table} WHERE backfill_id = :backfill_id "
+                f"AND (status = '{LeaseStatus.PENDING.value}' "
+                f"OR (status = '{LeaseStatus.LEASED.value}' AND lease_expires_at < now()))\n"
+                "ORDER BY expected_bytes DESC NULLS LAST, date, file_type LIMIT :limit "
+                "FOR UPDATE SKIP LOCKED) AS claimed\n"
+                "WHERE lease.backfill_id = :backfill_id AND lease.date = claimed.date "
+                "AND lease.file_type = claimed.file_type\n"
+                "RETURNING lease.date, lease.file_type, lease.expected_bytes"
+            ),
+            parameters,
+        )
+        units = [BackfillUnit(*row) for row in result]
+    return sorted(units, key=lambda unit: unit.expected_bytes or 0, reverse=True)
+
+
+async def renew_backfill_leases(
+    database_url: str,
+    backfill_id: str,
+    worker_id: str,
+    units: List[BackfillUnit],
+    lease_seconds: float = 600,
+) -> List[BackfillUnit]:
+    """
+    Asynchronously extends the leases a worker holds on units of a backfill (its heartbeat).
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        backfill_id (str): The identifier of the backfill.
+        worker_id (str): The identifier of the worker.
+        units (List[BackfillUnit]): The units the worker is processing.
+        lease_seconds (float): For how long the leases are extended, from now.
+
+    Returns:
+        List[BackfillUnit]: The units whose lease the worker lost (it expired and was stolen by
+        another worker, or the unit was given up).
+    """
+    if not units:
+        return []
+    engine = get_engine(database_url)
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text(
+                f'UPDATE bronze."{BACKFILL_LEASES_TABLE_NAME}" '
+                "SET lease_expires_at = now() + make_interval(secs => :lease_seconds), "
+                "updated_at = now() "
+                "WHERE backfill_id = :backfill_id AND worker_id = :worker_id "
+                f"AND status = '{LeaseStatus.LEASED.value}' AND (date, file_type) IN "
+                "(SELECT * FROM unnest(CAST(:dates AS date[]), CAST(:file_types AS text[])))\n"
+                "RETURNING date, file_type"
+            ),
+            {
+                "backfill_id": backfill_id,
+                "worker_id": worker_id,
+                "lease_seconds": lease_seconds,
+                "dates": [unit.date for unit in units],
+                "file_types": [unit.file_type for unit in units],
+            },
+        )
+        renewed = {(row.date, row.file_type) for row in result}
+    return [unit for unit in units if (unit.date, unit.file_type) not in renewed]
+
+
+async def release_backfill_unit(
+    database_url: str,
+    backfill_id: str,
+    worker_id: str,
+    unit: BackfillUnit,
+    status: LeaseStatus,
+    error: str | None = None,
+    max_attempts: int = 3,
+) -> bool:
+    """
+    Asynchronously records the outcome of a unit of a backfill and releases its lease.
+
+    A failed unit that has attempts left goes back to pending, to be leased again.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        backfill_id (str): The identifier of the backfill.
+        worker_id (str): The identifier of the worker that processed the unit.
+        unit (BackfillUnit): The unit.
+        status (LeaseStatus): `COMPLETED` or `FAILED`.
+        error (str | None): The description of the error, for failed units.
+        max_attempts (int): How many times a unit is leased before it's given up.
+
+    Returns:
+        bool: Whether the worker still held the lease. If not, the unit was stolen by another
+        worker, whose outcome prevails.
+    """
+    status = LeaseStatus(status)
+    if status == LeaseStatus.FAILED:
+        new_status = (
+            f"CASE WHEN attempts >= :max_attempts THEN '{LeaseStatus.FAILED.value}' "
+            f"ELSE '{LeaseStatus.PENDING.value}' END"
+        )
+    else:
+        new_status = f"'{status.value}'"
+
+    engine = get_engine(database_url)
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            text(
+                f'UPDATE bronze."{BACKFILL_LEASES_TABLE_NAME}" '
+                f"SET status = {new_status}, lease_expires_at = NULL, error = :error, "
+                "updated_at = now() "
+                "WHERE backfill_id = :backfill_id AND date = :date AND file_type = :file_type "
+                f"AND worker_id = :worker_id AND status = '{LeaseStatus.LEASED.value}'"
+            ),
+            {
+                "backfill_id": backfill_id,
+                "worker_id": worker_id,
+                "date": unit.date,
+                "file_type": unit.file_type,
+                "error": error,
+                "max_attempts": max_attempts,
+            },
+        )
+        return result.rowcount > 0
+
+
+async def get_backfill_progress(database_url: str, backfill_id: str) -> Dict[LeaseStatus, int]:
+    """
+    Asynchronously counts the units of a backfill by status.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        backfill_id (str): The identifier of the backfill.
+
+    Returns:
+        Dict[LeaseStatus, int]: The number of units with each status (0 for statuses without
+        units).
+    """
+    statement = (
+        select(BackfillLease.status, func.count())
+        .where(BackfillLease.backfill_id == backfill_id)
+        .group_by(BackfillLease.status)
+    )
+
+    engine = get_engine(database_url)
+    async with engine.connect() as conn:
+        result = await conn.execute(statement)
+        counts = {LeaseStatus(status): count for status, count in result}
+    return {status: counts.get(status, 0) for status in LeaseStatus}
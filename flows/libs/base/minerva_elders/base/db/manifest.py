@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from .bronze import IngestionManifest
+from .utils import get_engine
+
+
+class ManifestStatus(str, Enum):
+    """
+    Enum that represents the ingestion status of a file.
+    """
+
+    DOWNLOADED = "downloaded"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    # The source didn't publish the file
+    MISSING = "missing"
+
+
+async def record_manifest_entry(
+    database_url: str,
+    date_: date,
+    file_type: str,
+    status: ManifestStatus,
+    **fields,
+) -> None:
+    """
+    Asynchronously creates or updates the manifest entry of a file.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        date_ (date): The date of the file.
+        file_type (str): The type of the file.
+        status (ManifestStatus): The new status of the file.
+        **fields: Other columns of the entry to set (e.g. `row_count`, `load_seconds`). Columns
+            that are not provided keep their previous values.
+    """
+    values = {
+        "status": ManifestStatus(status).value,
+        "updated_at": datetime.now(timezone.utc),
+        **fields,
+    }
+    statement = insert(IngestionManifest).values(date=date_, file_type=file_type, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[IngestionManifest.date, IngestionManifest.file_type],
+        set_={column: statement.excluded[column] for column in values},
+    )
+
+    engine = get_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.execute(statement)
+
+
+async def get_manifest_statuses(
+    database_url: str, dates: List[date]
+) -> Dict[Tuple[date, str], ManifestStatus]:
+    """
+    Asynchronously gets the ingestion status of the files of some dates.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        dates (List[date]): The dates to look up.
+
+    Returns:
+        Dict[Tuple[date, str], ManifestStatus]: The status of each file with a manifest entry,
+        by date and file type.
+    """
+    statement = select(
+        IngestionManifest.date, IngestionManifest.file_type, IngestionManifest.status
+    ).where(IngestionManifest.date.in_(dates))
+
+    engine = get_engine(database_url)
+    async with engine.connect() as conn:
+        result = await conn.execute(statement)
+        return {(row.date, row.file_type): ManifestStatus(row.status) for row in result}
+
+
+async def get_watermark(database_url: str, file_types: List[str]) -> date | None:
+    """
+    Asynchronously gets the last date of the unbroken run of completely loaded dates.
+
+    The run starts at the first date for which all files were completely loaded, and ends
+    before the first date after it that wasn't (because it failed, was partially loaded or was
+    never attempted), so that dates missed by earlier runs are planned again.
+
+    Args:
+        database_url (str): The URL of the PostgreSQL database.
+        file_types (List[str]): The file types that must be completed for a date to count.
+
+    Returns:
+        date | None: The last date of the run, or None if no date was completed.
+    """
+    completed_dates = (
+        select(IngestionManifest.date)
+        .where(
+            IngestionManifest.status == ManifestStatus.COMPLETED.value,
+            IngestionManifest.file_type.in_(file_types),
+        )
+        .group_by(IngestionManifest.date)
+        .having(func.count(func.distinct(IngestionManifest.file_type)) == len(file_types))
+        .cte("completed_dates")
+    )
+    next_dates = completed_dates.alias("next_dates")
+    # The run ends at the first completed date whose next date isn't completed
+    run_end = select(func.min(completed_dates.c.date)).where(
+        ~select(next_dates.c.date).where(next_dates.c.date == completed_dates.c.date + 1).exists()
+    )
+
+    engine = get_engine(database_url)
+    async with engine.connect() as conn:
+        return await conn.scalar(run_end)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable
+
+import pandas as pd
+import pyarrow as pa
+
+# Shared process pool (pools aren't tied to an event loop, so there's one per process)
+_PROCESS_POOL: ProcessPoolExecutor | None = None
+
+
+def get_process_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    """
+    Returns the process pool shared by all the CPU-bound stages running in this process.
+
+    Workers are spawned (rather than forked), as forking a process that runs threads (like the
+    Prefect engine) isn't safe. Each worker pays for importing pandas and pyarrow once.
+
+    Args:
+        max_workers (int | None): The number of worker processes, only used when the shared
+            pool is created. Defaults to the number of CPUs.
+
+    Returns:
+        ProcessPoolExecutor: The shared pool.
+    """
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        _PROCESS_POOL = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _PROCESS_POOL
+
+
+def shutdown_process_pool() -> None:
+    """
+    Shuts down the shared process pool, if there's one, waiting for its pending work.
+    """
+    global _PROCESS_POOL
+    if _PROCESS_POOL is not None:
+        _PROCESS_POOL.shutdown()
+        _PROCESS_POOL = None
+
+
+def dataframe_to_ipc(df: pd.DataFrame) -> pa.Buffer:
+    """
+    Serializes a DataFrame into an Arrow IPC stream.
+
+    The stream holds the Arrow buffers of the columns as they are, so it's much cheaper to send
+    between processes (and to read back) than a pickled DataFrame.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to serialize.
+
+    Returns:
+        pa.Buffer: The IPC stream.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def dataframe_from_ipc(
+    data: pa.Buffer | bytes, types_mapper: Callable[[pa.DataType], Any] | None = None
+) -> pd.DataFrame:
+    """
+    Deserializes a DataFrame from an Arrow IPC stream.
+
+    Args:
+        data (pa.Buffer | bytes): The IPC stream, as returned by `dataframe_to_ipc`.
+        types_mapper (Callable[[pa.DataType], Any] | None): Maps Arrow types to pandas types,
+            as in `pa.Table.to_pandas`.
+
+    Returns:
+        pd.DataFrame: The DataFrame.
+    """
+    table = pa.ipc.open_stream(data).read_all()
+    return table.to_pandas(types_mapper=types_mapper)
+
+
+async def run_in_executor(executor: Executor | None, func: Callable, *args: Any) -> Any:
+    """
+    Asynchronously runs a blocking function in an executor, without blocking the event loop.
+
+    Args:
+        executor (Executor | None): The executor. If None, the loop's default thread pool is used.
+        func (Callable): The function to run. It must be picklable for process pools.
+        *args (Any): The arguments of the function.
+
+    Returns:
+        Any: The result of the function.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from minerva_elders.base.db.bronze import (
+    GKG_COUNTS_TABLE_NAME,
+    GKG_EVENT_LINKS_TABLE_NAME,
+    GKG_LOCATIONS_TABLE_NAME,
+)
+
+# Typed columns decoded from the comma-separated TONE of the GKG, in order
+GKG_TONE_COLUMNS = {
+    "TONE_AVERAGE": pa.float64(),
+    "TONE_POSITIVE": pa.float64(),
+    "TONE_NEGATIVE": pa.float64(),
+    "TONE_POLARITY": pa.float64(),
+    "TONE_ACTIVITY_DENSITY": pa.float64(),
+    "TONE_SELF_GROUP_DENSITY": pa.float64(),
+}
+
+# Fields of each `#`-delimited block of the COUNTS of the GKG, in order
+GKG_COUNT_FIELDS = {
+    "count_type": pa.string(),
+    "number": pa.int64(),
+    "object_type": pa.string(),
+    "location_type": pa.int32(),
+    "location_full_name": pa.string(),
+    "location_country_code": pa.string(),
+    "location_adm1_code": pa.string(),
+    "location_lat": pa.float64(),
+    "location_long": pa.float64(),
+    "location_feature_id": pa.string(),
+}
+
+# Fields of each `#`-delimited block of the LOCATIONS of the GKG, in order
+GKG_LOCATION_FIELDS = {
+    "location_type": pa.int32(),
+    "full_name": pa.string(),
+    "country_code": pa.string(),
+    "adm1_code": pa.string(),
+    "lat": pa.float64(),
+    "long": pa.float64(),
+    "feature_id": pa.string(),
+}
+
+# Numbers as written by GDELT, e.g. `-97`, `38.5` or `1.2e-05`
+NUMBER_PATTERN = r"^[-+]?\d+(\.\d*)?([eE][-+]?\d+)?$"
+
+
+def _split_fields(
+    strings: pa.Array | pa.ChunkedArray, separator: str, fields: Dict[str, pa.DataType]
+) -> Dict[str, pa.Array | pa.ChunkedArray]:
+    # Pad every string with separators, so that each one splits into (at least) all the fields
+    padded = pc.binary_join_element_wise(strings, separator * (len(fields) - 1), "")
+    parts = pc.split_pattern(padded, separator)
+
+    columns = {}
+    for index, (name, type_) in enumerate(fields.items()):
+        values = pc.list_element(parts, index)
+        values = pc.if_else(pc.equal(values, ""), pa.scalar(None, pa.string()), values)
+        if pa.types.is_integer(type_) or pa.types.is_floating(type_):
+            # Malformed numbers become nulls instead of failing the whole batch
+            is_number = pc.match_substring_regex(values, NUMBER_PATTERN)
+            values = pc.if_else(is_number, values, pa.scalar(None, pa.string()))
+            values = pc.cast(pc.cast(values, pa.float64()), type_, safe=False)
+        columns[name] = values
+    return columns
+
+
+def _explode_blocks(
+    batch: pa.RecordBatch | pa.Table, column: str, fields: Dict[str, pa.DataType]
+) -> pa.Table:
+    # Split each field into its `;`-separated blocks, and each block into its `#`-separated fields
+    blocks = pc.split_pattern(batch.column(column), ";")
+    # Index of the record each flattened block comes from
+    parents = np.asarray(pc.list_parent_indices(blocks))
+    flat_blocks = pc.list_flatten(blocks)
+
+    # Position of each block in its record, since a record can repeat the same block
+    positions = np.arange(len(parents)) - np.searchsorted(parents, parents, side="left")
+
+    valid = pc.not_equal(flat_blocks, "")
+    parents = pc.filter(pa.array(parents), valid)
+    flat_blocks = pc.filter(flat_blocks, valid)
+    return pa.table(
+        {
+            "gkg_id": pc.take(batch.column("UUID"), parents),
+            "date": pc.take(batch.column("DATE"), parents),
+            "position": pc.cast(pc.filter(pa.array(positions), valid), pa.int16()),
+            **_split_fields(flat_blocks, "#", fields),
+        }
+    )
+
+
+def get_gkg_tone(tone: pa.Array | pa.ChunkedArray) -> pa.Table:
+    """
+    Function that decodes the TONE of GKG records into typed columns.
+
+    Args:
+        tone (pa.Array | pa.ChunkedArray): The comma-separated TONE of each record.
+
+    Returns:
+        pa.Table: The columns in `GKG_TONE_COLUMNS`, with a row for each record.
+    """
+    return pa.table(_split_fields(tone, ",", GKG_TONE_COLUMNS))
+
+
+def get_gkg_event_links(batch: pa.RecordBatch | pa.Table) -> pa.Table:
+    """
+    Function that explodes the event IDs of GKG records into (record, event) links.
+
+    The comma-separated `CAMEOEVENTIDS` are split and flattened with Arrow compute kernels, so
+    whole batches are exploded at once instead of record by record. Malformed IDs are dropped,
+    and so are links repeated within the batch.
+
+    Args:
+        batch (pa.RecordBatch | pa.Table): The GKG records, with (at least) the `UUID`, `DATE`
+            and `CAMEOEVENTIDS` columns.
+
+    Returns:
+        pa.Table: The links, with the columns of `bronze.gkg_event_links`.
+    """
+    event_ids = pc.split_pattern(batch.column("CAMEOEVENTIDS"), ",")
+    # Index of the record each flattened ID comes from
+    parents = pc.list_parent_indices(event_ids)
+    flat_ids = pc.utf8_trim_whitespace(pc.list_flatten(event_ids))
+
+    valid = pc.match_substring_regex(flat_ids, r"^\d+$")
+    parents = pc.filter(parents, valid)
+    links = pa.table(
+        {
+            "gkg_id": pc.take(batch.column("UUID"), parents),
+            "global_event_id": pc.cast(pc.filter(flat_ids, valid), pa.int32()),
+            "date": pc.take(batch.column("DATE"), parents),
+        }
+    )
+    # Grouping without aggregates keeps the distinct links
+    return links.group_by(["gkg_id", "global_event_id", "date"]).aggregate([])
+
+
+def get_gkg_counts(batch: pa.RecordBatch | pa.Table) -> pa.Table:
+    """
+    Function that explodes the COUNTS of GKG records into one row per count.
+
+    Args:
+        batch (pa.RecordBatch | pa.Table): The GKG records, with (at least) the `UUID`, `DATE`
+            and `COUNTS` columns.
+
+    Returns:
+        pa.Table: The counts, with the columns of `bronze.gkg_counts`.
+    """
+    return _explode_blocks(batch, "COUNTS", GKG_COUNT_FIELDS)
+
+
+def get_gkg_locations(batch: pa.RecordBatch | pa.Table) -> pa.Table:
+    """
+    Function that explodes the LOCATIONS of GKG records into one row per location.
+
+    Args:
+        batch (pa.RecordBatch | pa.Table): The GKG records, with (at least) the `UUID`, `DATE`
+            and `LOCATIONS` columns.
+
+    Returns:
+        pa.Table: The locations, with the columns of `bronze.gkg_locations`.
+    """
+    return _explode_blocks(batch, "LOCATIONS", GKG_LOCATION_FIELDS)
+
+
+# Tables derived from the GKG, with the columns they're derived from and how
+GKG_DERIVED_TABLES: Dict[str, Tuple[List[str], Callable[[pa.RecordBatch], pa.Table]]] = {
+    GKG_EVENT_LINKS_TABLE_NAME: (["UUID", "DATE", "CAMEOEVENTIDS"], get_gkg_event_links),
+    GKG_COUNTS_TABLE_NAME: (["UUID", "DATE", "COUNTS"], get_gkg_counts),
+    GKG_LOCATIONS_TABLE_NAME: (["UUID", "DATE", "LOCATIONS"], get_gkg_locations),
+}
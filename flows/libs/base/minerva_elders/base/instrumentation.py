@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+from contextlib import contextmanager
+from contextvars import Context, ContextVar
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Tuple
+from weakref import WeakKeyDictionary
+
+# Environment variable that turns the instrumentation on (e.g. `MINERVA_INSTRUMENTATION=1`)
+INSTRUMENTATION_ENV_VAR = "MINERVA_INSTRUMENTATION"
+
+# Labels of the work running in the current context, used to attribute blocking callbacks
+_SCOPE: ContextVar[str | None] = ContextVar("instrumentation_scope", default=None)
+_STAGE: ContextVar[str | None] = ContextVar("instrumentation_stage", default=None)
+
+# Monitors, by the event loop they watch
+_MONITORS: "WeakKeyDictionary[asyncio.AbstractEventLoop, LoopMonitor]" = WeakKeyDictionary()
+_original_handle_run = asyncio.events.Handle._run
+_ASYNCIO_DIR = str(Path(asyncio.__file__).parent)
+
+
+def instrumentation_enabled() -> bool:
+    """
+    Returns whether the instrumentation was turned on through the environment.
+
+    Returns:
+        bool: Whether `MINERVA_INSTRUMENTATION` is set to a truthy value.
+    """
+    return os.getenv(INSTRUMENTATION_ENV_VAR, "").lower() in ("1", "true", "yes", "on")
+
+
+@contextmanager
+def scope(name: str) -> Iterator[None]:
+    """
+    Labels the work started in this context (e.g. the date being processed) for the reports.
+
+    Tasks created inside the block inherit the label.
+
+    Args:
+        name (str): The label of the scope.
+    """
+    token = _SCOPE.set(name)
+    try:
+        yield
+    finally:
+        _SCOPE.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Labels the stage of the work started in this context (e.g. `download` or `upload`).
+
+    The block can span awaits. Tasks created inside it inherit the label.
+
+    Args:
+        name (str): The label of the stage.
+    """
+    token = _STAGE.set(name)
+    try:
+        yield
+    finally:
+        _STAGE.reset(token)
+
+
+def _get_name(obj: Any) -> str:
+    # Never uses `repr`, as some objects (e.g. of aiohttp) change their state when represented
+    return getattr(obj, "__qualname__", None) or type(obj).__qualname__
+
+
+def _get_location(handle: asyncio.Handle) -> str:
+    # For task steps, the innermost suspended coroutine is where the step resumes, i.e. where the
+    # code that runs (and maybe blocks) during the step starts
+    callback = handle._callback
+    task = getattr(callback, "__self__", None)
+    if not isinstance(task, asyncio.Task):
+        return _get_name(callback)
+    coro = location = task.get_coro()
+    while hasattr(coro, "cr_frame"):
+        # Coroutines of asyncio itself (e.g. `sleep`) return straight to their caller
+        frame = coro.cr_frame
+        if frame is not None and not frame.f_code.co_filename.startswith(_ASYNCIO_DIR):
+            location = coro
+        coro = getattr(coro, "cr_await", None)
+    frame = getattr(location, "cr_frame", None)
+    name = _get_name(location)
+    if frame is None:
+        return name
+    return f"{name} ({Path(frame.f_code.co_filename).name}:{frame.f_lineno})"
+
+
+def _timed_handle_run(self: asyncio.Handle) -> None:
+    monitor = _MONITORS.get(self._loop)
+    if monitor is None:
+        return _original_handle_run(self)
+    location = _get_location(self)
+    started_at = perf_counter()
+    try:
+        return _original_handle_run(self)
+    finally:
+        elapsed = perf_counter() - started_at
+        if elapsed >= monitor.block_threshold:
+            monitor.record_block(
+                scope=self._context.get(_SCOPE),
+                stage=self._context.get(_STAGE),
+                location=location,
+                seconds=elapsed,
+            )
+
+
+class LoopMonitor:
+    """
+    Measures the health of an event loop: its lag, and the callbacks that block it.
+
+    Lag is sampled by a task that sleeps for `interval` and measures how late it wakes up. Every
+    callback run by the loop is timed (by wrapping `asyncio.Handle._run`), and those that run for
+    longer than `block_threshold` are recorded along with the scope and stage labels of their
+    context, and the coroutine (and line) they resumed from.
+
+    The monitor is used as an async context manager, which can be entered by several tasks at
+    once: it's started on the first entry and stopped on the last exit. `asyncio.Handle._run`
+    is only wrapped while some event loop is monitored.
+
+    Args:
+        interval (float): How often to sample the lag, in seconds.
+        block_threshold (float): The minimum duration of a callback to be recorded, in seconds.
+    """
+
+    def __init__(self, interval: float = 0.05, block_threshold: float = 0.1):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.lag_samples = 0
+        self.lag_max = 0.0
+        self.lag_total = 0.0
+        # Blocking callbacks, by scope and stage
+        self.blocks: Dict[Tuple[str | None, str | None], Dict[str, Any]] = {}
+        self._task: asyncio.Task | None = None
+        self._users = 0
+
+    async def __aenter__(self) -> "LoopMonitor":
+        if self._users == 0:
+            self.start()
+        self._users += 1
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._users -= 1
+        if self._users == 0:
+            await self.stop()
+
+    def record_block(
+        self, scope: str | None, stage: str | None, location: str, seconds: float
+    ) -> None:
+        """
+        Records a blocking callback.
+
+        Args:
+            scope (str | None): The scope label of the callback's context.
+            stage (str | None): The stage label of the callback's context.
+            location (str): Where the callback's code started.
+            seconds (float): For how long the callback ran.
+        """
+        entry = self.blocks.setdefault(
+            (scope, stage), {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "worst": None}
+        )
+        entry["count"] += 1
+        entry["seconds"] += seconds
+        if seconds > entry["max_seconds"]:
+            entry["max_seconds"] = seconds
+            entry["worst"] = location
+
+    async def _sample_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started_at = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - started_at - self.interval, 0.0)
+            self.lag_samples += 1
+            self.lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+
+    def start(self) -> None:
+        """
+        Starts monitoring the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if not _MONITORS:
+            asyncio.events.Handle._run = _timed_handle_run
+        _MONITORS[loop] = self
+        # The sampler runs in an empty context, so it's never attributed to the caller's labels
+        self._task = Context().run(loop.create_task, self._sample_lag())
+
+    async def stop(self) -> None:
+        """
+        Stops monitoring the event loop, and unwraps `asyncio.Handle._run` if no other event loop
+        is monitored.
+        """
+        _MONITORS.pop(asyncio.get_running_loop(), None)
+        if not _MONITORS:
+            asyncio.events.Handle._run = _original_handle_run
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def report(self, scope: str | None = None, clear: bool = False) -> List[Dict[str, Any]]:
+        """
+        Returns the blocking callbacks recorded for a scope, by stage, the worst ones first.
+
+        Args:
+            scope (str | None): The scope to report on.
+            clear (bool): Whether to forget the reported records.
+
+        Returns:
+            List[Dict[str, Any]]: For each stage, the number of blocking callbacks, their total
+            and maximum durations, and where the longest one started.
+        """
+        keys = [key for key in self.blocks if key[0] == scope]
+        rows = [{"stage": key[1], **self.blocks[key]} for key in keys]
+        if clear:
+            for key in keys:
+                del self.blocks[key]
+        return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+    def format_report(self, scope: str | None = None, clear: bool = False) -> str:
+        """
+        Formats the health of the event loop and the blocking callbacks of a scope for the logs.
+
+        Args:
+            scope (str | None): The scope to report on.
+            clear (bool): Whether to forget the reported records.
+
+        Returns:
+            str: The report, one line per stage.
+        """
+        lag_mean = self.lag_total / self.lag_samples if self.lag_samples else 0.0
+        lines = [
+            f"Event loop lag: mean {lag_mean * 1000:.1f} ms, max {self.lag_max * 1000:.1f} ms "
+            f"over {self.lag_samples} samples"
+        ]
+        for row in self.report(scope=scope, clear=clear):
+            lines.append(
+                f"  {row['stage'] or 'unlabeled'}: {row['count']} blocking callbacks, "
+                f"{row['seconds']:.2f} s in total, worst {row['max_seconds']:.2f} s "
+                f"in {row['worst']}"
+            )
+        return "\n".join(lines)
+
+
+def get_loop_monitor(**kwargs) -> LoopMonitor:
+    """
+    Returns the monitor of the running event loop, or a new one if it isn't monitored.
+
+    The monitor is meant to be entered right away (`async with get_loop_monitor() as monitor`),
+    so that concurrent tasks share it, and it's stopped once all of them are done.
+
+    Args:
+        **kwargs: Arguments for `LoopMonitor`, only used when a new monitor is created.
+
+    Returns:
+        LoopMonitor: The monitor.
+    """
+    return _MONITORS.get(asyncio.get_running_loop()) or LoopMonitor(**kwargs)
@@ -1,11 +1,241 @@
 # -*- coding: utf-8 -*-
 import asyncio
+import struct
 import zipfile
+import zlib
 from pathlib import Path
+from time import perf_counter
+from typing import AsyncIterator, Iterator, List
+from weakref import WeakKeyDictionary
 
 import aiofiles
 import aiofiles.os
-from aiohttp import ClientSession
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from minerva_elders.base.metrics import measure, record
+
+
+class HTTPClient:
+    """
+    Long-lived HTTP client that pools connections across downloads.
+
+    Connections are kept alive and DNS lookups are cached, so downloading many files from the
+    same host only pays for a handful of TCP handshakes. The connector limits also act as global
+    and per-host concurrency caps: requests beyond them wait for a free connection.
+
+    Args:
+        limit (int): The maximum number of simultaneous connections.
+        limit_per_host (int): The maximum number of simultaneous connections to a single host.
+        dns_cache_ttl (int): For how long to cache DNS lookups, in seconds.
+        keepalive_timeout (float): For how long to keep idle connections open, in seconds.
+        chunk_size (int): The size of the chunks read from response bodies, in bytes.
+    """
+
+    def __init__(
+        self,
+        limit: int = 16,
+        limit_per_host: int = 8,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 60,
+        chunk_size: int = 64 * 1024,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.chunk_size = chunk_size
+        self._session: ClientSession | None = None
+
+    @property
+    def session(self) -> ClientSession:
+        """
+        The underlying session, created on first use (it must be created inside the event loop).
+        """
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = ClientSession(
+                connector=connector, timeout=ClientTimeout(total=None, sock_read=300)
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Closes the underlying session and all of its pooled connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "HTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def iter_chunks(self, url: str) -> AsyncIterator[bytes]:
+        """
+        Asynchronously iterates over the body of a URL, chunk by chunk.
+
+        Args:
+            url (str): The URL to download.
+
+        Yields:
+            bytes: The chunks of the response body.
+        """
+        async with self.session.get(url) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                yield chunk
+
+    async def get_content_length(self, url: str) -> int | None:
+        """
+        Asynchronously gets the size of the body of a URL, without downloading it.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            int | None: The Content-Length the server returned to a HEAD request, or None if it
+            didn't return one.
+        """
+        async with self.session.head(url, allow_redirects=True) as response:
+            response.raise_for_status()
+            return response.content_length
+
+    async def download_file(self, url: str, path: str | Path) -> None:
+        """
+        Downloads a file from a URL, streaming it to disk chunk by chunk.
+
+        Args:
+            url (str): The URL of the file.
+            path (str | Path): The path where the file will be saved.
+        """
+        path = Path(path)
+        async with aiofiles.open(path, "wb") as file:
+            async for chunk in self.iter_chunks(url):
+                await file.write(chunk)
+
+
+# Shared clients, one per event loop (sessions can't be used across loops)
+_HTTP_CLIENTS: "WeakKeyDictionary[asyncio.AbstractEventLoop, HTTPClient]" = WeakKeyDictionary()
+
+
+def get_http_client(**kwargs) -> HTTPClient:
+    """
+    Returns the HTTP client shared by all downloads running in the current event loop.
+
+    Args:
+        **kwargs: Arguments for `HTTPClient`, only used when the shared client is created.
+
+    Returns:
+        HTTPClient: The shared client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _HTTP_CLIENTS.get(loop)
+    if client is None:
+        client = HTTPClient(**kwargs)
+        _HTTP_CLIENTS[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """
+    Closes the HTTP client shared in the current event loop, if there's one.
+    """
+    client = _HTTP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+class MemoryBudget:
+    """
+    Byte-counting semaphore that bounds the memory held by batches in flight.
+
+    Producers reserve the (estimated) size of each batch before handing it over, and release it
+    once the batch was consumed, so all the producers sharing a budget can't get further ahead of
+    their consumers than `max_bytes` in total. A batch larger than the whole budget is let through
+    on its own, so that it can't block forever.
+
+    Args:
+        max_bytes (int): The maximum number of bytes reserved at once.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.reserved_bytes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, nbytes: int) -> int:
+        """
+        Reserves bytes from the budget, waiting until they're available.
+
+        Args:
+            nbytes (int): The number of bytes to reserve.
+
+        Returns:
+            int: The number of bytes actually reserved, to be released later.
+        """
+        nbytes = min(nbytes, self.max_bytes)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.reserved_bytes + nbytes <= self.max_bytes)
+            self.reserved_bytes += nbytes
+        return nbytes
+
+    def try_acquire(self, nbytes: int) -> int | None:
+        """
+        Reserves bytes from the budget if they're available right away.
+
+        Args:
+            nbytes (int): The number of bytes to reserve.
+
+        Returns:
+            int | None: The number of bytes reserved, or None if they weren't available.
+        """
+        nbytes = min(nbytes, self.max_bytes)
+        if self.reserved_bytes + nbytes > self.max_bytes:
+            return None
+        self.reserved_bytes += nbytes
+        return nbytes
+
+    async def release(self, nbytes: int) -> None:
+        """
+        Returns reserved bytes to the budget.
+
+        Args:
+            nbytes (int): The number of bytes to release, as returned by `acquire`.
+        """
+        async with self._condition:
+            self.reserved_bytes -= nbytes
+            self._condition.notify_all()
+
+
+# Shared budgets, one per event loop (conditions can't be used across loops)
+_MEMORY_BUDGETS: "WeakKeyDictionary[asyncio.AbstractEventLoop, MemoryBudget]" = WeakKeyDictionary()
+
+
+def get_memory_budget(max_bytes: int) -> MemoryBudget:
+    """
+    Returns the memory budget shared by all the batch producers running in the current event loop.
+
+    Args:
+        max_bytes (int): The size of the budget, only used when the shared budget is created.
+
+    Returns:
+        MemoryBudget: The shared budget.
+    """
+    loop = asyncio.get_running_loop()
+    budget = _MEMORY_BUDGETS.get(loop)
+    if budget is None:
+        budget = MemoryBudget(max_bytes)
+        _MEMORY_BUDGETS[loop] = budget
+    return budget
 
 
 async def clear_directory(directory: str | Path) -> None:
@@ -30,13 +260,14 @@ async def clear_directory(directory: str | Path) -> None:
             await aiofiles.os.remove(item)  # Remove the file
 
 
-async def download_file(url: str, path: str | Path) -> None:
+async def download_file(url: str, path: str | Path, client: HTTPClient | None = None) -> None:
     """
     Function that downloads a file from a URL and saves it to a path.
 
     Args:
         url (str): The URL of the file.
         path (str | Path): The path where the file will be saved.
+        client (HTTPClient | None): The client to use. Defaults to the shared client.
     """
     path = Path(path)
     # Ensure that the path is not a directory
@@ -47,11 +278,8 @@ async def download_file(url: str, path: str | Path) -> None:
     if not path.parent.exists():
         path.parent.mkdir(parents=True, exist_ok=True)
 
-    async with ClientSession() as session:
-        async with session.get(url) as response:
-            response.raise_for_status()
-            async with aiofiles.open(path, "wb") as file:
-                await file.write(await response.read())
+    client = client or get_http_client()
+    await client.download_file(url=url, path=path)
 
 
 async def unzip_file(zip_path: str | Path, extract_to: str | Path) -> None:
@@ -81,3 +309,241 @@ async def unzip_file(zip_path: str | Path, extract_to: str | Path) -> None:
     # Run the blocking unzip operation in a separate thread
     loop = asyncio.get_event_loop()
     await loop.run_in_executor(None, _unzip)
+
+
+# Fixed-size part of a zip local file header (APPNOTE.TXT, section 4.3.7)
+ZIP_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+ZIP_LOCAL_HEADER_SIGNATURE = 0x04034B50
+ZIP_DATA_DESCRIPTOR_FLAG = 0x08
+
+
+async def iter_url_chunks(url: str, client: HTTPClient | None = None) -> AsyncIterator[bytes]:
+    """
+    Asynchronously iterates over the body of a URL, chunk by chunk.
+
+    Args:
+        url (str): The URL to download.
+        client (HTTPClient | None): The client to use. Defaults to the shared client.
+
+    Yields:
+        bytes: The chunks of the response body.
+    """
+    client = client or get_http_client()
+    async for chunk in client.iter_chunks(url):
+        yield chunk
+
+
+async def iter_unzipped_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Incrementally decompresses the first member of a zip archive from a stream of bytes.
+
+    Only the local file header is used, so the archive never needs to be fully available
+    (the central directory at the end of the file is ignored). The stream is still read to its
+    end before the last bytes of the member are yielded.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The raw bytes of the zip archive.
+
+    Yields:
+        bytes: The decompressed bytes of the first member of the archive.
+    """
+    chunks = aiter(chunks)
+    buffer = b""
+
+    # Read the local file header, including the variable-length file name and extra field
+    while True:
+        if len(buffer) >= ZIP_LOCAL_HEADER.size:
+            (
+                signature,
+                _,
+                flags,
+                method,
+                _,
+                _,
+                crc,
+                compressed_size,
+                _,
+                name_length,
+                extra_length,
+            ) = ZIP_LOCAL_HEADER.unpack_from(buffer)
+            if signature != ZIP_LOCAL_HEADER_SIGNATURE:
+                raise ValueError("The stream is not a zip archive.")
+            header_length = ZIP_LOCAL_HEADER.size + name_length + extra_length
+            if len(buffer) >= header_length:
+                break
+        chunk = await anext(chunks, None)
+        if chunk is None:
+            raise ValueError("Unexpected end of stream while reading the zip header.")
+        buffer += chunk
+
+    # Sizes and CRC are only known upfront if there's no trailing data descriptor
+    has_descriptor = bool(flags & ZIP_DATA_DESCRIPTOR_FLAG)
+    data = buffer[header_length:]
+    checksum = 0
+
+    async def finish(checksum: int) -> None:
+        # The rest of the archive (e.g. its central directory) is read too, so that its source
+        # sees the whole body (e.g. to validate and cache it) before the end of the member is
+        # passed on, and a bad archive fails the stream before its last lines are parsed
+        async for _ in chunks:
+            pass
+        if not has_descriptor and checksum != crc:
+            raise ValueError("CRC mismatch in the decompressed zip member.")
+
+    if method == zipfile.ZIP_DEFLATED:
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        # Only the time spent inflating is measured, not the time waiting for the chunks
+        seconds, input_bytes, output_bytes = 0.0, 0, 0
+        try:
+            while True:
+                output = b""
+                if data:
+                    started_at = perf_counter()
+                    output = decompressor.decompress(data)
+                    checksum = zlib.crc32(output, checksum)
+                    seconds += perf_counter() - started_at
+                    input_bytes += len(data)
+                    output_bytes += len(output)
+                if decompressor.eof:
+                    await finish(checksum)
+                if output:
+                    yield output
+                if decompressor.eof:
+                    break
+                data = await anext(chunks, None)
+                if data is None:
+                    raise ValueError("Unexpected end of stream while inflating the zip member.")
+        finally:
+            record("inflate", seconds=seconds, bytes=output_bytes, input_bytes=input_bytes)
+    elif method == zipfile.ZIP_STORED:
+        if has_descriptor:
+            raise ValueError("Stored zip members with a data descriptor can't be streamed.")
+        remaining = compressed_size
+        if remaining == 0:
+            await finish(checksum)
+        while remaining > 0:
+            if not data:
+                data = await anext(chunks, None)
+                if data is None:
+                    raise ValueError("Unexpected end of stream while reading the zip member.")
+            output, data = data[:remaining], data[remaining:]
+            remaining -= len(output)
+            checksum = zlib.crc32(output, checksum)
+            if remaining == 0:
+                await finish(checksum)
+            yield output
+    else:
+        raise ValueError(f"Unsupported zip compression method: {method}")
+
+
+async def iter_line_blocks(
+    chunks: AsyncIterator[bytes], block_size: int = 16 * 1024 * 1024
+) -> AsyncIterator[bytes]:
+    """
+    Regroups a stream of bytes into blocks of complete lines.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The stream of bytes.
+        block_size (int): The approximate size of each block, in bytes. Blocks are cut at the
+            last line boundary within the size (or the first one after it, for longer lines), so
+            large chunks are split into several blocks.
+
+    Yields:
+        bytes: Blocks of bytes that always end at a line boundary (except, possibly, the last one).
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= block_size:
+            end = (buffer.rfind(b"\n", 0, block_size) + 1) or (buffer.find(b"\n", block_size) + 1)
+            if end == 0:
+                break
+            yield bytes(buffer[:end])
+            del buffer[:end]
+    if buffer:
+        yield bytes(buffer)
+
+
+def write_parquet(df: pd.DataFrame, path: str | Path, compression: str = "zstd") -> None:
+    """
+    Function that writes a DataFrame to a compressed Parquet file, keeping its column types.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to write.
+        path (str | Path): The path of the Parquet file.
+        compression (str): The compression codec.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path, engine="pyarrow", compression=compression, index=False)
+
+
+async def write_parquet_batches(
+    batches: AsyncIterator[pd.DataFrame], path: str | Path, compression: str = "zstd"
+) -> int:
+    """
+    Function that writes DataFrame batches to a compressed Parquet file as they're produced.
+
+    Each batch becomes a row group, so only one batch needs to be in memory at a time. All the
+    batches must have the same columns; categoricals can have different categories in each.
+
+    Args:
+        batches (AsyncIterator[pd.DataFrame]): The batches to write.
+        path (str | Path): The path of the Parquet file.
+        compression (str): The compression codec.
+
+    Returns:
+        int: The number of rows written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer: pq.ParquetWriter | None = None
+    rows = 0
+    try:
+        async for df in batches:
+            with measure("cast") as values:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    # Dictionary indices are sized by each batch's categories, so they're widened
+                    schema = pa.schema(
+                        [
+                            (
+                                pa.field(field.name, pa.dictionary(pa.int32(), pa.string()))
+                                if pa.types.is_dictionary(field.type)
+                                else field
+                            )
+                            for field in table.schema
+                        ],
+                        metadata=table.schema.metadata,
+                    )
+                    writer = pq.ParquetWriter(path, schema, compression=compression)
+                table = table.cast(schema)
+                values["rows"] = len(df)
+            with measure("write_parquet") as values:
+                writer.write_table(table)
+                values.update(rows=len(df), bytes=table.nbytes)
+            rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def iter_parquet_batches(
+    path: str | Path, batch_size: int = 65_536, columns: List[str] | None = None
+) -> Iterator[pa.RecordBatch]:
+    """
+    Function that iterates over a Parquet file in Arrow record batches.
+
+    The file is memory-mapped, so only the row groups being decoded are read into memory.
+
+    Args:
+        path (str | Path): The path of the Parquet file.
+        batch_size (int): The maximum number of rows in each batch.
+        columns (List[str] | None): The columns to read. If None, all columns are read.
+
+    Yields:
+        pa.RecordBatch: The batches of rows, with the column types of the file.
+    """
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    yield from parquet_file.iter_batches(batch_size=batch_size, columns=columns)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+import os
+import resource
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Values that are summed across the records of a stage
+SUMMED_VALUES = ("calls", "seconds", "rows", "bytes", "input_bytes")
+
+# Prefix of the names of the exported metrics
+METRIC_PREFIX = "minerva_ingestion_stage"
+
+# Collector of the work running in the current context
+_COLLECTOR: "ContextVar[MetricsCollector | None]" = ContextVar("metrics_collector", default=None)
+
+# Stages of every collector that finished in this process, by labels
+_REGISTRY: Dict[Tuple[Tuple[str, str], ...], Dict[str, Dict[str, float]]] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_rss() -> int:
+    """
+    Returns the resident memory of this process (worker processes are not included).
+
+    Returns:
+        int: The resident memory, in bytes. Where `/proc` isn't available, the peak resident
+        memory of the process so far.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MetricsCollector:
+    """
+    Accumulates the metrics of the stages of a unit of work (e.g. loading the files of a date).
+
+    Stages record how long they ran and how much they processed, as many times as they run
+    (e.g. once per batch). Records are summed by stage, and the resident memory of the process
+    is sampled with each of them, to find its peak during each stage.
+
+    Args:
+        **labels (str): Labels that tell the unit of work apart in the exported metrics (e.g.
+            `date="2024-01-01"`).
+    """
+
+    def __init__(self, **labels: str):
+        self.labels = labels
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.started_at = perf_counter()
+        self.wall_seconds = 0.0
+
+    def record(self, stage: str, **values: float) -> None:
+        """
+        Records a run of a stage.
+
+        Args:
+            stage (str): The name of the stage (e.g. `download`).
+            **values (float): What the run took and processed: `seconds`, `rows`, `bytes`
+                (the bytes it produced) and `input_bytes` (the bytes it consumed, e.g. the
+                compressed bytes of `inflate`).
+        """
+        entry = self.stages.setdefault(
+            stage, {**{name: 0 for name in SUMMED_VALUES}, "peak_rss_bytes": 0}
+        )
+        entry["calls"] += 1
+        for name, value in values.items():
+            entry[name] += value
+        entry["peak_rss_bytes"] = max(entry["peak_rss_bytes"], get_rss())
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Returns the metrics of each stage, with the throughputs derived from them.
+
+        Seconds are summed over the runs of a stage, so stages that run concurrently (e.g.
+        parallel writers) can add up to more than the wall time of the work.
+
+        Returns:
+            List[Dict[str, Any]]: For each stage, in the order they first ran, its number of
+            runs, seconds, rows, bytes, rows and bytes per second, compression ratio (bytes
+            produced per byte consumed) and peak resident memory.
+        """
+        rows = []
+        for stage_name, entry in self.stages.items():
+            seconds = entry["seconds"]
+            rows.append(
+                {
+                    "stage": stage_name,
+                    **entry,
+                    "rows_per_second": entry["rows"] / seconds if seconds else 0.0,
+                    "bytes_per_second": entry["bytes"] / seconds if seconds else 0.0,
+                    "ratio": (
+                        entry["bytes"] / entry["input_bytes"] if entry["input_bytes"] else None
+                    ),
+                }
+            )
+        return rows
+
+    def format_summary(self) -> str:
+        """
+        Formats the metrics of each stage for the logs.
+
+        Returns:
+            str: The summary, one line per stage.
+        """
+        labels = ", ".join(f"{name}={value}" for name, value in self.labels.items())
+        lines = [f"Stage metrics ({labels}), {self.wall_seconds:.1f} s in total:"]
+        for row in self.summary():
+            parts = [f"{row['seconds']:.2f} s over {row['calls']:.0f} runs"]
+            # Only what the stage measured is shown
+            if row["rows"]:
+                parts.append(f"{row['rows']:,.0f} rows ({row['rows_per_second']:,.0f}/s)")
+            if row["bytes"]:
+                megabytes, per_second = row["bytes"] / 1024**2, row["bytes_per_second"] / 1024**2
+                parts.append(f"{megabytes:,.1f} MB ({per_second:,.1f} MB/s)")
+            if row["ratio"] is not None:
+                parts.append(f"ratio {row['ratio']:.1f}")
+            parts.append(f"peak RSS {row['peak_rss_bytes'] / 1024**2:,.0f} MB")
+            lines.append(f"  {row['stage']}: " + ", ".join(parts))
+        return "\n".join(lines)
+
+
+def record(stage: str, **values: float) -> None:
+    """
+    Records a run of a stage in the collector of the current context, if there's one.
+
+    Args:
+        stage (str): The name of the stage.
+        **values (float): What the run took and processed (see `MetricsCollector.record`).
+    """
+    collector = _COLLECTOR.get()
+    if collector is not None:
+        collector.record(stage, **values)
+
+
+@contextmanager
+def measure(stage: str) -> Iterator[Dict[str, float]]:
+    """
+    Times a run of a stage and records it in the collector of the current context, if any.
+
+    The block can fill in the yielded values with what it processed (e.g. `rows`).
+
+    Args:
+        stage (str): The name of the stage.
+
+    Yields:
+        Dict[str, float]: The values recorded along with the duration of the block.
+    """
+    values: Dict[str, float] = {}
+    started_at = perf_counter()
+    try:
+        yield values
+    finally:
+        record(stage, seconds=perf_counter() - started_at, **values)
+
+
+@contextmanager
+def collect_metrics(**labels: str) -> Iterator[MetricsCollector]:
+    """
+    Collects the metrics of the stages that run in this context, including in the tasks it
+    creates.
+
+    When the block exits, the metrics are added to the registry of this process, from which
+    they're exported (see `format_openmetrics`). Work with the same labels replaces what was
+    registered for them before.
+
+    Args:
+        **labels (str): Labels that tell the work apart (e.g. `date="2024-01-01"`).
+
+    Yields:
+        MetricsCollector: The collector.
+    """
+    collector = MetricsCollector(**labels)
+    token = _COLLECTOR.set(collector)
+    try:
+        yield collector
+    finally:
+        _COLLECTOR.reset(token)
+        collector.wall_seconds = perf_counter() - collector.started_at
+        with _REGISTRY_LOCK:
+            _REGISTRY[tuple(sorted(labels.items()))] = {
+                **collector.stages,
+                "total": {"calls": 1, "seconds": collector.wall_seconds},
+            }
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], stage: str) -> str:
+    pairs = [*labels, ("stage", stage)]
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return ",".join(f'{name}="{value}"' for name, value in escaped)
+
+
+def format_openmetrics() -> str:
+    """
+    Formats the metrics registered in this process in the OpenMetrics text format.
+
+    Each stage of each unit of work is a set of gauges, labeled with the labels of the work and
+    the stage (the wall time of the whole work is the `total` stage).
+
+    Returns:
+        str: The exposition, ending with `# EOF`.
+    """
+    with _REGISTRY_LOCK:
+        registry = {labels: dict(stages) for labels, stages in _REGISTRY.items()}
+    lines = []
+    for name in (*SUMMED_VALUES, "peak_rss_bytes"):
+        metric = f"{METRIC_PREFIX}_{name}"
+        lines.append(f"# TYPE {metric} gauge")
+        for labels, stages in registry.items():
+            for stage_name, entry in stages.items():
+                if name in entry:
+                    lines.append(f"{metric}{{{_format_labels(labels, stage_name)}}} {entry[name]}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_openmetrics(path: str | Path) -> None:
+    """
+    Writes the metrics registered in this process to a file in the OpenMetrics text format.
+
+    The file is replaced atomically, so it can be scraped at any time (e.g. by the textfile
+    collector of the Prometheus node exporter).
+
+    Args:
+        path (str | Path): The path of the file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(format_openmetrics())
+    os.replace(tmp_path, path)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import zipfile
+from datetime import datetime
+from io import BytesIO
+from typing import Dict
+
+from aiohttp import web
+from minerva_elders.base.gdelt import (
+    GDELTFileType,
+    get_gdelt_file_url,
+    get_gdelt_md5sums_url,
+)
+
+
+def zip_gdelt_file(name: str, data: bytes) -> bytes:
+    """
+    Function that packs the contents of a GDELT CSV file into a ZIP archive, as GDELT does.
+
+    Args:
+        name (str): The name of the CSV file in the archive.
+        data (bytes): The contents of the file.
+
+    Returns:
+        bytes: The archive.
+    """
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+class GDELTStubServer:
+    """
+    Local HTTP server that imitates GDELT's file server, for tests and benchmarks.
+
+    Files are served from memory, under the same paths as GDELT's. Publishing a file also
+    publishes its checksum: daily files are added to the `md5sums` list of their type, and
+    15-minute files replace the list of the latest files (`lastupdate.txt`). Point the flows at
+    the server by setting `GDELT_BASE_URL` to its `base_url`.
+
+    Args:
+        host (str): The host to listen on.
+        port (int): The port to listen on. If 0, a free port is picked when the server starts.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        # Contents served, by path
+        self.files: Dict[str, bytes] = {}
+        # Published checksums of the daily files, by type and file name
+        self._md5sums: Dict[GDELTFileType, Dict[str, str]] = {}
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        The base URL of the server (only known once it started, when the port is picked).
+        """
+        return f"http://{self.host}:{self.port}"
+
+    def _get_path(self, url: str) -> str:
+        # GDELT URLs are built from the base URL, whichever server it points to
+        return "/" + url.split("://", 1)[-1].split("/", 1)[-1]
+
+    def publish(self, date: datetime, type_: GDELTFileType, data: bytes) -> str:
+        """
+        Publishes a GDELT file and its checksum.
+
+        Args:
+            date (datetime): The date of the file. For 15-minute files, the time it was exported.
+            type (GDELTFileType): The type of the file.
+            data (bytes): The tab-separated contents of the file (not zipped).
+
+        Returns:
+            str: The path the archive is served at.
+        """
+        file_name = get_gdelt_file_url(date=date, type_=type_).rsplit("/", 1)[-1]
+        archive = zip_gdelt_file(file_name.removesuffix(".zip"), data)
+        return self.publish_archive(date=date, type_=type_, archive=archive)
+
+    def publish_archive(self, date: datetime, type_: GDELTFileType, archive: bytes) -> str:
+        """
+        Publishes an already zipped GDELT file and its checksum.
+
+        Args:
+            date (datetime): The date of the file. For 15-minute files, the time it was exported.
+            type (GDELTFileType): The type of the file.
+            archive (bytes): The ZIP archive with the file.
+
+        Returns:
+            str: The path the archive is served at.
+        """
+        path = self._get_path(get_gdelt_file_url(date=date, type_=type_))
+        file_name = path.rsplit("/", 1)[-1]
+        md5 = hashlib.md5(archive).hexdigest()
+        self.files[path] = archive
+
+        md5sums_path = self._get_path(get_gdelt_md5sums_url(type_))
+        if type_ == GDELTFileType.EVENTS_15MIN:
+            url = f"{self.base_url}{path}"
+            self.files[md5sums_path] = f"{len(archive)} {md5} {url}\n".encode()
+        else:
+            md5sums = self._md5sums.setdefault(type_, {})
+            md5sums[file_name] = md5
+            self.files[md5sums_path] = "".join(
+                f"{md5}  {name}\n" for name, md5 in md5sums.items()
+            ).encode()
+        return path
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        data = self.files.get(request.path)
+        if data is None:
+            return web.Response(status=404)
+        return web.Response(body=data)
+
+    async def start(self) -> None:
+        """
+        Asynchronously starts serving.
+        """
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """
+        Asynchronously stops serving.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "GDELTStubServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()